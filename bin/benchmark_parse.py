@@ -0,0 +1,128 @@
+#!/usr/bin/env -S poetry run python
+__version__ = "0.0.1"
+import argparse
+import logging
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from reports.configurations import project_info_filename, project_folders_root, project_params_dict
+from resources.project_file import ProjectFileObject, set_date_obj
+
+HEADER_LINES = [
+    "# Benchmark project file",
+    "ANALYTICS_DS_OWNER: Testy McTestface (t.mctestface@f5.com)",
+    "DATA_OFFICE_SPONSOR: Scott Hendrickson (s.hendrickson@f5.com)",
+    "BUSINESS_SPONSOR: T. Greatest Sponsor, Another Sponsor",
+    "MISSION_ALIGNMENT: Explore strange new worlds",
+    "T-SHIRT_SIZE: XL",
+    "DATA_PRODUCT_LINK: https://www.amazon.com",
+    "COMMIT_JUSTIFICATION: Because: it matters",
+]
+COMPUTED_LINES = [
+    "COMPUTED_PROJECT_START_DATE: 2025-01-10",
+    "COMPUTED_AGE_DAYS: 120",
+    "COMPUTED_DATE_IN_STAGE_3_IN_PROGRESS: 2025-02-01",
+    "COMPUTED_DAYS_IN_STAGE_3_IN_PROGRESS: 98",
+    "COMPUTED_PREVIOUS_PHASE: 3-In Progress",
+    "Report_Date: 2025-05-10",
+]
+
+
+def synthetic_project_lines(notes, rng):
+    """
+    Builds the lines of a notes-heavy project info file.
+    """
+    lines = list(HEADER_LINES)
+    first_day = date(2024, 1, 1)
+    for i in range(notes):
+        day = first_day + timedelta(days=rng.randint(0, 700))
+        if i % 5 == 4:
+            lines.append(f"NOTES_{day.year}-{day.month}-{day.day}-{i % 3 + 1}: Step {i} of the rollout: done")
+        else:
+            lines.append(f"NOTES_{day.isoformat()}: Met with the sponsor about item {i}; next steps: review")
+    lines.extend(COMPUTED_LINES)
+    return lines
+
+
+def write_project(projects_folders, phase, project, lines):
+    project_root = os.path.join(projects_folders, phase, project)
+    os.makedirs(project_root, exist_ok=True)
+    with open(os.path.join(project_root, project_info_filename), "w", encoding="utf-8") as outfile:
+        outfile.write("\n".join(lines) + "\n")
+    return project_root
+
+
+def time_parse_file(project_root, repeat):
+    """
+    Times `ProjectFileObject.parse_file` alone (no phase computation or file write-back).
+    """
+    best = None
+    for _ in range(repeat):
+        obj = ProjectFileObject.__new__(ProjectFileObject)
+        obj.project_root = project_root
+        obj.project_info_filepath = project_info_filename
+        obj.files = [project_info_filename]
+        obj.params_dict = project_params_dict.copy()
+        start_time = time.perf_counter()
+        obj.parse_file()
+        elapsed = time.perf_counter() - start_time
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def measure_tree_memory(projects_folders, projects, notes, rng):
+    """
+    Builds a synthetic tree of `projects` projects and measures the memory held by their
+    `ProjectFileObject`s, which a run keeps alive until the files are finalized.
+
+    Returns:
+        tuple[int, int, int]: Peak traced bytes, live traced bytes and live allocated blocks.
+    """
+    phases = ["1-Chartering", "2-Committed", "3-In Progress", "4-On Hold", "5-Rollout"]
+    project_roots = [write_project(projects_folders, phases[i % len(phases)], f"Project {i:05d}",
+                                   synthetic_project_lines(notes, rng))
+                     for i in range(projects)]
+    tracemalloc.start()
+    project_objects = [ProjectFileObject(project_root, [project_info_filename], project_info_filename)
+                       for project_root in project_roots]
+    snapshot = tracemalloc.take_snapshot()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sum(stat.count for stat in snapshot.statistics("filename"))
+    del project_objects
+    return peak, current, blocks
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark project info file parsing")
+    parser.add_argument('--notes', type=int, default=2000, help='Number of NOTES lines in the synthetic file')
+    parser.add_argument('--repeat', type=int, default=20, help='Number of timed repetitions (best is reported)')
+    parser.add_argument('--memory', type=int, default=0, metavar='PROJECTS',
+                        help='Measure the memory held by this many synthetic projects instead of timing')
+    parser.add_argument('--log-file', type=str, default=None,
+                        help='Log at DEBUG level to this file, as update_summary_v2 does (default: logging off)')
+    args = parser.parse_args()
+
+    if args.log_file:
+        logging.basicConfig(filename=args.log_file, level=logging.DEBUG)
+    else:
+        logging.disable(logging.CRITICAL)
+
+    set_date_obj(date(2025, 6, 1))
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        projects_folders = os.path.join(tmp, project_folders_root)
+        if args.memory:
+            peak, current, blocks = measure_tree_memory(projects_folders, args.memory, args.notes, rng)
+            print(f"{args.memory} projects x {args.notes} notes: peak {peak / 2**20:.1f} MiB, "
+                  f"held {current / 2**20:.1f} MiB in {blocks:,} blocks")
+        else:
+            project_root = write_project(projects_folders, "3-In Progress", "Benchmark Project",
+                                         synthetic_project_lines(args.notes, rng))
+            best = time_parse_file(project_root, args.repeat)
+            lines = args.notes + len(HEADER_LINES) + len(COMPUTED_LINES)
+            print(f"parse_file: {lines} lines in {best * 1000:.2f} ms ({lines / best:,.0f} lines/s)")
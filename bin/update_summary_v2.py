@@ -8,9 +8,21 @@ import os
 from datetime import datetime
 from logging.config import dictConfig
 
-from reports.summary import configure_report_path_globals, create_reports
-from reports.configurations import project_info_filename, project_folders_root
-from resources.project_file import ProjectFileObject, set_date_obj
+from reports.summary import (configure_report_path_globals, create_reports, reports_affected_by,
+                             update_analytics_history)
+from reports.backfill import backfill_dates, backfill_analytics_snapshots
+from reports.configurations import (project_info_filename, manifest_filename,
+                                    analytics_backfill_dirname, ANALYTICS_HISTORY,
+                                    WATCH_POLL_INTERVAL, REPORT_MODE, REPORT_TIMEOUT)
+from reports.history_store import AnalyticsHistoryStore, analytics_history_dir, history_columns
+from reports.executor import REPORT_MODES, ReportExecutor
+from resources.discovery import discover_projects, local_cache_dir, resolve_project_folders, list_files
+from resources.manifest import ProjectManifest
+from resources.watcher import ProjectWatcher
+from resources.project_file import (DeferredRead, build_age_refresh_result, build_project_result, build_project_results,
+                                   set_date_obj)
+from resources.retry import RetryScheduler
+from resources.write_back import WriteBackBatch, replay_journal, write_back_journal_path
 
 dictConfig({
     'version': 1,
@@ -34,6 +46,155 @@ dictConfig({
     }
 })
 
+
+def changed_record_keys(old_record, new_record):
+    """
+    Returns the record keys whose values differ between two versions of a project record.
+    A missing version (project added or removed) marks every key of the other as changed.
+    """
+    if old_record is None:
+        return set(new_record)
+    if new_record is None:
+        return set(old_record)
+    return {key for key in old_record.keys() | new_record.keys() if old_record.get(key) != new_record.get(key)}
+
+
+def uncached_projects(project_folders, manifest, project_records):
+    """
+    Passes through the project folders that need parsing. Folders whose manifest entry is still valid
+    are not yielded; their cached record (with refreshed ages) is stored in project_records instead.
+    Every folder gets a slot in project_records so records keep the discovery order.
+
+    Args:
+        project_folders: Iterable of (project_root, files) pairs.
+        manifest (ProjectManifest | None): The incremental manifest, or None for a full run.
+        project_records (dict): Project root -> record, filled in discovery order.
+
+    Yields:
+        tuple[str, list[str]]: The project folders to parse.
+    """
+    for root, files in project_folders:
+        if manifest is not None:
+            record = manifest.cached_record(root, files, today_date_obj)
+            if record is not None:
+                # Unchanged since the last run: reuse the cached record, only the ages were recomputed
+                logging.debug(f'Unchanged root={root}, using cached record')
+                project_records[root] = record
+                continue
+        project_records[root] = None  # filled in once parsed
+        yield root, files
+
+
+def backfill_projects(projects_tree_root, dates, workers=1):
+    """
+    Parses the portfolio once and writes a dated analytics summary snapshot for each backfill date,
+    without updating the project files or the regular reports.
+
+    Projects are parsed as of the last snapshot date (dates a project has not recorded yet are
+    stamped with it). Each snapshot holds the projects started by its date, in the phase they were
+    in then, with the ages of that date, all computed from the parsed phase dates and PHASE_CHANGE
+    lines (see `reports.backfill.backfill_analytics_snapshots`).
+
+    Args:
+        projects_tree_root (str): The root directory of the projects tree.
+        dates (list[date]): The snapshot dates.
+        workers (int): Number of worker processes used to parse project files.
+    """
+    project_records = []
+    retry_scheduler = RetryScheduler()
+    for result in build_project_results(discover_projects(projects_tree_root), workers=workers):
+        if isinstance(result, DeferredRead):
+            retry_scheduler.defer(result)
+        elif result is not None:
+            project_records.append(result.record)
+    project_records.extend(result.record for result in retry_scheduler.drain(build_project_result)
+                           if result is not None)
+    project_folders = resolve_project_folders(projects_tree_root)
+    history = AnalyticsHistoryStore(analytics_history_dir(project_folders)) if ANALYTICS_HISTORY else None
+    output_dir = os.path.join(project_folders, analytics_backfill_dirname)
+    paths = backfill_analytics_snapshots(project_records, dates, output_dir, history)
+    print(f"Backfilled {len(paths)} analytics snapshots ({dates[0]} to {dates[-1]}) "
+          f"of {len(project_records)} projects in {output_dir}")
+
+
+def watch_projects(projects_tree_root, project_results, project_records, manifest, follow_today, poll_interval,
+                   report_executor=None, write_back=None):
+    """
+    Keeps the project set in memory and regenerates reports as project files change.
+
+    Only the touched projects are parsed again and finalized, and only the reports whose
+    input keys changed are regenerated. When the calendar date rolls over (and no date
+    was injected), every project is parsed again since all ages change.
+
+    Args:
+        projects_tree_root (str): The root directory of the projects tree.
+        project_results (dict): Project root -> ProjectResult for the parsed projects.
+        project_records (dict): Project root -> legacy params record for every project.
+        manifest (ProjectManifest | None): The incremental manifest to keep up to date.
+        follow_today (bool): Recompute ages when the date changes.
+        poll_interval (float): Seconds between polls.
+        report_executor (ReportExecutor): Runs the regenerated reports (None: the default executor).
+        write_back (WriteBackBatch): Writes back the changes of the re-parsed projects (None: one journaled
+            in the local cache directory of the tree).
+    """
+    global today_date_obj
+    if write_back is None:
+        write_back = WriteBackBatch(write_back_journal_path(projects_tree_root))
+    watcher = ProjectWatcher(projects_tree_root, poll_interval)
+    watcher.poll()  # baseline after the initial run
+    print(f"Watching {watcher.project_folders} for changes (Ctrl-C to stop)...")
+    while True:
+        watcher.wait()
+        changed_roots, removed_roots = watcher.poll()
+        if follow_today and datetime.today().date() != today_date_obj:
+            today_date_obj = datetime.today().date()
+            logging.info(f"Date changed to {today_date_obj}, refreshing all projects")
+            set_date_obj(today_date_obj)
+            configure_report_path_globals(projects_tree_root, today_date_obj)
+            changed_roots = list(watcher.stamps)
+        if not changed_roots and not removed_roots:
+            continue
+
+        changed_keys = set()
+        for root in removed_roots:
+            logging.info(f"Project removed or moved: {root}")
+            project_results.pop(root, None)
+            changed_keys |= changed_record_keys(project_records.pop(root, None), None)
+        finalized_results = []
+        for root in changed_roots:
+            files = list_files(root)
+            if files is None or project_info_filename not in files:
+                continue
+            result = build_project_result(root, files)
+            if isinstance(result, DeferredRead):
+                # Timed out: forget the stamp so the next poll picks the project up again
+                watcher.forget([root])
+                continue
+            if result is None:
+                continue
+            changed_keys |= changed_record_keys(project_records.get(root), result.record)
+            project_results[root] = result
+            project_records[root] = result.record
+            finalized_results.append(result)
+        write_back.commit(finalized_results)
+        watcher.restamp([result.project_root for result in finalized_results])
+
+        if not changed_keys.isdisjoint(history_columns):
+            update_analytics_history(list(project_records.values()))
+        reports_list = reports_affected_by(changed_keys)
+        logging.info(f"{len(changed_roots)} changed, {len(removed_roots)} removed projects; "
+                     f"regenerating {[func.__name__ for func in reports_list]}")
+        if reports_list:
+            create_reports(list(project_records.values()), reports_list, report_executor)
+        if manifest is not None:
+            for result in finalized_results:
+                manifest.update(result.project_root, result.files, result.record)
+            manifest.prune(set(project_records))
+            manifest.save()
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] Updated {len(finalized_results)} projects, "
+              f"removed {len(removed_roots)}, regenerated {len(reports_list)} reports.")
+
+
 if __name__ == "__main__":
     logging.info(f"Starting update_summary Version {__version__}")
     print(f"Starting update_summary Version {__version__}")
@@ -43,6 +204,23 @@ if __name__ == "__main__":
                         help='Set environment path from environment variables')
     parser.add_argument('--inject-date', type=str, default=None,
                         help='Inject a specific date (YYYY-MM-DD) instead of today\'s date')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Reuse cached records for project files unchanged since the last run')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of worker processes used to parse project files')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running and regenerate the affected reports when project files change')
+    parser.add_argument('--poll-interval', type=float, default=WATCH_POLL_INTERVAL,
+                        help='Seconds between change polls in watch mode')
+    parser.add_argument('--report-mode', choices=REPORT_MODES, default=REPORT_MODE,
+                        help='Run the reports one after another, or concurrently in threads or processes')
+    parser.add_argument('--report-timeout', type=float, default=REPORT_TIMEOUT,
+                        help='Seconds a report may take before it is abandoned (thread and process modes)')
+    parser.add_argument('--date-range', nargs=2, metavar=('START', 'END'), default=None,
+                        help='Write dated analytics snapshots for START to END (YYYY-MM-DD) '
+                             'without updating the project files or reports')
+    parser.add_argument('--step', type=int, default=1,
+                        help='Days between the snapshots of --date-range')
     args = parser.parse_args()
 
     global today_date_obj
@@ -58,32 +236,88 @@ if __name__ == "__main__":
             logging.info(f"Injected date for testing: {today_date_obj}")
     else:
         raise ValueError("Invalid environment specified. Use 'prod' or 'test'.")
+    backfill_range = None
+    if args.date_range:
+        backfill_range = backfill_dates(datetime.strptime(args.date_range[0], '%Y-%m-%d').date(),
+                                        datetime.strptime(args.date_range[1], '%Y-%m-%d').date(), args.step)
+        today_date_obj = backfill_range[-1]
+        logging.info(f"Backfilling {len(backfill_range)} dates from {backfill_range[0]} to {today_date_obj}")
     logging.info(f"Project folders root: {projects_tree_root}")
     set_date_obj(today_date_obj)
     configure_report_path_globals(projects_tree_root, today_date_obj)
 
-    project_objects_list = []
-    projects_processed_counter = 0
+    # Finish or roll back a write-back interrupted in a previous run before reading any project file
+    write_back = WriteBackBatch(write_back_journal_path(projects_tree_root))
+    replayed = replay_journal(write_back.journal_path)
+    if replayed is not None:
+        print(f"Interrupted write-back of {replayed[1]} project files {replayed[0]}.")
+    if backfill_range is not None:
+        backfill_projects(projects_tree_root, backfill_range, workers=args.workers)
+        raise SystemExit(0)
 
-    # Walk the file system from the root directory
-    for root, dirs, files in os.walk(projects_tree_root, topdown=False):
-        if project_info_filename not in files or project_folders_root not in root:
-            logging.warning(f"Skipping {root}")
+    manifest = None
+    if args.incremental:
+        manifest = ProjectManifest.load(os.path.join(local_cache_dir(projects_tree_root), manifest_filename))
+
+    project_results = {}  # project root -> ProjectResult, for the projects parsed in this run
+    project_records = {}  # project root -> record, for every project in discovery order
+
+    # Discover <Projects Folders>/<phase>/<project> folders without walking below the project level
+    project_folders = uncached_projects(discover_projects(projects_tree_root), manifest, project_records)
+    retry_scheduler = RetryScheduler()
+    for result in build_project_results(project_folders, workers=args.workers):
+        if isinstance(result, DeferredRead):
+            # Timed out: keep going with the rest of the portfolio, retry it at the end
+            retry_scheduler.defer(result)
+            continue
+        if result is None:
             continue
+        print(f"Processing file {len(project_results): 3} ({result.phase}: {result.project})")
+        logging.debug(f'Processing root={result.project_root}: {result.record}')
+        project_results[result.project_root] = result
+        project_records[result.project_root] = result.record
+    for result in retry_scheduler.drain(build_project_result):
+        if result is None:
+            continue
+        print(f"Processing file {len(project_results): 3} ({result.phase}: {result.project}) [retried]")
+        project_results[result.project_root] = result
+        project_records[result.project_root] = result.record
+    for line in retry_scheduler.summary():
+        logging.info(f"Retried {line}")
+        print(f"Retried {line}")
+    seen_project_roots = set(project_records)
+    project_records = {root: record for root, record in project_records.items() if record is not None}
+    # Cached projects are not parsed again, but their refreshed ages are still written back
+    refreshed_results = []
+    if manifest is not None:
+        for root, (files, age_keys) in manifest.stale_ages.items():
+            result = build_age_refresh_result(root, files, project_records[root], age_keys)
+            if result is not None:
+                refreshed_results.append(result)
 
-        try:
-            proj = ProjectFileObject(root, files, project_info_filename)
-        except ValueError as e:
-            logging.warning(f"[{e}] Skipping {root}")
-        print(f"Processing file {projects_processed_counter: 3} ({proj.phase}: {proj.project})")
-        logging.debug(f'Processing root={root}: {str(proj)}')
-        project_objects_list.append(proj)
-        projects_processed_counter += 1
-
-    logging.info(f"Processed {len(project_objects_list)} projects.")
-    print(f"Processed {projects_processed_counter:4} projects.")
-    create_reports([p.get_legacy_params() for p in project_objects_list])
-    res = {obj.uuid: obj.finalize_file() for obj in tqdm.tqdm(project_objects_list, desc="Updating Project Files")}
+    logging.info(f"Processed {len(project_records)} projects ({len(project_results)} parsed).")
+    print(f"Processed {len(project_records):4} projects.")
+    update_analytics_history(list(project_records.values()))
+    report_executor = ReportExecutor(mode=args.report_mode, timeout=args.report_timeout)
+    create_reports(list(project_records.values()), executor=report_executor)
+    with tqdm.tqdm(total=len(project_results) + len(refreshed_results), desc="Updating Project Files") as progress_bar:
+        res = write_back.commit(list(project_results.values()) + refreshed_results, progress=progress_bar.update)
     logging.debug(f"Finalized files: {res}")
+    updated_count = sum(any(changes) for changes in res.values())
+    print(f"Project files updated: {updated_count} ({len(res) - updated_count} unchanged)")
+    if manifest is not None:
+        for result in list(project_results.values()) + refreshed_results:
+            manifest.update(result.project_root, result.files, result.record)
+        manifest.prune(seen_project_roots)
+        manifest.save()
+        print(f"Incremental run: {manifest.hits} unchanged, {manifest.misses} parsed.")
+    if args.watch:
+        try:
+            watch_projects(projects_tree_root, project_results, project_records,
+                           manifest, follow_today=args.inject_date is None, poll_interval=args.poll_interval,
+                           report_executor=report_executor, write_back=write_back)
+        except KeyboardInterrupt:
+            logging.info("Watch mode stopped")
+            print("Stopped watching.")
     print(
         f'Reports complete! (see reports in "https://f5.sharepoint.com/:f:/r/sites/salesandmktg/mktg/Enterprise%20Analytics/Shared%20Documents/Projects%20Folders_Pre_ADO?csf=1&web=1")')
@@ -0,0 +1,143 @@
+import logging
+import os
+from datetime import date, timedelta
+
+import numpy as np
+
+from reports.configurations import *
+from reports.output import write_if_changed
+from reports.summary import analytics_summary_frame
+from resources.phase_history import NOT_STARTED, UNKNOWN_PHASE, PhaseHistoryStore
+
+# Last refresh day of an age that no phase interval has refreshed yet
+_NOT_REFRESHED = np.iinfo(np.int64).min
+
+
+def backfill_dates(start_date, end_date, step_days=1):
+    """
+    Returns the snapshot dates of a backfill, from `start_date` to `end_date` inclusive.
+
+    Args:
+        start_date (date): The first snapshot date.
+        end_date (date): The last possible snapshot date.
+        step_days (int): Days between snapshots.
+
+    Returns:
+        list[date]: The snapshot dates.
+
+    Raises:
+        ValueError: If the range is empty or the step is not positive.
+    """
+    if step_days < 1:
+        raise ValueError(f"Backfill step must be at least 1 day, got {step_days}")
+    if end_date < start_date:
+        raise ValueError(f"Backfill range ends ({end_date}) before it starts ({start_date})")
+    return [start_date + timedelta(days=offset) for offset in range(0, (end_date - start_date).days + 1, step_days)]
+
+
+def _record_date_column(project_records_list, key):
+    return np.array([value if isinstance(value := lines.get(key), date) else None for lines in project_records_list],
+                    dtype="datetime64[D]")
+
+
+def phase_age_matrix(project_records_list, dates, phase_history=None):
+    """
+    Computes the date-derived ages of every project (see `phase_age_keys`) as of every snapshot
+    date, one array operation per age key.
+
+    An age is refreshed while a project is in a phase that lists it and frozen when the project
+    leaves such a phase, as the phase metrics do on each run: as of a date, it is the days from its
+    date to that date, or to the end of the last interval refreshing it before that date. It is NaN
+    when the project had not reached its date or a phase refreshing it yet.
+
+    Args:
+        project_records_list (list[dict]): The project records.
+        dates (list[date]): The snapshot dates.
+        phase_history (PhaseHistoryStore): The phase intervals of the records (built if not given).
+
+    Returns:
+        dict[str, np.ndarray]: Age key -> float array of the ages with one row per record and one
+        column per date.
+    """
+    if phase_history is None:
+        phase_history = PhaseHistoryStore(project_records_list)
+    snapshot_days = np.array(dates, dtype="datetime64[D]").astype(np.int64)[np.newaxis, :]
+    starts = phase_history.start.astype(np.int64)[:, np.newaxis]
+    ends = phase_history.end.astype(np.int64)[:, np.newaxis]
+    # last day each interval counts towards its ages as of each date, NOT_REFRESHED before it started
+    refreshed_to = np.where(np.isnat(phase_history.end)[:, np.newaxis], snapshot_days,
+                            np.minimum(snapshot_days, ends))
+    refreshed_to[~np.isnat(phase_history.start)[:, np.newaxis] & (starts > snapshot_days)] = _NOT_REFRESHED
+    refreshing_phases = {}  # (date key, age key) -> codes of the phases refreshing it
+    for phase, age_keys in phase_age_keys.items():
+        for keys in age_keys:
+            refreshing_phases.setdefault(keys, []).append(project_phases[phase])
+    matrix = {}
+    for (date_key, age_key), phase_codes in refreshing_phases.items():
+        intervals = np.flatnonzero(np.isin(phase_history.phase, phase_codes))
+        last_refresh = np.full((len(project_records_list), len(dates)), _NOT_REFRESHED, dtype=np.int64)
+        np.maximum.at(last_refresh, phase_history.project_index[intervals], refreshed_to[intervals])
+        start_dates = _record_date_column(project_records_list, date_key)
+        ages = (last_refresh - start_dates.astype(np.int64)[:, np.newaxis]).astype(np.float64)
+        ages[np.isnat(start_dates)[:, np.newaxis] | (last_refresh == _NOT_REFRESHED) | (ages < 0)] = np.nan
+        matrix[age_key] = ages
+    return matrix
+
+
+def backfill_analytics_snapshots(project_records_list, dates, output_dir, history=None):
+    """
+    Writes an analytics summary snapshot (as `create_analytics_summary_csv` would) for every
+    snapshot date, as the portfolio was on that date: the projects that had started by then, in
+    the phase they were in (see `PhaseHistoryStore.phases_as_of`), with the ages of that date (see
+    `phase_age_matrix`). A project is left out of the snapshots before its first recorded phase
+    date, since its phase is not known then. Dates and durations recorded after the snapshot date
+    are left empty. The records are parsed once. Project files are not modified.
+
+    Args:
+        project_records_list (list[dict]): The project records.
+        dates (list[date]): The snapshot dates.
+        output_dir (str): The directory of the dated snapshots (created if needed).
+        history (AnalyticsHistoryStore): Also stores each snapshot in this history store, if given.
+
+    Returns:
+        list[str]: The snapshot paths, in date order.
+    """
+    frame = analytics_summary_frame(project_records_list)
+    phase_history = PhaseHistoryStore(project_records_list)
+    phases = phase_history.phases_as_of(dates)
+    matrix = phase_age_matrix(project_records_list, dates, phase_history)
+    current_phases = frame["Phases"].to_numpy(dtype=object)
+    date_columns = {key: _record_date_column(project_records_list, key) for key in date_params
+                    if key != "Report_Date"}
+    duration_keys = [keys for phase_keys in phase_duration_keys.values() for keys in phase_keys]
+    difference_keys = [keys for phase_keys in phase_difference_keys.values() for keys in phase_keys]
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for column, snapshot_date in enumerate(dates):
+        snapshot_day = np.datetime64(snapshot_date, "D")
+        rows = np.flatnonzero(phases[:, column] != NOT_STARTED)
+        phase_names = np.array([index_project_phases.get(code) for code in phases[rows, column]], dtype=object)
+        unknown = phases[rows, column] == UNKNOWN_PHASE
+        phase_names[unknown] = current_phases[rows][unknown]
+        snapshot = frame.iloc[rows].copy()
+        snapshot["Phases"] = phase_names
+        snapshot["COMPUTED_PREVIOUS_PHASE"] = phase_names
+        for age_key, ages in matrix.items():
+            snapshot[age_key] = ages[rows, column]
+        recorded_later = {key: values[rows] > snapshot_day for key, values in date_columns.items()}
+        for key, later in recorded_later.items():
+            snapshot.loc[later, key] = None
+        for start_key, end_key, days_key in duration_keys:
+            snapshot.loc[recorded_later[start_key] | recorded_later[end_key], days_key] = None
+        for days_key, subtracted_key, difference_key in difference_keys:
+            snapshot.loc[snapshot[days_key].isna() | snapshot[subtracted_key].isna(), difference_key] = None
+        snapshot["Report_Date"] = snapshot_date
+        path = os.path.join(output_dir, f"analytics_summary_{snapshot_date.strftime(DATE_FMT)}.csv")
+        write_if_changed(path, snapshot.to_csv(index=False), newline='')
+        if history is not None:
+            history.append(snapshot, snapshot_date, flush=False)
+        paths.append(path)
+    if history is not None:
+        history.flush()
+    logging.info(f"Backfilled {len(paths)} analytics snapshots of {len(project_records_list)} projects in {output_dir}")
+    return paths
@@ -0,0 +1,101 @@
+import hashlib
+import logging
+import os
+import threading
+
+from resources.notes import ProjectNotes
+
+# Bump when the owner block layout or its inputs digest changes, so blocks rendered by older code are not reused
+BLOCK_CACHE_VERSION = 2
+
+
+class OwnerBlockCache:
+    def __init__(self, cache_dir):
+        """
+        Caches rendered owner blocks on disk between runs.
+
+        Each block is stored in its own file, named by a hash of the block identity (owner,
+        owner key and block options) and holding the digest of the inputs it was rendered from.
+        A block is reused while the digest of its owner's records (and of the notes in the
+        recent notes window) is unchanged, so only the owners whose projects changed are
+        rendered again; a new report date alone does not invalidate the blocks. One file per
+        block keeps concurrent report threads and worker processes from overwriting each other.
+
+        Args:
+            cache_dir (str): The directory holding the cached blocks (created on first write),
+                outside the synced projects tree (see `resources.discovery.local_cache_dir`).
+        """
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def block_key(*identity):
+        """
+        Returns the cache file name of a block from its identity (owner, owner key, options).
+        """
+        return hashlib.sha256("\0".join(repr(part) for part in identity).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def inputs_digest(records, keys, notes_since):
+        """
+        Returns the digest of the inputs of a block: the given keys of each of the owner's
+        records, in block order, and how many of each record's notes are in the recent notes
+        window (the block lists those).
+
+        Args:
+            records (list[dict]): The owner's records, in the order the block lists them.
+            keys (list[str]): The record keys the block reads.
+            notes_since (date): The first day of the recent notes window.
+
+        Returns:
+            str: The hex digest.
+        """
+        digest = hashlib.sha256(f"{BLOCK_CACHE_VERSION}".encode("utf-8"))
+        for lines in records:
+            for key in keys:
+                digest.update(f"\0{key}\0{lines.get(key)}".encode("utf-8"))
+            notes = lines.get("NOTES")
+            if isinstance(notes, ProjectNotes):
+                digest.update(f"\0{len(notes.recent(notes_since))}".encode("utf-8"))
+            digest.update(b"\1")
+        return digest.hexdigest()
+
+    def get(self, block_key, inputs_digest):
+        """
+        Returns the cached block if it was rendered from the same inputs, else None.
+        """
+        try:
+            with open(os.path.join(self.cache_dir, block_key), "r", encoding="utf-8", newline="") as infile:
+                cached_digest = infile.readline().rstrip("\n")
+                block = infile.read() if cached_digest == inputs_digest else None
+        except OSError:
+            block = None
+        with self._lock:
+            if block is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return block
+
+    def put(self, block_key, inputs_digest, block):
+        """
+        Stores a rendered block (atomically, through a temp file and rename).
+        """
+        block_path = os.path.join(self.cache_dir, block_key)
+        tmp_path = f"{block_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8", newline="") as outfile:
+                outfile.write(inputs_digest + "\n")
+                outfile.write(block)
+            os.replace(tmp_path, block_path)
+        except OSError as e:
+            logging.warning(f"Unable to cache owner block {block_path} ({e})")
+
+    def stats(self):
+        """
+        Returns the hit and miss counters.
+        """
+        return {"hits": self.hits, "misses": self.misses}
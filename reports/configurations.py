@@ -1,3 +1,5 @@
+import os
+
 today_date_obj = None
 project_folders_root = "Projects Folders_Pre_ADO"
 project_info_filename = "PROJECT_INFO.txt"
@@ -17,10 +19,38 @@ stakeholders_views_active_path = None
 title_phase_views_path = None
 stakeholder_list_path = None
 kanban_board_path = None
+flow_report_path = None
 
 NOTES_DELIMITER = "**;**"
 DATE_FMT = "%Y-%m-%d"
+RECENT_NOTES_DAYS = 400  # notes of the last days shown in the owner views
 FILE_RETRY = 4  # max retries for file read
+RETRY_BASE_DELAY = 1.0  # seconds, backoff base for retrying timed-out file reads
+RETRY_MAX_DELAY = 30.0  # seconds, upper bound for a single retry backoff
+RETRY_WORKERS = 8  # max timed-out file reads retried concurrently
+DISCOVERY_WORKERS = 8  # max concurrent directory listings during project discovery
+# Local directory for the caches kept between runs, outside the synced projects tree (one subdirectory per tree)
+local_cache_root = os.getenv("PROJECT_PHASES_CACHE_DIRECTORY",
+                             os.path.join(os.path.expanduser("~"), ".cache", "project_phases_reports"))
+manifest_filename = "project_manifest.json"  # incremental run manifest, in the local cache directory
+owner_block_cache_dirname = "owner_blocks"  # rendered owner blocks reused between runs, in the local cache directory
+OWNER_BLOCK_CACHE = True  # reuse owner blocks whose records are unchanged since they were rendered
+WRITE_BACK_VOLATILE_KEYS = ["Report_Date"]  # updates to these keys alone do not rewrite a project file
+WRITE_BACK_WORKERS = 8  # max concurrent project file reads and writes when the run's changes are written back
+write_back_journal_filename = "write_back_journal.json"  # journal of an in-flight write-back, in the local cache directory
+analytics_backfill_dirname = "analytics_backfill"  # dated analytics snapshots written by --date-range, in the Projects Folders root
+analytics_history_dirname = "analytics_history"  # columnar analytics snapshots keyed by Report_Date, in the local cache directory
+# Directory of the analytics history store instead of the one in the local cache directory (e.g. a backed-up local disk)
+analytics_history_directory = os.getenv("PROJECT_PHASES_HISTORY_DIRECTORY")
+ANALYTICS_HISTORY_COMPACT_SEGMENTS = 32  # per-run segments of a month merged into one once there are more
+ANALYTICS_HISTORY = True  # store the analytics records of every run (and backfilled date) in the history store
+PROJECT_POOL_CHUNKSIZE = 8  # projects sent to a worker process at a time with --workers
+PHASE_METRIC_BATCH_SIZE = 1000  # projects whose phase metrics are computed together in a serial run
+WATCH_POLL_INTERVAL = 2.0  # seconds between polls in watch mode
+WATCH_SETTLE_SECONDS = 0.5  # wait after an inotify wake-up before polling
+REPORT_MODE = "thread"  # how create_reports runs the reports: "serial", "thread" or "process"
+REPORT_WORKERS = None  # max reports generated at once (None: one per report)
+REPORT_TIMEOUT = 600.0  # seconds a report may take before it is abandoned
 
 """
 These are the data elements to populate columns of the output csv for the status spreadsheet
@@ -82,6 +112,57 @@ project_params_dict = {
     "COMPUTED_PROJECT_INFO_LINK": None
 }
 
+# Fields holding typed values; only these are parsed as dates or integers when read from a file
+date_params = {
+    "COMPUTED_PROJECT_START_DATE",
+    "COMPUTED_PROJECT_IN_PROGRESS_DATE",
+    "COMPUTED_PROJECT_ON_HOLD_DATE",
+    "COMPUTED_PROJECT_ROLLOUT_DATE",
+    "COMPUTED_PROJECT_END_DATE",
+    "COMPUTED_DATE_IN_STAGE_0_IDEAS",
+    "COMPUTED_DATE_IN_STAGE_1_CHARTERING",
+    "COMPUTED_DATE_IN_STAGE_2_COMMITTED",
+    "COMPUTED_DATE_IN_STAGE_3_IN_PROGRESS",
+    "COMPUTED_DATE_IN_STAGE_4_ON_HOLD",
+    "COMPUTED_DATE_IN_STAGE_5_ROLLOUT",
+    "COMPUTED_DATE_IN_STAGE_6_COMPLETED",
+    "COMPUTED_DATE_IN_STAGE_7_MAINTENANCE",
+    "COMPUTED_DATE_IN_STAGE_9_AD_HOC",
+    "Report_Date"
+}
+int_params = {
+    "COMPUTED_AGE_DAYS",
+    "COMPUTED_IN_PROGRESS_AGE_DAYS",
+    "COMPUTED_DAYS_IN_STAGE_0_IDEAS",
+    "COMPUTED_DAYS_IN_STAGE_1_CHARTERING",
+    "COMPUTED_DAYS_IN_STAGE_2_COMMITTED",
+    "COMPUTED_DAYS_IN_STAGE_3_IN_PROGRESS",
+    "COMPUTED_DAYS_IN_STAGE_4_ON_HOLD",
+    "COMPUTED_DAYS_IN_STAGE_5_ROLLOUT",
+    "COMPUTED_DAYS_IN_STAGE_6_COMPLETED",
+    "COMPUTED_DAYS_IN_STAGE_7_MAINTENANCE",
+    "COMPUTED_DAYS_IN_STAGE_9_AD_HOC",
+    "COMPUTED_COMPLETION_TIME_DAYS",
+    "COMPUTED_TIME_ON_HOLD_DAYS",
+    "COMPUTED_IN_PROGRESS_TO_COMPLETION_DAYS",
+    "COMPUTED_COMPLETION_TIME_MINUS_HOLD_DAYS",
+    "COMPUTED_COMMIT_TO_COMPLETION_DAYS",
+    "COMPUTED_CHARTER_TO_COMPLETION_DAYS"
+}
+# Fields kept in the analytics history store besides the date_params and int_params; their values repeat
+# across projects and snapshots, so they are stored dictionary-encoded
+history_dictionary_params = [
+    "Project_ID",
+    "Project",
+    "Phases",
+    "ANALYTICS_DS_OWNER",
+    "BUSINESS_SPONSOR",
+    "DATA_OFFICE_SPONSOR",
+    "MISSION_ALIGNMENT",
+    "T-SHIRT_SIZE",
+    "COMPUTED_PREVIOUS_PHASE"
+]
+
 """
 Map columns to data elements
   One entry for each of the project_params_dict keys
@@ -159,6 +240,60 @@ project_phases = {
 # keep a reverse map for lookup
 index_project_phases = {v: k for k, v in project_phases.items()}
 
+# Date-derived ages refreshed on every run for each phase: (date key, age key). The first pair is the
+# date the project entered the phase and its days in the phase; a missing date is recorded as today.
+phase_age_keys = {
+    "0-Ideas": [("COMPUTED_DATE_IN_STAGE_0_IDEAS", "COMPUTED_DAYS_IN_STAGE_0_IDEAS")],
+    "1-Chartering": [("COMPUTED_DATE_IN_STAGE_1_CHARTERING", "COMPUTED_DAYS_IN_STAGE_1_CHARTERING"),
+                     ("COMPUTED_PROJECT_START_DATE", "COMPUTED_AGE_DAYS")],
+    "2-Committed": [("COMPUTED_DATE_IN_STAGE_2_COMMITTED", "COMPUTED_DAYS_IN_STAGE_2_COMMITTED"),
+                    ("COMPUTED_PROJECT_START_DATE", "COMPUTED_AGE_DAYS")],
+    "3-In Progress": [("COMPUTED_DATE_IN_STAGE_3_IN_PROGRESS", "COMPUTED_DAYS_IN_STAGE_3_IN_PROGRESS"),
+                      ("COMPUTED_PROJECT_START_DATE", "COMPUTED_AGE_DAYS"),
+                      ("COMPUTED_PROJECT_IN_PROGRESS_DATE", "COMPUTED_IN_PROGRESS_AGE_DAYS")],
+    "4-On Hold": [("COMPUTED_DATE_IN_STAGE_4_ON_HOLD", "COMPUTED_DAYS_IN_STAGE_4_ON_HOLD"),
+                  ("COMPUTED_PROJECT_START_DATE", "COMPUTED_AGE_DAYS"),
+                  ("COMPUTED_PROJECT_IN_PROGRESS_DATE", "COMPUTED_IN_PROGRESS_AGE_DAYS")],
+    "5-Rollout": [("COMPUTED_DATE_IN_STAGE_5_ROLLOUT", "COMPUTED_DAYS_IN_STAGE_5_ROLLOUT"),
+                  ("COMPUTED_PROJECT_IN_PROGRESS_DATE", "COMPUTED_IN_PROGRESS_AGE_DAYS"),
+                  ("COMPUTED_PROJECT_START_DATE", "COMPUTED_AGE_DAYS")],
+    "6-Completed": [("COMPUTED_DATE_IN_STAGE_6_COMPLETED", "COMPUTED_DAYS_IN_STAGE_6_COMPLETED"),
+                    ("COMPUTED_PROJECT_START_DATE", "COMPUTED_AGE_DAYS")],
+    "7-Maintenance": [("COMPUTED_DATE_IN_STAGE_7_MAINTENANCE", "COMPUTED_DAYS_IN_STAGE_7_MAINTENANCE")],
+    "9-Ad Hoc": [("COMPUTED_DATE_IN_STAGE_9_AD_HOC", "COMPUTED_DAYS_IN_STAGE_9_AD_HOC"),
+                 ("COMPUTED_PROJECT_START_DATE", "COMPUTED_AGE_DAYS"),
+                 ("COMPUTED_PROJECT_IN_PROGRESS_DATE", "COMPUTED_IN_PROGRESS_AGE_DAYS")],
+}
+# Dates recorded once, the first time a project is seen in a phase
+phase_stamp_keys = {
+    "6-Completed": ["COMPUTED_PROJECT_END_DATE"],
+}
+# Durations recorded once both dates are known, for each phase: (start date key, end date key, days key)
+phase_duration_keys = {
+    "6-Completed": [("COMPUTED_PROJECT_START_DATE", "COMPUTED_PROJECT_END_DATE", "COMPUTED_COMPLETION_TIME_DAYS"),
+                    ("COMPUTED_DATE_IN_STAGE_3_IN_PROGRESS", "COMPUTED_PROJECT_END_DATE",
+                     "COMPUTED_IN_PROGRESS_TO_COMPLETION_DAYS"),
+                    ("COMPUTED_DATE_IN_STAGE_2_COMMITTED", "COMPUTED_PROJECT_END_DATE",
+                     "COMPUTED_COMMIT_TO_COMPLETION_DAYS"),
+                    ("COMPUTED_DATE_IN_STAGE_1_CHARTERING", "COMPUTED_PROJECT_END_DATE",
+                     "COMPUTED_CHARTER_TO_COMPLETION_DAYS")],
+}
+# Day counts recorded once both are known, for each phase: (days key, days key subtracted, difference key)
+phase_difference_keys = {
+    "6-Completed": [("COMPUTED_IN_PROGRESS_TO_COMPLETION_DAYS", "COMPUTED_DAYS_IN_STAGE_4_ON_HOLD",
+                     "COMPUTED_COMPLETION_TIME_MINUS_HOLD_DAYS")],
+}
+
+# Order of the owner and stakeholder blocks in the reports: "name" (alphabetical), "last_name"
+# (alphabetical by last name) or "projects" (most projects first, then alphabetical)
+OWNER_SORT_ORDER = "name"
+
+# Report generation timestamp in the weekly owner views, ignored when checking if a report changed
+UPDATED_TIMESTAMP_RE = r"\(updated: [^)]*\)"
+
+# Project name prefix of the GTM R1 projects, split out in the GTM R1 weekly owner view
+GTM_R1_PREFIX = "GTM R1 -"
+
 # Ordering determined by Data Accelerator Analysts for Owners Reports etc.
 active_projects_order = [
     "3-In Progress",
@@ -169,6 +304,39 @@ active_projects_order = [
     "5-Rollout"
 ]
 
+# Flow report: phases of the cumulative flow, from the earliest to the last stage of the workflow (Ad Hoc
+# alongside In Progress), and the color of each band
+flow_phase_order = [
+    "0-Ideas",
+    "1-Chartering",
+    "2-Committed",
+    "3-In Progress",
+    "9-Ad Hoc",
+    "4-On Hold",
+    "5-Rollout",
+    "6-Completed",
+    "7-Maintenance"
+]
+flow_phase_colors = {
+    "0-Ideas": "#d9d4cf",
+    "1-Chartering": "#c6c7c4",
+    "2-Committed": "#a2999e",
+    "3-In Progress": "#846a6a",
+    "9-Ad Hoc": "#a88585",
+    "4-On Hold": "#e0c9a6",
+    "5-Rollout": "#8fa3a6",
+    "6-Completed": "#5b6c70",
+    "7-Maintenance": "#353b3c"
+}
+# Completion durations whose distribution is reported
+flow_cycle_time_keys = [
+    "COMPUTED_COMPLETION_TIME_DAYS",
+    "COMPUTED_IN_PROGRESS_TO_COMPLETION_DAYS",
+    "COMPUTED_COMMIT_TO_COMPLETION_DAYS"
+]
+FLOW_REPORT_PERCENTILES = [50, 85, 95]  # percentiles of the cycle-time and WIP age distributions
+FLOW_REPORT_TREND_PERCENTILE = 85  # WIP age percentile followed week by week
+
 mermaid_kanban_prefix = """
 <!doctype html>
 <html lang="en">
@@ -0,0 +1,191 @@
+import logging
+import multiprocessing
+import multiprocessing.pool
+import queue
+import time
+import traceback
+
+from reports.configurations import *
+from reports.output import start_output_log, end_output_log
+
+REPORT_MODES = ("serial", "thread", "process")
+
+# Seconds between checks of the running reports for completion and timeouts
+_POLL_INTERVAL = 0.05
+
+# Records shared with the reports run in a worker process and the queue their starts are
+# announced on, set once by the pool initializer
+_worker_records = None
+_worker_started = None
+
+
+def _init_report_worker(project_records_list, started, initializer, initargs):
+    global _worker_records, _worker_started
+    _worker_records = project_records_list
+    _worker_started = started
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def _call_report(report_func, project_records_list, started=None, index=None):
+    """
+    Runs one report, returning its duration, the formatted traceback if it failed and the
+    (path, changed) report files it wrote. When a `started` queue is given, (index, output log)
+    is put on it as the report starts.
+    """
+    start_time = time.perf_counter()
+    output_log = start_output_log()
+    if started is not None:
+        started.put((index, output_log))
+    try:
+        report_func(project_records_list)
+        error = None
+    except Exception:
+        error = traceback.format_exc()
+    return time.perf_counter() - start_time, error, end_output_log()
+
+
+def _run_worker_report(report_func, index):
+    # the output log stays in the worker: a timed-out worker process is terminated instead
+    _worker_started.put((index, None))
+    return _call_report(report_func, _worker_records)
+
+
+class ReportExecutor:
+    def __init__(self, mode=REPORT_MODE, max_workers=REPORT_WORKERS, timeout=REPORT_TIMEOUT):
+        """
+        Runs independent report functions concurrently over one shared, read-only set of
+        project records.
+
+        Each report only reads the records and writes its own output file(s), so reports can
+        run side by side. In "thread" mode they share the records in this process; in "process"
+        mode the records are handed to each worker process once, when it starts. A failing or
+        timed-out report is recorded and does not stop the others.
+
+        The pools come from `multiprocessing.pool` rather than `concurrent.futures` because a
+        report that overruns its timeout must not keep the run alive: thread pool workers are
+        daemon threads, and a process pool can be terminated. A timed-out thread cannot be
+        stopped, so its output log is discarded: the report files it writes after the timeout
+        are dropped (see `reports.output.OutputLog`).
+
+        Args:
+            mode (str): "serial", "thread" or "process".
+            max_workers (int): Maximum number of reports run at once (None: one per report).
+            timeout (float): Seconds each report may take, counted from when the report starts
+                running, not from when it is queued (None: no limit). Not enforced in "serial" mode.
+        """
+        if mode not in REPORT_MODES:
+            raise ValueError(f"Invalid report mode {mode}. Use one of {REPORT_MODES}")
+        self.mode = mode
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+    def run(self, report_funcs, project_records_list, initializer=None, initargs=(), progress=None):
+        """
+        Runs the reports and collects their outcomes.
+
+        Args:
+            report_funcs (list): Report functions, each called as report_func(project_records_list).
+                In "process" mode they must be module-level functions.
+            project_records_list (list[dict]): The project records, not modified by the reports.
+            initializer: Called as initializer(*initargs) in each worker process before any
+                report runs (e.g. to configure the report paths). Unused in the other modes.
+            initargs (tuple): Arguments for the initializer.
+            progress: Optional callable invoked once per finished report.
+
+        Returns:
+            list[dict]: One outcome per report, in report order, with the keys "report" (name),
+            "seconds" (duration, or the time from its start to its timeout), "error"
+            (traceback or timeout message, None on success) and "outputs" (the (path, changed)
+            report files written; changed is False for files left untouched as unchanged).
+        """
+        if self.mode == "serial" or len(report_funcs) == 0:
+            outcomes = []
+            for report_func in report_funcs:
+                outcomes.append(self._outcome(report_func, *_call_report(report_func, project_records_list)))
+                if progress is not None:
+                    progress()
+            return outcomes
+
+        workers = self.max_workers or len(report_funcs)
+        if self.mode == "thread":
+            started = queue.Queue()
+            pool = multiprocessing.pool.ThreadPool(workers)
+            pending = [pool.apply_async(_call_report, (report_func, project_records_list, started, index))
+                       for index, report_func in enumerate(report_funcs)]
+        else:
+            started = multiprocessing.Queue()
+            pool = multiprocessing.Pool(workers, initializer=_init_report_worker,
+                                        initargs=(project_records_list, started, initializer, initargs))
+            pending = [pool.apply_async(_run_worker_report, (report_func, index))
+                       for index, report_func in enumerate(report_funcs)]
+
+        outcomes = [None] * len(report_funcs)
+        start_times = {}  # report index -> when its start was seen
+        output_logs = {}  # report index -> output log (thread mode)
+        timed_out = set()
+        try:
+            while None in outcomes:
+                self._note_started(started, start_times, output_logs)
+                now = time.perf_counter()
+                for index, (report_func, async_result) in enumerate(zip(report_funcs, pending)):
+                    if outcomes[index] is not None:
+                        continue
+                    if async_result.ready():
+                        try:
+                            outcomes[index] = self._outcome(report_func, *async_result.get())
+                        except Exception:
+                            # e.g. the report function or its result could not be pickled
+                            outcomes[index] = self._outcome(report_func, now - start_times.get(index, now),
+                                                            traceback.format_exc())
+                    elif self.timeout is not None and index in start_times \
+                            and now - start_times[index] > self.timeout:
+                        timed_out.add(index)
+                        if output_logs.get(index) is not None:
+                            output_logs[index].discarded = True
+                        outcomes[index] = self._outcome(report_func, now - start_times[index],
+                                                        f"Timed out after {self.timeout}s")
+                    else:
+                        continue
+                    if progress is not None:
+                        progress()
+                if sum(not pending[index].ready() for index in timed_out) >= workers:
+                    # every worker is held by a timed-out report: the queued reports would never start
+                    for index, report_func in enumerate(report_funcs):
+                        if outcomes[index] is None and index not in start_times:
+                            outcomes[index] = self._outcome(report_func, 0.0, "Not started: every worker is "
+                                                                              "held by a timed-out report")
+                            if progress is not None:
+                                progress()
+                if None in outcomes:
+                    pending[outcomes.index(None)].wait(_POLL_INTERVAL)
+        finally:
+            if timed_out:
+                # abandon the overrunning reports; a hung thread is not waited for
+                pool.terminate()
+            else:
+                pool.close()
+                pool.join()
+        return outcomes
+
+    @staticmethod
+    def _note_started(started, start_times, output_logs):
+        """
+        Records the start time and output log of the reports whose start was announced since the
+        last call.
+        """
+        while True:
+            try:
+                index, output_log = started.get_nowait()
+            except queue.Empty:
+                return
+            start_times[index] = time.perf_counter()
+            output_logs[index] = output_log
+
+    def _outcome(self, report_func, seconds, error, outputs=()):
+        name = getattr(report_func, "__name__", str(report_func))
+        if error is None:
+            logging.info(f"Report {name} finished in {seconds:.2f}s")
+        else:
+            logging.error(f"Report {name} failed after {seconds:.2f}s: {error}")
+        return {"report": name, "seconds": seconds, "error": error, "outputs": list(outputs)}
@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+
+from reports.configurations import *
+
+# Days-in-phase key of each WIP phase (the age of the first pair of `phase_age_keys`)
+wip_age_keys = {phase: phase_age_keys[phase][0][1] for phase in active_projects_order}
+
+# The history columns read by the flow metrics
+flow_history_columns = (["Project_ID", "Phases", "COMPUTED_PROJECT_END_DATE"] + flow_cycle_time_keys
+                        + sorted(set(wip_age_keys.values())))
+
+
+def _percentile_label(percentile):
+    return f"P{percentile}"
+
+
+def weekly_report_dates(history):
+    """
+    Returns the last report date of every week (weeks ending on Sunday) in the history, oldest first.
+    """
+    report_dates = pd.Series(pd.unique(history["Report_Date"]))
+    if report_dates.empty:
+        return report_dates
+    return report_dates.groupby(report_dates.dt.to_period("W")).max().reset_index(drop=True)
+
+
+def distribution(values, groups=None, percentiles=FLOW_REPORT_PERCENTILES):
+    """
+    Summarizes a distribution of day counts, for each group and overall.
+
+    Args:
+        values (pd.Series): The day counts (missing values are left out).
+        groups (pd.Series): The group of each value (None: only the overall summary).
+        percentiles (list[int]): The percentiles to compute.
+
+    Returns:
+        pd.DataFrame: One row per group followed by an "All" row, with the Projects, Mean,
+        percentile and Max columns.
+    """
+    values = values.astype(np.float64)
+    present = values.notna()
+    values = values[present]
+    overall = pd.Series("All", index=values.index)
+    group_frames = []
+    for group_values in ([] if groups is None else [groups[present].astype(str)]) + [overall]:
+        grouped = values.groupby(group_values, sort=True)
+        frame = pd.DataFrame({"Projects": grouped.size(), "Mean": grouped.mean(),
+                              **{_percentile_label(percentile): grouped.quantile(percentile / 100)
+                                 for percentile in percentiles},
+                              "Max": grouped.max()})
+        group_frames.append(frame)
+    return pd.concat(group_frames)
+
+
+def cumulative_flow(history):
+    """
+    Counts the projects in each phase on every report date.
+
+    Args:
+        history (pd.DataFrame): The analytics history, oldest first (see `AnalyticsHistoryStore.scan`).
+
+    Returns:
+        pd.DataFrame: One row per report date and one column per phase of `flow_phase_order`.
+    """
+    # the history is in report date order: number the dates by counting the changes
+    report_dates = history["Report_Date"].to_numpy()
+    new_date = np.empty(len(report_dates), dtype=bool)
+    new_date[:1] = True
+    new_date[1:] = report_dates[1:] != report_dates[:-1]
+    date_index = np.cumsum(new_date) - 1
+    phases = history["Phases"].cat
+    codes = phases.codes.to_numpy().astype(np.intp) + 1  # 0: no phase
+    width = len(phases.categories) + 1
+    counts = np.bincount(date_index * width + codes, minlength=new_date.sum() * width).reshape(-1, width)
+    counts = pd.DataFrame(counts[:, 1:], index=pd.DatetimeIndex(report_dates[new_date], name="Report_Date"),
+                          columns=phases.categories.astype(str))
+    return counts.reindex(columns=flow_phase_order, fill_value=0)
+
+
+def cycle_times(history, key):
+    """
+    Summarizes the distribution of a completion duration over the completed projects, by quarter
+    of completion.
+
+    The duration is recorded once when a project completes; the latest recorded value of each
+    project is used, so projects archived since they completed are still counted.
+
+    Args:
+        history (pd.DataFrame): The analytics history, oldest first.
+        key (str): The duration key (e.g. COMPUTED_COMPLETION_TIME_DAYS).
+
+    Returns:
+        pd.DataFrame: See `distribution`; groups are the completion quarters ("Unknown" when the
+        project has no end date).
+    """
+    completed = history.loc[history[key].notna(), ["Project_ID", "COMPUTED_PROJECT_END_DATE", key]]
+    completed = completed.drop_duplicates("Project_ID", keep="last")
+    end_dates = completed["COMPUTED_PROJECT_END_DATE"]
+    quarters = end_dates.dt.to_period("Q").astype(str).where(end_dates.notna(), "Unknown")
+    return distribution(completed[key], quarters)
+
+
+def wip_ages(history):
+    """
+    Returns the days every project in a WIP phase (`active_projects_order`) had spent in its
+    phase on each report date: NaN for the projects not in a WIP phase or without the age.
+    """
+    ages = np.full(len(history), np.nan)
+    for phase, age_key in wip_age_keys.items():
+        in_phase = (history["Phases"] == phase).to_numpy()  # compares the category codes
+        ages[in_phase] = history[age_key].to_numpy(dtype=np.float64, na_value=np.nan)[in_phase]
+    return pd.Series(ages, index=history.index)
+
+
+def wip_age_percentiles(history, report_date):
+    """
+    Summarizes the days in phase of the WIP projects on a report date, by phase.
+
+    Returns:
+        pd.DataFrame: See `distribution`, with one row per WIP phase (in `flow_phase_order`).
+    """
+    snapshot = history[history["Report_Date"] == report_date]
+    ages = wip_ages(snapshot)
+    summary = distribution(ages, snapshot["Phases"].astype(str))
+    return summary.reindex([phase for phase in flow_phase_order if phase in summary.index] + ["All"])
+
+
+def wip_age_trend(history, report_dates, percentile=FLOW_REPORT_TREND_PERCENTILE):
+    """
+    Returns a percentile of the days in phase of the WIP projects on each of the report dates,
+    by phase.
+
+    Returns:
+        pd.DataFrame: One row per report date, one column per WIP phase and an "All WIP" column.
+    """
+    snapshots = history[history["Report_Date"].isin(report_dates)]
+    ages = wip_ages(snapshots)
+    wip = ages.notna()
+    ages, snapshots = ages[wip], snapshots[wip]
+    by_phase = ages.groupby([snapshots["Report_Date"], snapshots["Phases"]], observed=True).quantile(percentile / 100)
+    trend = by_phase.unstack()
+    trend.columns = trend.columns.astype(str)
+    trend = trend.reindex(columns=[phase for phase in flow_phase_order if phase in wip_age_keys])
+    trend["All WIP"] = ages.groupby(snapshots["Report_Date"]).quantile(percentile / 100)
+    return trend.reindex(pd.DatetimeIndex(report_dates, name="Report_Date"))
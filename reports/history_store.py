@@ -0,0 +1,404 @@
+import logging
+import os
+import re
+import time
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from reports.configurations import *
+from resources.discovery import local_cache_dir
+
+# Bump when the segment layout changes; segments of another version are skipped by scans
+HISTORY_STORE_VERSION = 2
+
+# Null markers of the typed columns once read (dates are NaT); stored integers use the minimum of
+# their narrowed type
+INT_NULL = np.iinfo(np.int32).min
+CODE_NULL = -1
+
+_epoch_ordinal = date(1970, 1, 1).toordinal()
+_nat_days = np.iinfo(np.int64).min  # the int64 value of NaT
+
+_header_member = "__header__"  # [version, row count]
+_report_date_member = "Report_Date"  # the distinct report dates, with the row count of each
+_report_date_counts_member = "Report_Date#counts"
+_dictionary_suffix = "#dictionary"
+# "analytics_<yyyy-mm>_<run>.npz"; the monthly segments of earlier versions have no run and sort first
+_segment_re = re.compile(r"^analytics_(?P<year>\d{4})-(?P<month>\d{2})(?:_(?P<run>\d+))?\.npz$")
+
+# Column name -> kind, in segment order
+history_columns = {}
+history_columns.update((key, "dictionary") for key in history_dictionary_params)
+history_columns.update((key, "date") for key in sorted(date_params - {"Report_Date"}))
+history_columns.update((key, "int") for key in sorted(int_params))
+
+
+def _segment_run(path):
+    return int(_segment_re.match(os.path.basename(path)).group("run") or 0)
+
+
+def _encode_column(kind, values):
+    """
+    Converts the values of a frame column to the typed array of its kind; dictionary columns
+    become a (codes, sorted dictionary) pair, with CODE_NULL for missing values.
+    """
+    if kind == "dictionary":
+        labels = np.array(["" if value is None or value != value else str(value) for value in values], dtype=str)
+        dictionary, codes = np.unique(labels, return_inverse=True)
+        codes = codes.astype(np.int32).reshape(-1)
+        if len(dictionary) and dictionary[0] == "":
+            codes -= 1  # "" sorts first: drop it from the dictionary, its code becomes CODE_NULL
+            dictionary = dictionary[1:]
+        return codes, dictionary
+    if kind == "date":
+        # through day ordinals: much faster than letting NumPy convert date objects one by one
+        days = [value.toordinal() - _epoch_ordinal if isinstance(value, date) and value is not pd.NaT else _nat_days
+                for value in values]
+        return np.array(days, dtype=np.int64).view("datetime64[D]")
+    numbers = pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy(dtype=np.float64,
+                                                                                        na_value=np.nan)
+    ints = np.full(len(numbers), INT_NULL, dtype=np.int32)
+    present = ~np.isnan(numbers)
+    ints[present] = numbers[present]
+    return ints
+
+
+def _narrow(values, null=None):
+    """
+    Converts integers to the narrowest signed type holding them, for storage; nulls (if a null
+    marker is given) become the minimum of that type.
+    """
+    present = np.ones(len(values), dtype=bool) if null is None else values != null
+    low, high = (values[present].min(), values[present].max()) if present.any() else (0, 0)
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min < low and high <= info.max:
+            narrow = values.astype(dtype)
+            narrow[~present] = info.min
+            return narrow
+    return values
+
+
+def _widen(stored, dtype=np.int32, null=INT_NULL):
+    """
+    Converts stored integers back to their type in memory, with its null marker for nulls.
+    """
+    if stored.dtype == dtype:
+        return stored
+    values = stored.astype(dtype)
+    values[stored == np.iinfo(stored.dtype).min] = null
+    return values
+
+
+def _concat_column(kind, parts):
+    """
+    Concatenates the arrays of one column; dictionary columns are re-encoded against the union
+    of their dictionaries.
+    """
+    if kind == "dictionary":
+        if not parts:
+            return np.array([], dtype=np.int32), np.array([], dtype=str)
+        dictionary = parts[0][1]
+        if all(np.array_equal(part_dictionary, dictionary) for _, part_dictionary in parts[1:]):
+            return np.concatenate([part_codes for part_codes, _ in parts]), dictionary
+        dictionary = np.unique(np.concatenate([part_dictionary for _, part_dictionary in parts]))
+        codes = []
+        for part_codes, part_dictionary in parts:
+            # part code -> union code, with a trailing slot so CODE_NULL maps to itself
+            mapping = np.append(np.searchsorted(dictionary, part_dictionary), CODE_NULL).astype(np.int32)
+            codes.append(mapping[part_codes])
+        return np.concatenate(codes), dictionary
+    if parts:
+        return np.concatenate(parts)
+    return np.array([], dtype="datetime64[D]" if kind == "date" else np.int32)
+
+
+def _take_column(kind, column, rows):
+    if kind == "dictionary":
+        return column[0][rows], column[1]
+    return column[rows]
+
+
+def _pandas_column(kind, column):
+    if kind == "dictionary":
+        return pd.Categorical.from_codes(column[0], categories=column[1])
+    if kind == "int":
+        return pd.arrays.IntegerArray(column, column == INT_NULL)
+    if kind == "date":
+        return _pandas_dates(column)
+    return column
+
+
+def _pandas_dates(column):
+    # pandas keeps at least second resolution; converting in NumPy first skips its slower per-element checks
+    return column.astype("datetime64[s]")
+
+
+def analytics_history_dir(projects_tree_root):
+    """
+    Returns the directory of the analytics history store of a projects tree:
+    `analytics_history_directory` if set, else a directory in the local cache directory of the
+    tree (see `resources.discovery.local_cache_dir`), outside the synced tree.
+    """
+    if analytics_history_directory:
+        return analytics_history_directory
+    return os.path.join(local_cache_dir(projects_tree_root), analytics_history_dirname)
+
+
+class AnalyticsHistoryStore:
+    def __init__(self, history_dir):
+        """
+        A local columnar store of the analytics records of every run, keyed by report date.
+
+        Every flush writes the records appended since the last one to a new compressed NumPy
+        segment per month (`analytics_<yyyy-mm>_<run>.npz`, the run being the write time in
+        nanoseconds), so a run writes only its own records. A segment holds a `Report_Date` array
+        and an array per field of `history_columns`: typed `datetime64[D]` dates, `int32` integers
+        (INT_NULL when missing) and dictionary-encoded labels (owner, phase, ...). Report dates are
+        stored run-length encoded, and dates, integers and dictionary codes in the narrowest
+        integer type holding the values of the segment.
+
+        The records of a report date are those of the latest segment holding that date, so a later
+        run on the same day replaces that day's records. Once a month has more than
+        ANALYTICS_HISTORY_COMPACT_SEGMENTS segments, they are merged into one.
+
+        Scans only open the segments of the requested date range and only decompress the
+        requested columns of the segments holding records not replaced by a later one.
+
+        Args:
+            history_dir (str): The directory of the segments (created on first append).
+        """
+        self.history_dir = history_dir
+        self._pending = {}  # month -> [(report_date, row count, encoded columns)] not yet written
+
+    def new_segment_path(self, month):
+        """
+        Returns the path of a new segment of a month (given as the date of its first day), sorting
+        after the existing ones.
+        """
+        run = time.time_ns()
+        for path in self.segment_paths(month, month):
+            run = max(run, _segment_run(path) + 1)
+        return os.path.join(self.history_dir, f"analytics_{month.strftime('%Y-%m')}_{run:020d}.npz")
+
+    def segment_paths(self, start=None, end=None):
+        """
+        Returns the paths of the stored segments overlapping a date range, by month and then in
+        the order they were written.
+
+        Args:
+            start (date): The first date of the range (None: no lower bound).
+            end (date): The last date of the range (None: no upper bound).
+        """
+        try:
+            names = os.listdir(self.history_dir)
+        except FileNotFoundError:
+            return []
+        segments = []
+        for name in names:
+            match = _segment_re.match(name)
+            if match is None:
+                continue
+            month = date(int(match.group("year")), int(match.group("month")), 1)
+            if (start is None or month >= start.replace(day=1)) and (end is None or month <= end):
+                segments.append((month, int(match.group("run") or 0), os.path.join(self.history_dir, name)))
+        return [path for _, _, path in sorted(segments)]
+
+    def report_dates(self, start=None, end=None):
+        """
+        Returns the distinct report dates stored in a date range, oldest first.
+        """
+        report_dates = self._scan_columns([], start, end)[0]
+        return [value.astype(date) for value in np.unique(report_dates)]
+
+    def append(self, frame, report_date, flush=True):
+        """
+        Stores the analytics records of a report date, replacing the records stored for that date.
+
+        Args:
+            frame (pd.DataFrame): The analytics records (see `analytics_summary_frame`); columns
+                the store does not keep are ignored, missing ones are stored as nulls.
+            report_date (date): The report date of the records.
+            flush (bool): Write the segment now. When appending many dates in order (a backfill),
+                pass False and call `flush` at the end: the records are buffered until a date of
+                another month is appended, so each month gets one segment.
+        """
+        month = report_date.replace(day=1)
+        if month not in self._pending:
+            self.flush()
+        columns = {key: _encode_column(kind, frame[key].tolist() if key in frame.columns else [None] * len(frame))
+                   for key, kind in history_columns.items()}
+        self._pending.setdefault(month, []).append((report_date, len(frame), columns))
+        if flush:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the segments of the records appended since the last flush.
+
+        Returns:
+            list[str]: The paths of the written segments.
+        """
+        paths = []
+        for month, snapshots in sorted(self._pending.items()):
+            # the last records appended for a date replace the earlier ones
+            latest = {report_date: (rows, columns) for report_date, rows, columns in snapshots}
+            report_date_parts = [np.full(rows, np.datetime64(report_date, "D"))
+                                 for report_date, (rows, _) in latest.items()]
+            parts = {key: [columns[key] for _, columns in latest.values()] for key in history_columns}
+            path = self._write_segment(self.new_segment_path(month), report_date_parts, parts)
+            logging.info(f"Stored analytics history of {', '.join(str(d) for d in latest)} in {path}")
+            paths.append(path)
+            if len(self.segment_paths(month, month)) > ANALYTICS_HISTORY_COMPACT_SEGMENTS:
+                paths.append(self.compact(month))
+        self._pending = {}
+        return paths
+
+    def compact(self, month):
+        """
+        Merges the segments of a month (given as the date of its first day) into one, keeping the
+        records of each report date from the latest segment holding it. Unreadable segments are
+        moved aside for inspection rather than merged.
+
+        Returns:
+            str | None: The path of the merged segment, or None if the month has no segment.
+        """
+        paths = self.segment_paths(month, month)
+        if not paths:
+            return None
+        report_date_parts, parts, merged = [], {key: [] for key in history_columns}, []
+        replaced = np.array([], dtype="datetime64[D]")
+        for path in reversed(paths):
+            report_dates, segment = self._read_segment(path, list(history_columns), replaced)
+            if report_dates is None:
+                logging.error(f"Moving unreadable analytics history segment {path} aside")
+                os.replace(path, path + ".unreadable")
+                continue
+            merged.append(path)
+            if not len(report_dates):
+                continue
+            replaced = np.union1d(replaced, report_dates)
+            report_date_parts.append(report_dates)
+            for key in history_columns:
+                parts[key].append(segment[key])
+        path = self._write_segment(self.new_segment_path(month), report_date_parts, parts)
+        for merged_path in merged:
+            os.remove(merged_path)
+        logging.info(f"Compacted {len(merged)} analytics history segments of {month.strftime('%Y-%m')} into {path}")
+        return path
+
+    def _write_segment(self, path, report_date_parts, parts):
+        report_dates = np.concatenate(report_date_parts) if report_date_parts \
+            else np.array([], dtype="datetime64[D]")
+        order = np.argsort(report_dates, kind="stable")
+        distinct_dates, date_counts = np.unique(report_dates, return_counts=True)
+        arrays = {_header_member: np.array([HISTORY_STORE_VERSION, len(report_dates)], dtype=np.int64),
+                  _report_date_member: distinct_dates, _report_date_counts_member: date_counts.astype(np.int32)}
+        for key, kind in history_columns.items():
+            column = _take_column(kind, _concat_column(kind, parts[key]), order)
+            if kind == "dictionary":
+                arrays[key] = _narrow(column[0])  # CODE_NULL fits every signed type
+                arrays[key + _dictionary_suffix] = column[1]
+            elif kind == "int":
+                arrays[key] = _narrow(column, INT_NULL)
+            else:
+                arrays[key] = _narrow(column.view(np.int64), _nat_days)  # days since 1970
+
+        os.makedirs(self.history_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as outfile:
+            np.savez_compressed(outfile, **arrays)
+        os.replace(tmp_path, path)
+        return path
+
+    @staticmethod
+    def _read_segment(path, columns, replaced=None):
+        """
+        Reads the report dates and the given columns of a segment, leaving out the records of the
+        replaced report dates; the columns are not decompressed if no record is left.
+
+        Returns:
+            Tuple[np.ndarray | None, dict]: The report date of every row and the column arrays,
+            or (None, {}) if the segment is unreadable or of another version.
+        """
+        try:
+            with np.load(path, allow_pickle=False) as archive:
+                version = int(archive[_header_member][0])
+                if version != HISTORY_STORE_VERSION:
+                    logging.warning(f"Skipping analytics history segment {path} of version {version}")
+                    return None, {}
+                report_dates = np.repeat(archive[_report_date_member], archive[_report_date_counts_member])
+                rows = None
+                if replaced is not None and len(replaced):
+                    rows = ~np.isin(report_dates, replaced)
+                    report_dates = report_dates[rows]
+                    if not len(report_dates):
+                        columns = []
+                segment = {}
+                for key in columns:
+                    if history_columns[key] == "dictionary":
+                        segment[key] = (archive[key], archive[key + _dictionary_suffix])
+                    elif history_columns[key] == "int":
+                        segment[key] = _widen(archive[key])
+                    else:
+                        segment[key] = _widen(archive[key], np.int64, _nat_days).view("datetime64[D]")
+                    if rows is not None:
+                        segment[key] = _take_column(history_columns[key], segment[key], rows)
+                return report_dates, segment
+        except (OSError, KeyError, ValueError) as e:
+            logging.warning(f"Unable to read analytics history segment {path} ({e})")
+            return None, {}
+
+    def _scan_columns(self, columns, start, end):
+        report_date_parts, parts = [], {key: [] for key in columns}
+        replaced = np.array([], dtype="datetime64[D]")
+        # newest first, so the records of a report date come from the latest segment holding it
+        for path in reversed(self.segment_paths(start, end)):
+            report_dates, segment = self._read_segment(path, columns, replaced)
+            if report_dates is None or not len(report_dates):
+                continue
+            replaced = np.union1d(replaced, report_dates)
+            rows = np.ones(len(report_dates), dtype=bool)
+            if start is not None:
+                rows &= report_dates >= np.datetime64(start, "D")
+            if end is not None:
+                rows &= report_dates <= np.datetime64(end, "D")
+            if not rows.all():
+                report_dates = report_dates[rows]
+                segment = {key: _take_column(history_columns[key], column, rows) for key, column in segment.items()}
+            report_date_parts.append(report_dates)
+            for key in columns:
+                parts[key].append(segment[key])
+        report_dates = np.concatenate(report_date_parts) if report_date_parts \
+            else np.array([], dtype="datetime64[D]")
+        order = np.argsort(report_dates, kind="stable")
+        return report_dates[order], {key: _take_column(history_columns[key],
+                                                       _concat_column(history_columns[key], parts[key]), order)
+                                     for key in columns}
+
+    def scan(self, columns=None, start=None, end=None):
+        """
+        Reads columns of the stored snapshots in a date range.
+
+        Args:
+            columns (list[str]): The columns to read (None: all of `history_columns`).
+            start (date): The first report date to read (None: the oldest stored).
+            end (date): The last report date to read (None: the latest stored).
+
+        Returns:
+            pd.DataFrame: One row per project and report date, oldest first, with a `Report_Date`
+            column followed by the requested columns: dates as datetime64, integers as nullable
+            Int32 and dictionary-encoded columns as categoricals.
+
+        Raises:
+            ValueError: If a column is not kept by the store.
+        """
+        columns = list(history_columns) if columns is None else list(columns)
+        unknown = [key for key in columns if key not in history_columns]
+        if unknown:
+            raise ValueError(f"Columns not kept in the analytics history: {unknown}")
+        report_dates, data = self._scan_columns(columns, start, end)
+        return pd.DataFrame({"Report_Date": _pandas_dates(report_dates),
+                             **{key: _pandas_column(history_columns[key], data[key]) for key in columns}})
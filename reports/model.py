@@ -0,0 +1,221 @@
+import threading
+from collections import defaultdict
+
+from reports.configurations import *
+from reports.parser import extract_stakeholders
+
+
+OWNER_SORT_ORDERS = ("name", "last_name", "projects")
+
+
+def person_sort_key(name, order=OWNER_SORT_ORDER):
+    """
+    Returns a case-insensitive sort key for an owner or stakeholder name, ignoring a
+    parenthesized email and a "- V" suffix. Ties are broken on the full name, so the
+    order is total and stable across runs.
+
+    Args:
+        name (str): The owner or stakeholder as written in the project files.
+        order (str): "last_name" sorts by last name first, anything else by the name as written.
+
+    Returns:
+        tuple: The sort key.
+    """
+    name = name or ""
+    display_name = name.split("(")[0].replace("- V", "").strip()
+    if order == "last_name":
+        parts = display_name.split()
+        key = (parts[-1] if parts else "", display_name)
+    else:
+        key = (display_name,)
+    return tuple(part.casefold() for part in key) + (name,)
+
+
+def sort_people(phases_by_person, order=OWNER_SORT_ORDER):
+    """
+    Sorts the owners or stakeholders of an index in the configured report order.
+
+    Args:
+        phases_by_person (dict): Person -> phase index -> records.
+        order (str): One of `OWNER_SORT_ORDERS`.
+
+    Returns:
+        list[str]: The people in report order.
+    """
+    if order not in OWNER_SORT_ORDERS:
+        raise ValueError(f"Invalid owner sort order {order}. Use one of {OWNER_SORT_ORDERS}")
+    if order == "projects":
+        return sorted(phases_by_person, key=lambda person: (
+            -sum(len(records) for records in phases_by_person[person].values()), person_sort_key(person)))
+    return sorted(phases_by_person, key=lambda person: person_sort_key(person, order))
+
+
+class FragmentCache:
+    def __init__(self):
+        """
+        Memoizes derived per-project values and rendered snippets for one report run, so a
+        project's fragment is computed once and reused by every report that shows it.
+
+        Fragments are keyed by the project's `Project_ID` together with its phase and name (its
+        folder path, in case a copied folder kept the ID), the fragment name and the fragment
+        parameters.
+        """
+        self.fragments = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, lines, name, render, *params):
+        """
+        Returns a project's fragment, rendering it on the first request.
+
+        Args:
+            lines (dict): The project record.
+            name (str): The fragment name.
+            render: Called as render(fragments, lines, *params) to compute the fragment on a
+                miss; it gets this cache so it can reuse other fragments.
+            *params: The fragment parameters; part of the key and passed to render.
+
+        Returns:
+            The fragment.
+        """
+        key = (lines.get("Project_ID"), lines["Phases"], lines["Project"], name) + params
+        fragment = self.fragments.get(key, self)
+        if fragment is not self:
+            with self._lock:
+                self.hits += 1
+            return fragment
+        fragment = render(self, lines, *params)
+        with self._lock:
+            self.misses += 1
+            self.fragments[key] = fragment
+        return fragment
+
+    def stats(self):
+        """
+        Returns the hit and miss counters and the number of cached fragments.
+        """
+        return {"hits": self.hits, "misses": self.misses, "fragments": len(self.fragments)}
+
+
+class ReportModel:
+    def __init__(self, project_records_list):
+        """
+        Indexes the project records of a run once, so every report takes its owner and phase
+        slices from the index instead of scanning all records for every owner and phase.
+
+        Slices keep the order of `project_records_list`, which is the order the reports
+        list projects in.
+
+        Args:
+            project_records_list (list[dict]): The project records of the run.
+        """
+        self.records = project_records_list
+        self.record_count = len(project_records_list)
+        self.by_phase = defaultdict(list)  # phase index -> records
+        self.by_owner = defaultdict(lambda: defaultdict(list))  # ANALYTICS_DS_OWNER -> phase index -> records
+        self.by_stakeholder = {}  # stakeholder key -> stakeholder -> phase index -> records, built on demand
+        self.fragments = FragmentCache()  # per-project fragments shared by the reports of the run
+        for lines in project_records_list:
+            phase_index = project_phases.get(lines["Phases"])
+            self.by_phase[phase_index].append(lines)
+            self.by_owner[lines["ANALYTICS_DS_OWNER"]][phase_index].append(lines)
+
+    def is_model_of(self, project_records_list):
+        """
+        Tells whether this model indexes the given records list (and it was not resized since).
+        """
+        return self.records is project_records_list and self.record_count == len(project_records_list)
+
+    def phase_projects(self, phase_index):
+        """
+        Returns the records in a phase.
+
+        Args:
+            phase_index (int): The phase sequence number (see `project_phases`).
+
+        Returns:
+            list[dict]: The records in the phase.
+        """
+        return self.by_phase.get(phase_index, [])
+
+    def owner_phases(self, owner):
+        """
+        Returns the records of an analytics owner (exact `ANALYTICS_DS_OWNER` match), by phase.
+
+        Args:
+            owner (str): The owner.
+
+        Returns:
+            dict[int, list[dict]]: Phase index -> records of the owner in that phase.
+        """
+        return self.by_owner.get(owner, {})
+
+    def sorted_owners(self, order=OWNER_SORT_ORDER):
+        """
+        Returns the distinct analytics owners in report order (see `sort_people`).
+        """
+        return sort_people(self.by_owner, order)
+
+    def stakeholder_index(self, stakeholder_key):
+        """
+        Returns the inverted index of a comma-separated stakeholder field, built on first use.
+        Each field is split once with `extract_stakeholders`; a project is listed once per
+        distinct stakeholder named in it.
+
+        Args:
+            stakeholder_key (str): The record key holding the stakeholders, e.g. "BUSINESS_SPONSOR".
+
+        Returns:
+            dict[str, dict[int, list[dict]]]: Stakeholder -> phase index -> records, with
+            stakeholders in order of first appearance.
+        """
+        if stakeholder_key not in self.by_stakeholder:
+            index = defaultdict(lambda: defaultdict(list))
+            for lines in self.records:
+                phase_index = project_phases.get(lines["Phases"])
+                for stakeholder in dict.fromkeys(extract_stakeholders(lines[stakeholder_key])):
+                    index[stakeholder][phase_index].append(lines)
+            self.by_stakeholder[stakeholder_key] = index
+        return self.by_stakeholder[stakeholder_key]
+
+    def sorted_stakeholders(self, stakeholder_key, order=OWNER_SORT_ORDER):
+        """
+        Returns the distinct stakeholders named in a comma-separated field, in report order
+        (see `sort_people`).
+        """
+        return sort_people(self.stakeholder_index(stakeholder_key), order)
+
+    def stakeholder_phases(self, stakeholder, stakeholder_key="BUSINESS_SPONSOR"):
+        """
+        Returns the records naming a stakeholder (exact match on a comma-separated entry), by phase.
+
+        Args:
+            stakeholder (str): The stakeholder.
+            stakeholder_key (str): The record key holding the stakeholders.
+
+        Returns:
+            dict[int, list[dict]]: Phase index -> records naming the stakeholder in that phase.
+        """
+        return self.stakeholder_index(stakeholder_key).get(stakeholder, {})
+
+
+# Model of the records list the reports are currently generated from
+_report_model = None
+
+
+def report_model(project_records_list):
+    """
+    Returns the `ReportModel` of a records list, building it on the first call for that list.
+    The reports of one `create_reports` run share the same list, so it is indexed once per run.
+
+    Args:
+        project_records_list (list[dict]): The project records of the run.
+
+    Returns:
+        ReportModel: The model of the records.
+    """
+    global _report_model
+    if _report_model is None or not _report_model.is_model_of(project_records_list):
+        _report_model = ReportModel(project_records_list)
+    return _report_model
@@ -0,0 +1,120 @@
+import hashlib
+import io
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+
+# Output log of the report running in this thread (see OutputLog)
+_report_outputs = threading.local()
+
+
+class OutputLog:
+    __slots__ = ("written", "discarded")
+
+    def __init__(self):
+        """
+        The report files written by one report run, as (path, changed) pairs.
+
+        A run that was abandoned (e.g. timed out in a thread that cannot be stopped) is marked
+        discarded: the report files it still writes afterwards are dropped, so a late report does
+        not overwrite the outputs of the next run. A write already under way when the run is
+        discarded still completes; the file is replaced atomically either way.
+        """
+        self.written = []
+        self.discarded = False
+
+
+def start_output_log():
+    """
+    Starts recording the report files written by the current thread.
+
+    Returns:
+        OutputLog: The log of the report run, which another thread may mark discarded.
+    """
+    _report_outputs.log = OutputLog()
+    return _report_outputs.log
+
+
+def end_output_log():
+    """
+    Stops recording and returns the report files written by the current thread since
+    `start_output_log`.
+
+    Returns:
+        list[tuple[str, bool]]: (path, changed) for each report file written.
+    """
+    output_log = getattr(_report_outputs, "log", None)
+    _report_outputs.log = None
+    return [] if output_log is None else output_log.written
+
+
+def _digest(data, volatile_re=None):
+    if volatile_re is not None:
+        data = volatile_re.sub(b"", data)
+    return hashlib.sha256(data).hexdigest()
+
+
+def write_if_changed(path, text, newline=None, volatile=None):
+    """
+    Writes a report file only if its content changed, atomically (temp file and rename).
+
+    The rendered text is encoded as the text-mode `open(path, "w", newline=newline)` would
+    write it, and its SHA-256 is compared with the existing file's. An unchanged report is
+    left untouched, so synced folders do not upload it again.
+
+    Args:
+        path (str): The report file path.
+        text (str): The rendered report.
+        newline: As for `open`; None translates "\n" to `os.linesep`, "" writes it as-is.
+        volatile (str): Optional regular expression for parts of the report that change on
+            every run (e.g. a generation timestamp) and are ignored in the comparison.
+
+    Returns:
+        bool: True if the file was written, False if it was unchanged or its report run was
+        discarded (see `OutputLog`).
+    """
+    output_log = getattr(_report_outputs, "log", None)
+    if output_log is not None and output_log.discarded:
+        logging.warning(f"Report {path} not written: its report run was abandoned")
+        return False
+    if newline is None and os.linesep != "\n":
+        text = text.replace("\n", os.linesep)
+    data = text.encode("utf-8")
+    volatile_re = re.compile(volatile.encode("utf-8")) if volatile is not None else None
+    try:
+        with open(path, "rb") as infile:
+            changed = _digest(infile.read(), volatile_re) != _digest(data, volatile_re)
+    except OSError:
+        changed = True
+    if changed:
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as outfile:
+            outfile.write(data)
+        os.replace(tmp_path, path)
+        logging.info(f"Report {path} written")
+    else:
+        logging.info(f"Report {path} unchanged")
+    if output_log is not None:
+        output_log.written.append((path, changed))
+    return changed
+
+
+@contextmanager
+def report_file(path, newline=None, volatile=None):
+    """
+    Opens an in-memory report file; on exit the content is written to `path` with
+    `write_if_changed`. Used in place of `open(path, "w")` by the report generators.
+
+    Args:
+        path (str): The report file path.
+        newline: As for `open`.
+        volatile (str): Regular expression for parts ignored in the change comparison.
+
+    Yields:
+        io.StringIO: The buffer to write the report to.
+    """
+    buffer = io.StringIO(newline="")
+    yield buffer
+    write_if_changed(path, buffer.getvalue(), newline, volatile)
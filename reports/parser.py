@@ -152,6 +152,16 @@ def normalize_note_date(note_line, project_file_name=None):
 # 2025-11-26         with open(file_path, "w") as project_info_file:
 # 2025-11-26             project_info_file.writelines(updated_lines)
 
+def extract_stakeholders(stake_str):
+    """
+    Stakeholders are comma-separated in the project_info_file
+    Extract and return a list of stakeholders
+    """
+    sh_list = stake_str.strip().split(",")
+    sh_list = [x.strip() for x in sh_list if x.strip() is not None and x.strip() != '']
+    return sh_list
+
+
 def extract_params(root):
     """
     Extracts phase and project name from the given root path.
@@ -3,27 +3,31 @@ import tqdm
 import datetime
 import logging
 import os
+import numpy as np
 import pandas as pd
 from collections import defaultdict
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 from reports.configurations import *
+from reports.block_cache import OwnerBlockCache
+from reports.flow_metrics import (flow_history_columns, cumulative_flow, cycle_times, weekly_report_dates,
+                                  wip_age_percentiles, wip_age_trend)
+from reports.history_store import AnalyticsHistoryStore, analytics_history_dir
+from reports.executor import ReportExecutor
+from reports.output import report_file, write_if_changed
+from reports.model import report_model
+from reports.parser import extract_stakeholders
+from resources.discovery import local_cache_dir
+
+# Set by configure_report_path_globals (None: turned off)
+owner_block_cache = None
+analytics_history = None
 
 
 ########################################################################################
 # Utilities
 ########################################################################################
 
-def extract_stakeholders(stake_str):
-    """
-    Stakeholders are comma-separated in the project_info_file
-    Extract and return a list of stakeholders
-    """
-    sh_list = stake_str.strip().split(",")
-    sh_list = [x.strip() for x in sh_list if x.strip() is not None and x.strip() != '']
-    return sh_list
-
-
 def synthesize_sharepoint_url(project_phase, project_name):
     """
     Example URL:
@@ -82,25 +86,78 @@ def summarize_phase_counts(phase_counts):
     return markdown_table
 
 
-def recent_notes(notes_text, recent_days=400, limit=200):
+def recent_notes(notes, recent_days=RECENT_NOTES_DAYS, limit=200):
     """
     Return a list of notes with the most recent first
+
+    notes is the project's ProjectNotes (None or empty if the project has no notes)
     """
-    # Remove "NOTES_" prefix and split into individual notes
-    notes = [x.strip()[6:] for x in notes_text.split(NOTES_DELIMITER)]
-    # check for recent notes
+    if not notes:
+        return []
+    # notes are sorted most recent first, so the recent ones are a prefix found by binary search
     recent = today_date_obj - timedelta(days=recent_days)
-    notes_list = []
-    for count, note in enumerate(notes):
-        if count < limit:
-            update_note = note
-            if note.endswith("::"):
-                # notes with sequence within a date. Make bulleted list.
-                pre, sequence_number, post = note.split("::")
-                update_note = f"  {int(sequence_number)}. {pre[11:]}"
-            if datetime.strptime(note[:10].replace("_", "-"), DATE_FMT).date() >= recent:
-                notes_list.append(update_note)
-    return notes_list
+    return [note.report_text() for note in notes.recent(recent, limit)]
+
+
+def recent_notes_fragment(fragments, lines, recent_days=RECENT_NOTES_DAYS, limit=200):
+    """
+    Return the project's recent notes (see recent_notes), computed once per run
+    """
+    return fragments.get(lines, "recent_notes", lambda _, _lines, *params: recent_notes(_lines["NOTES"], *params),
+                         recent_days, limit)
+
+
+def size_fragment(fragments, lines):
+    """
+    Return the project's size representation (see size_repr), computed once per run
+    """
+    return fragments.get(lines, "size", lambda _, _lines: size_repr(_lines["T-SHIRT_SIZE"]))
+
+
+def render_owner_block_project(fragments, lines, analyst_line, justification_block):
+    """
+    Render a project's section of an owner block
+
+    analyst_line adds the Data Analyst to the links line (for blocks not grouped by analyst)
+    justification_block adds the Case for Commit
+    """
+    result = [f'### {lines["Project"]}<br>*Mission: {lines["MISSION_ALIGNMENT"]}*\n\n',
+              f'<u>Project phase</u>: _{lines["Phases"]}_ ',
+              f'&nbsp; &nbsp; &nbsp; 📆 Active for {lines["COMPUTED_AGE_DAYS"]} days &'
+              f' In-Progress for {lines["COMPUTED_IN_PROGRESS_AGE_DAYS"]} days\n\n',
+              f'<u>Project sponsor(s)</u>: {lines["BUSINESS_SPONSOR"]} ',
+              f'&nbsp; &nbsp; &nbsp;  👕 <u>Size</u>: {size_fragment(fragments, lines)} \n\n']
+    if analyst_line:
+        result.append(f'<u>Data Analyst</u>: {lines["ANALYTICS_DS_OWNER"]} | '
+                      f'[Charter]({lines["COMPUTED_CHARTER_LINK"]}) | '
+                      f'[Project Info]({lines["COMPUTED_PROJECT_INFO_LINK"]})\n\n')
+    else:
+        result.append(f'[Charter]({lines["COMPUTED_CHARTER_LINK"]}) | '
+                      f'[Project Info]({lines["COMPUTED_PROJECT_INFO_LINK"]})\n\n')
+
+    result.append("\n\n".join(recent_notes_fragment(fragments, lines)))
+    result.append("\n\n")
+    if justification_block and lines["COMMIT_JUSTIFICATIONS"] is not None:
+        result.append(f'#### Case for Commit \n{lines["COMMIT_JUSTIFICATIONS"]}\n\n')
+    return "".join(result)
+
+
+def render_weekly_project_rows(fragments, lines):
+    """
+    Render a project's rows of the weekly owner table (project row and its recent notes)
+    """
+    rows = [f'<tr class="tr-project">'
+            f'<td>{lines["Project"]}</td>'
+            f'<td>[{lines["Phases"]}] active {lines["COMPUTED_AGE_DAYS"]} days &'
+            f' In-progress {lines["COMPUTED_IN_PROGRESS_AGE_DAYS"]} days '
+            f' (👕:{size_fragment(fragments, lines)}) <br/>'
+            f'<a href="{lines["COMPUTED_CHARTER_LINK"]}" target="_blank">Charter</a> | '
+            f'<a href="{lines["COMPUTED_PROJECT_INFO_LINK"]}" target="_blank">Project Info</a>'
+            f'</td></tr>\n']
+    for note in recent_notes_fragment(fragments, lines, 400, 7):
+        note = note.strip().replace("|", ":")
+        rows.append(f'<tr><td></td><td>{note}</td></tr>\n')
+    return "".join(rows)
 
 
 def synthesize_owner_block(project_records_list, owner, phase_filter='active', project_owner_key='ANALYTICS_DS_OWNER',
@@ -129,36 +186,37 @@ def synthesize_owner_block(project_records_list, owner, phase_filter='active', p
         logging.error("ERROR: Invalid phase_filter")
         return "ERROR: Invalid phase_filter"
 
+    # take the owner's projects of each phase from the run's index instead of scanning every record
+    model = report_model(project_records_list)
+    if project_owner_key == "ANALYTICS_DS_OWNER":
+        owner_phases = model.owner_phases(owner)
+    else:
+        # comma-separated stakeholder fields (e.g. sponsors) are looked up in the inverted index
+        owner_phases = model.stakeholder_phases(owner, project_owner_key)
+
+    # reuse the block from disk if none of the owner's records changed since it was rendered
+    if owner_block_cache is not None:
+        block_key = OwnerBlockCache.block_key(owner, project_owner_key, phases_order, justification_block)
+        inputs_digest = OwnerBlockCache.inputs_digest(
+            [lines for next_phase in phases_order for lines in owner_phases.get(next_phase, [])],
+            owner_block_input_keys, today_date_obj - timedelta(days=RECENT_NOTES_DAYS))
+        block = owner_block_cache.get(block_key, inputs_digest)
+        if block is not None:
+            logging.info(f"Owner block for {owner} unchanged, reused from cache")
+            return block
+
     for next_phase in phases_order:
-        for lines in project_records_list:
-            # step through the project list to find owners and active projects of the ordered type
-            _current_project_phase = project_phases[lines["Phases"]]  # convert phase name to sequence number
-            if owner in lines[project_owner_key] and _current_project_phase == next_phase:
-                logging.info(f"Processing {lines['Project']} in Phase {next_phase} for {owner}")
-                counts[_current_project_phase] += 1
-                result.append(f'### {lines["Project"]}<br>*Mission: {lines["MISSION_ALIGNMENT"]}*\n\n')
-                result.append(f'<u>Project phase</u>: _{lines["Phases"]}_ ')
-                result.append(f'&nbsp; &nbsp; &nbsp; 📆 Active for {lines["COMPUTED_AGE_DAYS"]} days &'
-                              f' In-Progress for {lines["COMPUTED_IN_PROGRESS_AGE_DAYS"]} days\n\n')
-                result.append(f'<u>Project sponsor(s)</u>: {lines["BUSINESS_SPONSOR"]} ')
-                result.append(f'&nbsp; &nbsp; &nbsp;  👕 <u>Size</u>: {size_repr(lines["T-SHIRT_SIZE"])} \n\n')
-                if project_owner_key != "ANALYTICS_DS_OWNER":
-                    result.append(f'<u>Data Analyst</u>: {lines["ANALYTICS_DS_OWNER"]} | '
-                                  f'[Charter]({lines["COMPUTED_CHARTER_LINK"]}) | '
-                                  f'[Project Info]({lines["COMPUTED_PROJECT_INFO_LINK"]})\n\n')
-                else:
-                    result.append(f'[Charter]({lines["COMPUTED_CHARTER_LINK"]}) | '
-                                  f'[Project Info]({lines["COMPUTED_PROJECT_INFO_LINK"]})\n\n')
-
-                notes_block = "\n\n".join(recent_notes(lines["NOTES"]))
-                result.extend(notes_block)
-                result.append("\n\n")
-                if justification_block and lines["COMMIT_JUSTIFICATIONS"] is not None:
-                    result.append(f'#### Case for Commit \n{lines["COMMIT_JUSTIFICATIONS"]}\n\n')
+        for lines in owner_phases.get(next_phase, []):
+            logging.info(f"Processing {lines['Project']} in Phase {next_phase} for {owner}")
+            counts[next_phase] += 1
+            result.append(model.fragments.get(lines, "owner_block_project", render_owner_block_project,
+                                              project_owner_key != "ANALYTICS_DS_OWNER", justification_block))
     if len(counts) > 0:
         # Only include this block if 1 or more projects found
         result.append(summarize_phase_counts(counts))
         ret = "".join(result)
+    if owner_block_cache is not None:
+        owner_block_cache.put(block_key, inputs_digest, ret)
     return ret
 
 
@@ -167,13 +225,10 @@ def synthesize_owner_block(project_records_list, owner, phase_filter='active', p
 ########################################################################################
 def create_stakeholders_views(project_records_list):
     # find unique stakeholders
-    owners = []
-    for lines in project_records_list:
-        owners.extend(extract_stakeholders(lines["BUSINESS_SPONSOR"]))
-    owners = set(owners)
+    owners = report_model(project_records_list).sorted_stakeholders("BUSINESS_SPONSOR")
     logging.debug(f"Processing {len(owners)} stakeholders: {owners}")
 
-    with open(stakeholders_views_active_path, "w") as outfile:
+    with report_file(stakeholders_views_active_path) as outfile:
         outfile.write("# Data Accelerator - Project Stakeholders Views - ACTIVE\n\n")
         outfile.write(f"({str(today_date_obj)[:19]})\n\n")
         for owner in owners:
@@ -186,125 +241,96 @@ def create_title_phase_views(project_records_list):
     """
     Create output units by phase for throughput and backlog overview
     """
-    with open(title_phase_views_path, "w") as outfile:
+    with report_file(title_phase_views_path) as outfile:
         outfile.write("# Data Accelerator Projects by Phase\n\n")
         counts = defaultdict(lambda: 0)
+        model = report_model(project_records_list)
         for _phase, index in project_phases.items():
             if index in [0, 9]:
                 continue
             outfile.write(f'### {_phase.split("-")[1]}\n\n')
             outfile.write('| <div style="width:450px">Projects</div> |\n')
             outfile.write("|---|\n")
-            for lines in project_records_list:
-                if _phase == lines["Phases"]:
-                    counts[index] += 1
-                    outfile.write(f'|{lines["Project"]} (👕:{size_repr(lines["T-SHIRT_SIZE"])})|\n')
+            for lines in model.phase_projects(index):
+                counts[index] += 1
+                outfile.write(f'|{lines["Project"]} (👕:{size_fragment(model.fragments, lines)})|\n')
         if len(counts) > 0:
             # Only include this block if 1 or more projects found
             outfile.write(summarize_phase_counts(counts))
 
 
-def create_weekly_owners_views(project_records_list):
+def render_weekly_owner_rows(project_records_list):
     """
-    Create output units by owner for weekly meeting update table
+    Render the weekly owner table rows of every active project once
 
-    This is an HTML document to take advantage of full table formatting control.
+    Records are partitioned by owner and then by phase in active_projects_order. Each project's
+    rows (project row and its recent notes) are rendered a single time and tagged with whether
+    the project belongs to GTM R1, so every weekly owner view can be written from the same fragments.
+
+    Returns:
+    dict: owner -> list of (is_gtm, rows html) in active phase order (owners with no active
+          projects have an empty list)
     """
-    # Timestamp exception to using common object - this is report generation time
-    current_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    # find unique owners
-    owners = set([lines["ANALYTICS_DS_OWNER"] for lines in project_records_list])
-    with open(weekly_owner_views_active_path, "w") as outfile:
-        outfile.write(CSS_STYLE)
+    model = report_model(project_records_list)
+    owners = model.sorted_owners()
+    partitions = {}
+    for owner in owners:
+        owner_rows = []
+        owner_phases = model.owner_phases(owner)
+        for next_phase in active_projects_order:
+            for lines in owner_phases.get(project_phases[next_phase], []):
+                rows = model.fragments.get(lines, "weekly_rows", render_weekly_project_rows)
+                owner_rows.append((lines["Project"].startswith(GTM_R1_PREFIX), rows))
+        partitions[owner] = owner_rows
+    return partitions
+
+
+def write_weekly_owner_table(outfile, partitions, current_timestamp, want_gtm=None):
+    """
+    Write the weekly owner table from rendered rows, optionally only the GTM R1 (want_gtm=True)
+    or non-GTM R1 (want_gtm=False) projects. Owners without rows in the table are skipped.
+    """
+    outfile.write('<table border=0.1>\n')
+    outfile.write(f"<tr><th>Projects</th><th>Info <span>(updated: {current_timestamp})</span></th></tr>\n")
+    for owner, owner_rows in partitions.items():
+        rows = [html for is_gtm, html in owner_rows if want_gtm is None or is_gtm == want_gtm]
+        if rows:
+            outfile.write(f'<tr class="tr-owner"><td colspan=2><b>{owner:}</b></td></tr>\n')
+            outfile.writelines(rows)
+
+
+def write_gtm_r1_weekly_owners_view(partitions, current_timestamp):
+    """
+    Write the weekly owner view split into GTM R1 projects (Project starts with 'GTM R1 -')
+    and Non-GTM R1 projects. Both sections use identical table/row formatting.
+    """
+    with report_file(gtm_r1_weekly_owner_views_active_path, volatile=UPDATED_TIMESTAMP_RE) as outfile:
+        outfile.write(css_style_gtm)
         outfile.write("<h1>DA Weekly - Project Owner Views - ACTIVE</h1>\n\n")
-        outfile.write('<table border=0.1>\n')
-        outfile.write(f"<tr><th>Projects</th><th>Info <span>(updated: {current_timestamp})</span></th></tr>\n")
-        for owner in owners:
-            owner_header = False;
-            counts = defaultdict(lambda: 0)
-            for next_phase in active_projects_order:
-                for lines in project_records_list:
-                    _phase = lines["Phases"]
-                    if lines["ANALYTICS_DS_OWNER"] == owner and _phase == next_phase:
-                        if not owner_header:
-                            owner_header = True
-                            outfile.write(f'<tr class="tr-owner"><td colspan=2><b>{owner:}</b></td></tr>\n')
-                        counts[_phase] += 1
-                        outfile.write(f'<tr class="tr-project">'
-                                      f'<td>{lines["Project"]}</td>'
-                                      f'<td>[{_phase}] active {lines["COMPUTED_AGE_DAYS"]} days &'
-                                      f' In-progress {lines["COMPUTED_IN_PROGRESS_AGE_DAYS"]} days '
-                                      f' (👕:{size_repr(lines["T-SHIRT_SIZE"])}) <br/>'
-                                      f'<a href="{lines["COMPUTED_CHARTER_LINK"]}" target="_blank">Charter</a> | '
-                                      f'<a href="{lines["COMPUTED_PROJECT_INFO_LINK"]}" target="_blank">Project Info</a>'
-                                      f'</td></tr>\n')
-                        notes_block = recent_notes(lines["NOTES"], limit=7)
-                        for note in notes_block:
-                            note = note.strip().replace("|", ":")
-                            outfile.write(f'<tr><td></td><td>{note}</td></tr>\n')
-        outfile.write('</table>')
+        for heading, want_gtm in [("GTM R1 Projects", True), ("Non-GTM R1 Projects", False)]:
+            outfile.write(f"<h2>{heading}</h2>\n\n")
+            write_weekly_owner_table(outfile, partitions, current_timestamp, want_gtm)
+            outfile.write("</table>\n\n")
         outfile.write(HTML_FOOTER)
 
 
-def create_gtm_r1_weekly_owners_views(project_records_list):
+def create_weekly_owners_views(project_records_list):
     """
-    Create output units by owner for weekly meeting update table (ACTIVE)
-    Split into two sections:
-      1) GTM R1 Projects (Project starts with 'GTM R1 -')
-      2) Non-GTM R1 Projects
+    Create output units by owner for weekly meeting update table
 
-    Both sections use identical table/row formatting.
+    This is an HTML document to take advantage of full table formatting control.
+    Both the ACTIVE view and the GTM R1 split view are written from the same rendered rows.
     """
+    # Timestamp exception to using common object - this is report generation time
     current_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    owners = set([lines["ANALYTICS_DS_OWNER"] for lines in project_records_list])
-    gtm_prefix = "GTM R1 -"
-
-    def _write_section(outfile, heading, want_gtm):
-        outfile.write(f"<h2>{heading}</h2>\n\n")
-        outfile.write('<table border=0.1>\n')
-        outfile.write(f"<tr><th>Projects</th><th>Info <span>(updated: {current_timestamp})</span></th></tr>\n")
-
-        for owner in owners:
-            owner_header = False
-            for next_phase in active_projects_order:
-                for lines in project_records_list:
-                    _phase = lines["Phases"]
-                    is_gtm = lines["Project"].startswith(gtm_prefix)
-
-                    if is_gtm != want_gtm:
-                        continue
-
-                    if lines["ANALYTICS_DS_OWNER"] == owner and _phase == next_phase:
-                        if not owner_header:
-                            owner_header = True
-                            outfile.write(f'<tr class="tr-owner"><td colspan=2><b>{owner:}</b></td></tr>\n')
-
-                        outfile.write(
-                            f'<tr class="tr-project">'
-                            f'<td>{lines["Project"]}</td>'
-                            f'<td>[{_phase}] active {lines["COMPUTED_AGE_DAYS"]} days &'
-                            f' In-progress {lines["COMPUTED_IN_PROGRESS_AGE_DAYS"]} days '
-                            f' (👕:{size_repr(lines["T-SHIRT_SIZE"])}) <br/>'
-                            f'<a href="{lines["COMPUTED_CHARTER_LINK"]}" target="_blank">Charter</a> | '
-                            f'<a href="{lines["COMPUTED_PROJECT_INFO_LINK"]}" target="_blank">Project Info</a>'
-                            f'</td></tr>\n'
-                        )
-
-                        notes_block = recent_notes(lines["NOTES"], limit=7)
-                        for note in notes_block:
-                            note = note.strip().replace("|", ":")
-                            outfile.write(f'<tr><td></td><td>{note}</td></tr>\n')
-
-        outfile.write("</table>\n\n")
-
-    with open(gtm_r1_weekly_owner_views_active_path, "w") as outfile:
-        outfile.write(css_style_gtm)
+    partitions = render_weekly_owner_rows(project_records_list)
+    with report_file(weekly_owner_views_active_path, volatile=UPDATED_TIMESTAMP_RE) as outfile:
+        outfile.write(CSS_STYLE)
         outfile.write("<h1>DA Weekly - Project Owner Views - ACTIVE</h1>\n\n")
-
-        _write_section(outfile, "GTM R1 Projects", want_gtm=True)
-        _write_section(outfile, "Non-GTM R1 Projects", want_gtm=False)
-
+        write_weekly_owner_table(outfile, partitions, current_timestamp)
+        outfile.write('</table>')
         outfile.write(HTML_FOOTER)
+    write_gtm_r1_weekly_owners_view(partitions, current_timestamp)
 
 
 def create_owners_commit_views(project_records_list):
@@ -318,11 +344,11 @@ def create_owners_commit_views(project_records_list):
     Parameters:
     project_records (list of dict): A list of dictionaries, each representing a project record.
     """
-    # Extracting unique owners
-    unique_owners = {record["ANALYTICS_DS_OWNER"] for record in project_records_list}
+    # Extracting unique owners, in report order
+    unique_owners = report_model(project_records_list).sorted_owners()
 
     # Open the file for writing
-    with open(owner_views_commit_path, "w") as outfile:
+    with report_file(owner_views_commit_path) as outfile:
         # Write the header
         outfile.write("# Data Accelerator - Project Owner Views - COMMIT\n\n")
         # Timestamp
@@ -338,10 +364,10 @@ def create_owners_commit_views(project_records_list):
 
 
 def create_owners_views(project_records_list):
-    # find unique owners
-    owners = set([lines["ANALYTICS_DS_OWNER"] for lines in project_records_list])
+    # find unique owners, in report order
+    owners = report_model(project_records_list).sorted_owners()
 
-    with open(owner_views_active_path, "w") as outfile:
+    with report_file(owner_views_active_path) as outfile:
         outfile.write("# Data Accelerator - Project Owner Views - ACTIVE\n\n")
         outfile.write(f"({str(today_date_obj)[:19]})\n\n")
         for owner in owners:
@@ -349,7 +375,7 @@ def create_owners_views(project_records_list):
             # Deprecated SH 2025-08-25
             # outfile.write(synthesize_owner_maintenance_block(project_records_list, owner))
 
-    with open(owner_views_completed_path, "w") as outfile:
+    with report_file(owner_views_completed_path) as outfile:
         outfile.write("# Data Accelerator - Project Owner Views - COMPLETED & MAINTENANCE\n\n")
         outfile.write(f"({str(today_date_obj)[:19]})\n\n")
         for owner in owners:
@@ -381,7 +407,7 @@ def create_data_product_links(project_records):
 
     # Writing to file if there are links to write
     if markdown_links:
-        with open(data_product_links_path, "w") as outfile:
+        with report_file(data_product_links_path) as outfile:
             outfile.write("### Dashboard Links:\n\n")
             outfile.writelines(markdown_links)
 
@@ -392,17 +418,19 @@ def create_summary_csv(project_records):
 
     The CSV file includes headers as specified by 'project_params_dict.keys()' and
     maps field names using 'field_name_map'. Each project record in 'project_records'
-    is written as a row in the CSV file.
+    is written as a row in the CSV file; record keys that are not fields (e.g. the
+    parsed PHASE_HISTORY) are left out.
 
     Parameters:
     project_records (list of dict): A list of dictionaries, each representing a project record.
     """
 
     # Open the file for writing
-    with open(summary_path, "w", newline='') as outfile:
+    with report_file(summary_path, newline='') as outfile:
         # Initialize a CSV DictWriter with the specified field names and dialect
         logging.info(f'project_params_dict.keys(): {project_params_dict.keys()}')
-        csv_writer = csv.DictWriter(outfile, fieldnames=project_params_dict.keys(), dialect='excel')
+        csv_writer = csv.DictWriter(outfile, fieldnames=project_params_dict.keys(), dialect='excel',
+                                    extrasaction='ignore')
 
         # Write the header row based on field_name_map
         csv_writer.writeheader()
@@ -411,10 +439,32 @@ def create_summary_csv(project_records):
         csv_writer.writerows(project_records)
 
 
-def create_analytics_summary_csv(project_records):
+def analytics_summary_frame(project_records):
+    """
+    Returns the analytics summary table of the project records: every field but the notes and links.
+    """
     df_proj_records = pd.DataFrame(project_records, columns=project_params_dict.keys())
-    df_proj_records = df_proj_records.drop(['NOTES', 'COMPUTED_CHARTER_LINK', 'COMPUTED_PROJECT_INFO_LINK'], axis=1)
-    df_proj_records.to_csv(analytics_summary_path, index=False)
+    return df_proj_records.drop(['NOTES', 'COMPUTED_CHARTER_LINK', 'COMPUTED_PROJECT_INFO_LINK'], axis=1)
+
+
+def create_analytics_summary_csv(project_records):
+    # to_csv already ends lines with os.linesep
+    write_if_changed(analytics_summary_path, analytics_summary_frame(project_records).to_csv(index=False), newline='')
+
+
+def update_analytics_history(project_records):
+    """
+    Stores the analytics records of the run in the history store, as the snapshot of their Report_Date
+    (the latest one if they differ, the run date if they have none). Called before the reports are
+    created, so the reports reading the history see this run.
+    """
+    if analytics_history is None:
+        return
+    report_dates = {lines["Report_Date"] for lines in project_records if isinstance(lines.get("Report_Date"), date)}
+    if len(report_dates) > 1:
+        logging.warning(f"Analytics records of several report dates ({', '.join(map(str, sorted(report_dates)))}), "
+                        f"storing them as the snapshot of the latest")
+    analytics_history.append(analytics_summary_frame(project_records), max(report_dates, default=today_date_obj))
 
 
 def create_complete_stakeholder_list(project_records):
@@ -427,16 +477,13 @@ def create_complete_stakeholder_list(project_records):
     Returns:
     list of str: A list of unique stakeholders.
     """
-    stakeholders = set()
-
-    # Iterate over each project record and extract the stakeholders
-    for record in project_records:
-        stakeholders.update(extract_stakeholders(record["BUSINESS_SPONSOR"]))
+    # Unique stakeholders from the inverted index of the project records, in report order
+    stakeholders = report_model(project_records).sorted_stakeholders("BUSINESS_SPONSOR")
 
     stakeholderlist = synthesize_email(stakeholders)
 
     # Return the list of unique stakeholders
-    with open(stakeholder_list_path, "w") as outfile:
+    with report_file(stakeholder_list_path) as outfile:
         wrt = csv.writer(outfile)
         wrt.writerows(stakeholderlist)
 
@@ -473,7 +520,7 @@ kanban
         projects_by_phases[lines["Phases"]].append((lines["Project"], lines["ANALYTICS_DS_OWNER"]))
 
     base_url = sharepoint_url + sharepoint_path
-    with open(kanban_board_path, "w") as outfile:
+    with report_file(kanban_board_path) as outfile:
         outfile.write(mermaid_kanban_prefix)
         outfile.write("kanban\n")
         for _phase, index in project_phases.items():
@@ -488,24 +535,181 @@ kanban
                 outfile.write(f'    pid{id_cnt}[{project}]@{{ assigned: \'{owner}\' }}\n')
         outfile.write(mermaid_kanban_posfix)
 
+
+def format_flow_value(value):
+    """
+    Formats a flow report cell: dates as yyyy-mm-dd, whole numbers without decimals, missing values empty.
+    """
+    if isinstance(value, pd.Timestamp):
+        return value.strftime(DATE_FMT)
+    if isinstance(value, str):
+        return value
+    if pd.isna(value):
+        return ""
+    return f"{value:.0f}" if float(value).is_integer() else f"{value:.1f}"
+
+
+def flow_table(frame, index_label):
+    """
+    Renders a flow report table: the frame index as the first column, then the frame columns.
+    """
+    rows = ['<table border=0.1>\n',
+            f"<tr><th>{index_label}</th>" + "".join(f"<th>{column}</th>" for column in frame.columns) + "</tr>\n"]
+    for index, values in zip(frame.index, frame.itertuples(index=False)):
+        rows.append(f"<tr><td>{format_flow_value(index)}</td>"
+                    + "".join(f"<td>{format_flow_value(value)}</td>" for value in values) + "</tr>\n")
+    rows.append("</table>\n\n")
+    return "".join(rows)
+
+
+def cumulative_flow_svg(flow, width=900, height=300, legend_width=150):
+    """
+    Renders the cumulative flow as an SVG stacked area chart: one band per phase, the last phase of
+    `flow_phase_order` at the bottom, over the report dates.
+    """
+    days = (flow.index - flow.index[0]).days.to_numpy(dtype=np.float64)
+    x = days / max(days[-1], 1) * width
+    # stack from the last phase up, so finished work forms the bottom bands
+    phases = [phase for phase in reversed(flow.columns) if flow[phase].any()]
+    tops = np.cumsum(flow[phases].to_numpy(dtype=np.float64), axis=1)
+    y_scale = height / max(tops[:, -1].max(), 1)
+    svg = [f'<svg width="{width + legend_width}" height="{height + 20}" xmlns="http://www.w3.org/2000/svg">\n']
+    for column, phase in enumerate(phases):
+        top = height - tops[:, column] * y_scale
+        bottom = height - (tops[:, column - 1] if column else np.zeros(len(x))) * y_scale
+        points = " ".join(f"{px:.1f},{py:.1f}" for px, py in zip(np.concatenate([x, x[::-1]]),
+                                                               np.concatenate([top, bottom[::-1]])))
+        svg.append(f'<polygon points="{points}" fill="{flow_phase_colors.get(phase, "#c6c7c4")}">'
+                   f'<title>{phase}</title></polygon>\n')
+    for row, phase in enumerate(reversed(phases)):
+        svg.append(f'<rect x="{width + 10}" y="{10 + row * 20}" width="12" height="12" '
+                   f'fill="{flow_phase_colors.get(phase, "#c6c7c4")}"/>'
+                   f'<text x="{width + 28}" y="{21 + row * 20}" font-size="12">{phase}</text>\n')
+    svg.append(f'<text x="0" y="{height + 15}" font-size="12">{format_flow_value(flow.index[0])}</text>'
+               f'<text x="{width}" y="{height + 15}" font-size="12" text-anchor="end">'
+               f'{format_flow_value(flow.index[-1])}</text>\n')
+    svg.append("</svg>\n\n")
+    return "".join(svg)
+
+
+def create_flow_report(project_records_list):
+    """
+    Create the flow report from every snapshot in the analytics history store: cumulative flow
+    per phase, cycle-time distributions of the completed projects and WIP age percentiles.
+
+    The metrics are computed with group-bys over the history columns, not from the project
+    records: the records of this run are already in the store (see update_analytics_history).
+    This is an HTML document in the style of the weekly owner views.
+    """
+    if analytics_history is None:
+        logging.info("Analytics history is turned off, no flow report")
+        return
+    history = analytics_history.scan(flow_history_columns)
+    with report_file(flow_report_path) as outfile:
+        outfile.write(CSS_STYLE)
+        outfile.write("<h1>Data Accelerator - Project Flow</h1>\n\n")
+        if history.empty:
+            outfile.write("<h2>No analytics history yet</h2>\n")
+            outfile.write(HTML_FOOTER)
+            return
+        flow = cumulative_flow(history)
+        weeks = weekly_report_dates(history)
+        outfile.write(f"<h3>{len(flow)} snapshots, {format_flow_value(flow.index[0])} to "
+                      f"{format_flow_value(flow.index[-1])}</h3>\n\n")
+
+        outfile.write("<h2>Cumulative Flow</h2>\n\n")
+        outfile.write(cumulative_flow_svg(flow))
+        weekly_flow = flow.loc[weeks]
+        outfile.write(flow_table(weekly_flow.assign(Total=weekly_flow.sum(axis=1)), "Week (last snapshot)"))
+
+        outfile.write("<h2>Cycle Time (days)</h2>\n\n")
+        for key in flow_cycle_time_keys:
+            outfile.write(f"<h3>{key}</h3>\n\n")
+            outfile.write(flow_table(cycle_times(history, key), "Completed"))
+
+        latest = flow.index[-1]
+        outfile.write(f"<h2>WIP Age (days in phase, {format_flow_value(latest)})</h2>\n\n")
+        outfile.write(flow_table(wip_age_percentiles(history, latest), "Phase"))
+        outfile.write(f"<h2>WIP Age Trend (P{FLOW_REPORT_TREND_PERCENTILE} days in phase)</h2>\n\n")
+        outfile.write(flow_table(wip_age_trend(history, weeks), "Week (last snapshot)"))
+        outfile.write(HTML_FOOTER)
+
     
-def create_reports(project_records_list):
-    # Create all the standard reports
-    reports_list  = [
-    create_summary_csv,
-    create_analytics_summary_csv,
-    create_data_product_links,
-    create_owners_views,
-    create_owners_commit_views,
-    create_weekly_owners_views,
-    create_stakeholders_views,
-    create_title_phase_views,
-    create_complete_stakeholder_list,
-    create_kanban_board,
-    create_gtm_r1_weekly_owners_views
-    ]
-    for func_idx in tqdm.trange(len(reports_list), desc="Creating Reports"):
-        reports_list[func_idx](project_records_list)
+# Record keys read by each standard report (None: every key)
+_owner_block_keys = {"Phases", "Project", "ANALYTICS_DS_OWNER", "BUSINESS_SPONSOR", "MISSION_ALIGNMENT",
+                     "T-SHIRT_SIZE", "COMPUTED_AGE_DAYS", "COMPUTED_IN_PROGRESS_AGE_DAYS", "COMPUTED_CHARTER_LINK",
+                     "COMPUTED_PROJECT_INFO_LINK", "NOTES"}
+# Record keys an owner block is rendered from, the inputs of its cache entry
+owner_block_input_keys = sorted(_owner_block_keys | {"COMMIT_JUSTIFICATIONS"})
+_weekly_owner_keys = {"Phases", "Project", "ANALYTICS_DS_OWNER", "T-SHIRT_SIZE", "COMPUTED_AGE_DAYS",
+                      "COMPUTED_IN_PROGRESS_AGE_DAYS", "COMPUTED_CHARTER_LINK", "COMPUTED_PROJECT_INFO_LINK", "NOTES"}
+report_input_keys = {
+    create_summary_csv: None,
+    create_analytics_summary_csv: set(project_params_dict) - {"NOTES", "COMPUTED_CHARTER_LINK",
+                                                              "COMPUTED_PROJECT_INFO_LINK"},
+    create_data_product_links: {"Phases", "Project", "DATA_PRODUCT_LINK"},
+    create_owners_views: _owner_block_keys,
+    create_owners_commit_views: _owner_block_keys | {"COMMIT_JUSTIFICATIONS"},
+    create_weekly_owners_views: _weekly_owner_keys,
+    create_stakeholders_views: _owner_block_keys,
+    create_title_phase_views: {"Phases", "Project", "T-SHIRT_SIZE"},
+    create_complete_stakeholder_list: {"BUSINESS_SPONSOR"},
+    create_kanban_board: {"Phases", "Project", "ANALYTICS_DS_OWNER"},
+    create_flow_report: set(flow_history_columns),
+}
+# All the standard reports, in generation order
+standard_reports = list(report_input_keys)
+
+
+def reports_affected_by(changed_keys):
+    """
+    Selects the standard reports whose output depends on any of the changed record keys.
+
+    Args:
+        changed_keys (set[str]): Record keys whose values changed, or that belong to a
+            project that was added or removed.
+
+    Returns:
+        list: The report functions to regenerate, in generation order.
+    """
+    return [func for func in standard_reports
+            if report_input_keys[func] is None or not report_input_keys[func].isdisjoint(changed_keys)]
+
+
+def create_reports(project_records_list, reports_list=None, executor=None):
+    """
+    Creates the standard reports (or the given subset of them) from the project records.
+
+    The reports run concurrently on the executor (by default a `ReportExecutor` in the
+    configured `REPORT_MODE`). A failing report is logged and reported, and does not stop
+    the others.
+
+    Returns:
+        list[dict]: The outcome of each report (see `ReportExecutor.run`).
+    """
+    if reports_list is None:
+        reports_list = standard_reports
+    if executor is None:
+        executor = ReportExecutor()
+    model = report_model(project_records_list)  # index the records once, before the reports share them
+    with tqdm.tqdm(total=len(reports_list), desc="Creating Reports") as progress_bar:
+        outcomes = executor.run(reports_list, project_records_list,
+                                initializer=configure_report_path_globals,
+                                initargs=(projects_tree_project_folders, today_date_obj),
+                                progress=progress_bar.update)
+    # fragments rendered in worker processes are counted there
+    logging.info(f"Report fragment cache: {model.fragments.stats()}")
+    if owner_block_cache is not None:
+        logging.info(f"Owner block cache: {owner_block_cache.stats()}")
+    for outcome in outcomes:
+        if outcome["error"] is not None:
+            print(f'Report {outcome["report"]} failed: {outcome["error"].strip().splitlines()[-1]}')
+    changed = [os.path.basename(path) for outcome in outcomes for path, written in outcome["outputs"] if written]
+    unchanged = sum(not written for outcome in outcomes for _, written in outcome["outputs"])
+    logging.info(f"Reports changed: {changed}, {unchanged} unchanged")
+    print(f"Reports changed: {', '.join(changed) if changed else 'none'} ({unchanged} unchanged)")
+    return outcomes
+
 
 def configure_report_path_globals(projects_tree_root, today_dt):
     global today_date_obj
@@ -521,7 +725,10 @@ def configure_report_path_globals(projects_tree_root, today_dt):
     global title_phase_views_path
     global stakeholder_list_path
     global kanban_board_path
+    global flow_report_path
     global gtm_r1_weekly_owner_views_active_path
+    global owner_block_cache
+    global analytics_history
     today_date_obj = today_dt
     # TODO fix this between test and prod
     if projects_tree_root.endswith(project_folders_root):
@@ -539,7 +746,15 @@ def configure_report_path_globals(projects_tree_root, today_dt):
     title_phase_views_path = os.path.join(projects_tree_project_folders, "phase_views.md")
     stakeholder_list_path = os.path.join(projects_tree_project_folders, "stakeholder_list.txt")
     kanban_board_path = os.path.join(projects_tree_project_folders, "kanban_board.html")
+    flow_report_path = os.path.join(projects_tree_project_folders, "flow_report.html")
     gtm_r1_weekly_owner_views_active_path = os.path.join(projects_tree_project_folders, "gtm_r1_weekly_owner_views_active.html")
+    owner_block_cache = None
+    if OWNER_BLOCK_CACHE:
+        owner_block_cache = OwnerBlockCache(os.path.join(local_cache_dir(projects_tree_project_folders),
+                                                         owner_block_cache_dirname))
+    analytics_history = None
+    if ANALYTICS_HISTORY:
+        analytics_history = AnalyticsHistoryStore(analytics_history_dir(projects_tree_project_folders))
 
 
 def size_repr(size_string):
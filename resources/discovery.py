@@ -0,0 +1,113 @@
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from reports.configurations import *
+
+
+def resolve_project_folders(projects_tree_root):
+    """
+    Resolves the "Projects Folders" directory from the configured tree root.
+
+    The tree root may point either at the "Projects Folders" directory itself or at its
+    parent, mirroring the handling in `reports.summary.configure_report_path_globals`.
+
+    Args:
+        projects_tree_root (str): The root directory of the projects tree.
+
+    Returns:
+        str: The path of the "Projects Folders" directory.
+    """
+    if projects_tree_root.rstrip("/").endswith(project_folders_root):
+        return projects_tree_root.rstrip("/")
+    return os.path.join(projects_tree_root, project_folders_root)
+
+
+def local_cache_dir(projects_tree_root):
+    """
+    Returns the local cache directory of a projects tree: a subdirectory of `local_cache_root`
+    named after the "Projects Folders" path, so caches stay out of the synced tree and trees
+    (e.g. prod and a test snapshot) do not share them.
+
+    Args:
+        projects_tree_root (str): The root directory of the projects tree.
+
+    Returns:
+        str: The cache directory path (not created here).
+    """
+    project_folders = os.path.abspath(resolve_project_folders(projects_tree_root))
+    tree_digest = hashlib.sha256(project_folders.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(local_cache_root, tree_digest)
+
+
+def list_subdirectories(path):
+    """
+    Lists the immediate subdirectories of a path with a single `os.scandir` call. Dot entries
+    (hidden folders, e.g. of a sync client) are skipped.
+
+    Args:
+        path (str): The directory to list.
+
+    Returns:
+        list[str]: Sorted full paths of the subdirectories, or an empty list if the
+        directory could not be read.
+    """
+    try:
+        with os.scandir(path) as entries:
+            return sorted(entry.path for entry in entries if entry.is_dir() and not entry.name.startswith("."))
+    except OSError as e:
+        logging.warning(f"Unable to list directory {path}: {e}")
+        return []
+
+
+def list_files(path):
+    """
+    Lists the files (non-directories) directly in a project folder without recursing.
+
+    Args:
+        path (str): The project directory to list.
+
+    Returns:
+        list[str] | None: Sorted file names in the directory, or None if the directory
+        could not be read.
+    """
+    try:
+        with os.scandir(path) as entries:
+            return sorted(entry.name for entry in entries if not entry.is_dir())
+    except OSError as e:
+        logging.warning(f"Unable to list directory {path}: {e}")
+        return None
+
+
+def discover_projects(projects_tree_root, max_workers=DISCOVERY_WORKERS):
+    """
+    Discovers project folders in the fixed `<Projects Folders>/<phase>/<project>` layout.
+
+    Phase folders are listed first, then the project folders of every phase and the files
+    of every project folder are listed concurrently in a thread pool. Nothing below the
+    project level is ever listed. Results are yielded in a stable (sorted) order as soon as
+    each one is available, so callers can start building `ProjectFileObject` instances
+    while the remaining directories are still being listed.
+
+    Args:
+        projects_tree_root (str): The root directory of the projects tree.
+        max_workers (int): Maximum number of concurrent directory listings.
+
+    Yields:
+        tuple[str, list[str]]: The project root path and the names of the files in it,
+        for every project folder containing a project info file.
+    """
+    project_folders = resolve_project_folders(projects_tree_root)
+    phase_roots = list_subdirectories(project_folders)
+    logging.info(f"Discovered {len(phase_roots)} phase folders in {project_folders}")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        project_roots = [project_root
+                         for project_roots_in_phase in executor.map(list_subdirectories, phase_roots)
+                         for project_root in project_roots_in_phase]
+        logging.info(f"Discovered {len(project_roots)} project folders")
+        for project_root, files in zip(project_roots, executor.map(list_files, project_roots)):
+            if files is None or project_info_filename not in files:
+                logging.warning(f"Skipping {project_root}")
+                continue
+            yield project_root, files
@@ -2,7 +2,7 @@ import logging
 from datetime import date, datetime
 
 from reports.configurations import *
-from reports.parser import normalize_note_date, order_strings_by_date
+from resources.notes import ProjectNotes
 
 
 class AggregateLines:
@@ -28,23 +28,20 @@ class AggregateLines:
 
     def get_notes(self, project_file_name=None):
         """
-        Retrieves and processes notes from the aggregate dictionary.
+        Retrieves and parses the notes from the aggregate dictionary.
 
-        This method extracts notes from the "NOTES" section of the aggregate dictionary,
-        normalizes their date format, orders them chronologically, and concatenates
-        them into a single string with a specified delimiter. If no notes are found
-        in the aggregate dictionary, a default message is returned.
+        This method parses the lines in the "NOTES" section of the aggregate dictionary once
+        into typed note records (date, sequence number, text), ordered most recent first.
+        Reports consume the records directly; `str()` of the result gives the legacy
+        `NOTES_DELIMITER`-joined string, or a default message if no notes are available.
 
         Returns:
-            str: A single string containing all formatted and sorted notes, separated by the
-            defined delimiter, or a default message if no notes are available.
+            ProjectNotes: The parsed and sorted notes (empty if no notes are available).
         """
         if "NOTES" in self.aggregate_dict:
-            notes_list = [normalize_note_date(obj.line, project_file_name) for obj in self.aggregate_dict["NOTES"]]
-            notes_list = order_strings_by_date(notes_list)
-            return NOTES_DELIMITER.join(notes_list) + "\n\n"
+            return ProjectNotes.from_lines((obj.line for obj in self.aggregate_dict["NOTES"]), project_file_name)
         else:
-            return "No notes found.\n\n"
+            return ProjectNotes()
 
     def get_commit_justifications(self):
         """
@@ -88,11 +85,20 @@ class AggregateLines:
             return ""
 
 
+# Marks a typed value that has not been parsed yet
+_UNPARSED = object()
+
+
 class StringLine:
+    # Projects hold one StringLine per field and note until they are finalized, so keep them compact
+    __slots__ = ("line", "key", "value", "is_in_reports", "existing_variable_updated", "add_new_variable",
+                 "is_comment", "aggregate_key", "span", "_date_value", "_int_value")
+
     def __init__(self, line=None, key=None, value=None, new=False, in_reports=True):
         self.line = line  # Single line from project file
-        self.date_value = None  # Parsed date value if applicable
-        self.int_value = None  # Parsed integer value if applicable
+        self.span = None  # Where the line is in the project file (see resources.tokenizer.LineSpan), if parsed
+        self._date_value = _UNPARSED  # Parsed date value if applicable, computed on first access
+        self._int_value = _UNPARSED  # Parsed integer value if applicable, computed on first access
         self.key = None
         self.value = None
         # Flags
@@ -106,6 +112,38 @@ class StringLine:
         self.aggregate_key = None  # This line belongs to which aggregate key...
         self.compute_aggregate_key()
 
+    @classmethod
+    def from_token(cls, line, key, value, aggregate_key=None, span=None):
+        """
+        Creates a line object from a line already split by `resources.tokenizer.tokenize_spans`,
+        without re-parsing it. Typed values are parsed on first access, and only for declared
+        date and integer fields.
+
+        Args:
+            line: The stripped line from the project file.
+            key: The key of the line.
+            value: The value of the line.
+            aggregate_key: The aggregate key (e.g. "NOTES") for aggregate lines, else None.
+            span: The `resources.tokenizer.LineSpan` of the line in the project file, used to
+                patch the line in place when its value is updated.
+
+        Returns:
+            StringLine: The line object.
+        """
+        obj = cls.__new__(cls)
+        obj.line = line
+        obj.span = span
+        obj.key = key
+        obj.value = value
+        obj._date_value = _UNPARSED
+        obj._int_value = _UNPARSED
+        obj.is_in_reports = True
+        obj.existing_variable_updated = False
+        obj.add_new_variable = False
+        obj.is_comment = False
+        obj.aggregate_key = aggregate_key
+        return obj
+
     def route_line_for_parsing(self, key, value, new):
         """
         Sets or parses a line for processing and extraction while maintaining proper formatting
@@ -145,8 +183,6 @@ class StringLine:
             # if the line starts with a comment, set it as a comment
             self.value = self.line[1:].strip()
             self.is_comment = True
-        self.parse_date_if_present()
-        self.parse_int_if_present()
 
     def parse_line(self) -> str:
         if self.line is not None and self.line != "":
@@ -176,55 +212,61 @@ class StringLine:
             elif self.key.lower().startswith("commit_justification"):
                 self.aggregate_key = "COMMIT_JUSTIFICATIONS"
 
-    def parse_int_if_present(self):
+    @property
+    def int_value(self):
         """
-        Attempts to parse the instance's value as an integer, if present.
+        The value parsed as an integer, computed on first access.
 
-        This method checks if the `value` attribute is not None. If `value` is not None,
-        it attempts to convert it to an integer and stores the result in the `int_value`
-        attribute. If the conversion fails due to an invalid format or type, it logs a
-        debug message indicating that the parsing attempt failed.
+        Values that are already integers are returned as-is. String values are only
+        converted for the integer fields declared in `int_params`; if the conversion fails
+        due to an invalid format or type, a debug message is logged and None is returned.
 
-        Raises:
-            ValueError: If the attribute `value` cannot be converted to an integer.
-            TypeError: If the attribute `value` is of an incompatible type.
+        Returns:
+            int | None: The integer value, or None if the value is not an integer.
         """
-        if self.value is not None:
-            try:
-                self.int_value = int(self.value)
-            except (ValueError, TypeError):
-                logging.debug(f"Invalid integer format in line: {self.line}")
+        if self._int_value is _UNPARSED:
+            self._int_value = None
+            if isinstance(self.value, int):
+                self._int_value = self.value
+            elif self.value is not None and self.key in int_params:
+                try:
+                    self._int_value = int(self.value)
+                except (ValueError, TypeError):
+                    logging.debug(f"Invalid integer format in line: {self.line}")
+        return self._int_value
 
-    def parse_date_if_present(self):
-        """
-        Parses and assigns a date value to the attribute `date_value` if the attribute
-        `value` is present and is of a recognizable date or datetime format.
+    @int_value.setter
+    def int_value(self, value):
+        self._int_value = value
 
-        Raises:
-            None: The function does not raise exceptions directly but will log a debug
-            message if the `value` does not match the expected date format or is of an
-            unrecognized type.
+    @property
+    def date_value(self):
+        """
+        The value parsed as a date, computed on first access.
 
-        Args:
-            None: This method does not take any arguments directly. It operates on the
-            instance's attributes.
+        `date` and `datetime` values are returned as dates. String values are only parsed
+        for the date fields declared in `date_params`; if the value does not match the
+        expected date format, a debug message is logged and None is returned.
 
         Returns:
-            None: The method modifies the instance attribute `date_value` directly and
-            does not return any value.
+            date | None: The date value, or None if the value is not a date.
         """
-        if self.value is not None:
+        if self._date_value is _UNPARSED:
+            self._date_value = None
             if isinstance(self.value, datetime):
-                self.date_value = self.value.date()
-                return
+                self._date_value = self.value.date()
             elif isinstance(self.value, date):
-                self.date_value = self.value
-                return
-            else:
+                self._date_value = self.value
+            elif self.value is not None and self.key in date_params:
                 try:
-                    self.date_value = datetime.strptime(self.value, DATE_FMT).date()
+                    self._date_value = datetime.strptime(self.value, DATE_FMT).date()
                 except (ValueError, TypeError):
                     logging.debug(f"Invalid date format in line: {self.line}")
+        return self._date_value
+
+    @date_value.setter
+    def date_value(self, value):
+        self._date_value = value
 
     def update_value(self, value: str):
         """
@@ -233,8 +275,8 @@ class StringLine:
         The method checks if the provided value is not None, not an empty string, and
         differs from the current stored value. If these conditions are met, it updates
         the value, reformats the line with the key-value pair, marks that the variable
-        has been updated, and triggers specific parsing functions to check for date
-        or integer values within the updated input.
+        has been updated, and resets the typed date and integer values so they are parsed
+        again from the updated input on next access.
 
         Args:
             value (str): The new value to be assigned. Must be a non-empty string and
@@ -246,8 +288,8 @@ class StringLine:
             self.value = str(value).strip()
             self.line = f"{self.key}: {self.value}"
             self.existing_variable_updated = True
-            self.parse_date_if_present()
-            self.parse_int_if_present()
+            self._date_value = _UNPARSED
+            self._int_value = _UNPARSED
 
     def get(self, key: str = None, project_file_name=None):
         """
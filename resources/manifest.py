@@ -0,0 +1,262 @@
+import hashlib
+import json
+import logging
+import os
+from datetime import date, datetime
+
+from reports.configurations import *
+from resources.notes import ProjectNotes
+from resources.phase_history import ProjectPhaseHistory
+
+MANIFEST_VERSION = 3
+
+
+def file_digest(file_path):
+    """
+    Computes the SHA-256 hex digest of a file's contents.
+
+    Args:
+        file_path (str): The path of the file to hash.
+
+    Returns:
+        str: The hex digest of the file contents.
+    """
+    with open(file_path, "rb") as infile:
+        return hashlib.sha256(infile.read()).hexdigest()
+
+
+def files_digest(files):
+    """
+    Computes a digest of a project folder listing. Charter links are derived from the
+    folder listing, so a new or renamed charter must invalidate the cached record even
+    when the project info file itself is unchanged.
+
+    Args:
+        files (list[str]): The file names in the project folder.
+
+    Returns:
+        str: The hex digest of the sorted file names.
+    """
+    return hashlib.sha256("\n".join(sorted(files)).encode("utf-8")).hexdigest()
+
+
+def encode_record(record):
+    """
+    Converts a `get_legacy_params()` record into a JSON-serializable dictionary.
+
+    Dates, notes and phase histories are tagged so they can be restored to `date`,
+    `ProjectNotes` and `ProjectPhaseHistory` objects by `decode_record`.
+
+    Args:
+        record (dict): The legacy params record of a project.
+
+    Returns:
+        dict: The JSON-serializable record.
+    """
+    encoded = {}
+    for key, value in record.items():
+        if isinstance(value, date):
+            encoded[key] = {"__date__": value.strftime(DATE_FMT)}
+        elif isinstance(value, ProjectNotes):
+            encoded[key] = {"__notes__": value.to_list()}
+        elif isinstance(value, ProjectPhaseHistory):
+            encoded[key] = {"__phase_history__": value.to_list()}
+        else:
+            encoded[key] = value
+    return encoded
+
+
+def decode_record(encoded):
+    """
+    Restores a record serialized with `encode_record`.
+
+    Args:
+        encoded (dict): The JSON-decoded record.
+
+    Returns:
+        dict: The legacy params record with date and notes values restored.
+    """
+    record = {}
+    for key, value in encoded.items():
+        if isinstance(value, dict) and "__date__" in value:
+            record[key] = datetime.strptime(value["__date__"], DATE_FMT).date()
+        elif isinstance(value, dict) and "__notes__" in value:
+            record[key] = ProjectNotes.from_list(value["__notes__"])
+        elif isinstance(value, dict) and "__phase_history__" in value:
+            record[key] = ProjectPhaseHistory.from_list(value["__phase_history__"])
+        else:
+            record[key] = value
+    return record
+
+
+def refresh_record_ages(record, today_date_obj):
+    """
+    Recomputes the date-derived ages of a cached record for the given date.
+
+    Only the ages that change with the calendar are refreshed (see `phase_age_keys`);
+    everything else in the record is reused as-is. The report date is set to `today_date_obj`,
+    as for a parsed record.
+
+    Args:
+        record (dict): The legacy params record of a project. Modified in place.
+        today_date_obj (date): The date the ages are computed against.
+
+    Returns:
+        dict: The refreshed record.
+    """
+    for date_key, age_key in phase_age_keys.get(record["Phases"], []):
+        phase_start_date = record.get(date_key)
+        if isinstance(phase_start_date, date):
+            record[age_key] = (today_date_obj - phase_start_date).days
+    record["Report_Date"] = today_date_obj
+    return record
+
+
+class ProjectManifest:
+    def __init__(self, manifest_path):
+        """
+        Initializes an empty manifest of processed project files.
+
+        Entries are keyed by `Project_ID` and indexed by project root path, and hold the
+        mtime, size and content hash of the project info file together with the last
+        `get_legacy_params()` record produced for it.
+
+        Args:
+            manifest_path (str): The path of the manifest file on disk.
+        """
+        self.manifest_path = manifest_path
+        self.projects = {}  # Project_ID -> entry
+        self.path_index = {}  # project root -> Project_ID
+        self.stale_ages = {}  # project root -> (files, age keys) of the hits whose refreshed ages changed
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, manifest_path):
+        """
+        Loads a manifest from disk. A missing or unreadable manifest yields an empty one,
+        which makes the run a full run.
+
+        Args:
+            manifest_path (str): The path of the manifest file on disk.
+
+        Returns:
+            ProjectManifest: The loaded manifest.
+        """
+        manifest = cls(manifest_path)
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as infile:
+                data = json.load(infile)
+        except FileNotFoundError:
+            logging.info(f"No manifest found at {manifest_path}, starting a full run")
+            return manifest
+        except (OSError, ValueError) as e:
+            logging.warning(f"Unable to read manifest {manifest_path} ({e}), starting a full run")
+            return manifest
+        if data.get("version") != MANIFEST_VERSION:
+            logging.warning(f"Manifest version {data.get('version')} is not {MANIFEST_VERSION}, starting a full run")
+            return manifest
+        manifest.projects = data["projects"]
+        manifest.path_index = {entry["path"]: project_id for project_id, entry in manifest.projects.items()}
+        logging.info(f"Loaded manifest with {len(manifest.projects)} projects from {manifest_path}")
+        return manifest
+
+    def save(self):
+        """
+        Writes the manifest to disk atomically (temp file and rename).
+        """
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as outfile:
+            json.dump({"version": MANIFEST_VERSION, "projects": self.projects}, outfile)
+        os.replace(tmp_path, self.manifest_path)
+        logging.info(f"Saved manifest with {len(self.projects)} projects to {self.manifest_path}")
+
+    def cached_record(self, project_root, files, today_date_obj):
+        """
+        Returns the cached record for a project if its project info file and folder listing
+        are unchanged since the last run, with date-derived ages refreshed.
+
+        The file is only hashed when its size matches but its mtime does not (e.g. a sync
+        client touched it), so an unchanged portfolio costs one `stat` per project. Hits whose
+        refreshed ages differ from the cached ones are listed in `stale_ages`, so the new ages
+        can be written back to the project info file (see
+        `resources.project_file.build_age_refresh_result`).
+
+        Args:
+            project_root (str): The project root directory.
+            files (list[str]): The file names in the project folder.
+            today_date_obj (date): The date the ages are computed against.
+
+        Returns:
+            dict | None: The refreshed legacy params record, or None if the project must be
+            parsed again.
+        """
+        project_id = self.path_index.get(project_root)
+        entry = self.projects.get(project_id)
+        if entry is None or entry["path"] != project_root or entry["files_digest"] != files_digest(files):
+            self.misses += 1
+            return None
+        file_path = os.path.join(project_root, project_info_filename)
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            self.misses += 1
+            return None
+        if stat.st_size != entry["size"]:
+            self.misses += 1
+            return None
+        if stat.st_mtime_ns != entry["mtime_ns"]:
+            if file_digest(file_path) != entry["sha256"]:
+                self.misses += 1
+                return None
+            entry["mtime_ns"] = stat.st_mtime_ns
+        self.hits += 1
+        logging.debug(f"Manifest hit for {project_root}")
+        record = decode_record(entry["record"])
+        cached_ages = {age_key: record.get(age_key) for _, age_key in phase_age_keys.get(record["Phases"], [])}
+        refresh_record_ages(record, today_date_obj)
+        age_keys = [age_key for age_key, age in cached_ages.items() if record.get(age_key) != age]
+        if age_keys:
+            self.stale_ages[project_root] = (files, age_keys)
+        return record
+
+    def update(self, project_root, files, record):
+        """
+        Records the current state of a project's info file. Call after the file has been
+        finalized so the stored mtime, size and hash match what is on disk.
+
+        Args:
+            project_root (str): The project root directory.
+            files (list[str]): The file names in the project folder.
+            record (dict): The legacy params record produced for the project.
+        """
+        file_path = os.path.join(project_root, project_info_filename)
+        stat = os.stat(file_path)
+        project_id = record["Project_ID"]
+        previous = self.projects.get(project_id)
+        if previous is not None and previous["path"] != project_root:
+            self.path_index.pop(previous["path"], None)
+        self.projects[project_id] = {
+            "path": project_root,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": file_digest(file_path),
+            "files_digest": files_digest(files),
+            "record": encode_record(record),
+        }
+        self.path_index[project_root] = project_id
+
+    def prune(self, seen_project_roots):
+        """
+        Drops entries for projects that were not discovered in this run.
+
+        Args:
+            seen_project_roots (set[str]): The project roots discovered in this run.
+        """
+        for project_root in list(self.path_index):
+            if project_root not in seen_project_roots:
+                project_id = self.path_index.pop(project_root)
+                if self.projects.get(project_id, {}).get("path") == project_root:
+                    del self.projects[project_id]
+                logging.info(f"Pruned {project_root} from manifest")
@@ -0,0 +1,222 @@
+import logging
+import re
+from bisect import bisect_right
+from datetime import date, datetime
+
+from reports.configurations import *
+
+_date_re = re.compile(r"\d{4}-\d{1,2}-\d{1,2}")
+_date_seq_re = re.compile(r"\d{4}-\d{1,2}-\d{1,2}-\d{1,2}")  # date with sequence number
+
+
+class NoteRecord:
+    __slots__ = ("date", "seq", "text")
+
+    def __init__(self, note_date, seq, text):
+        """
+        A single project note, parsed once when the project file is loaded.
+
+        Args:
+            note_date (date): The date of the note.
+            seq (int | None): The sequence number of the note within its date (NOTES_yyyy-mm-dd-N),
+                or None for a plain dated note.
+            text (str): The note text.
+        """
+        self.date = note_date
+        self.seq = seq
+        self.text = text
+
+    @classmethod
+    def from_line(cls, note_line, project_file_name=None):
+        """
+        Parses a note line of a project information file (e.g. "NOTES_2025-5-1-2: text").
+
+        The head of the line may use underscores or dashes and unpadded months and days,
+        as accepted by `reports.parser.normalize_note_date`.
+
+        Args:
+            note_line (str): The raw note line.
+            project_file_name (str): The project file the line came from, for logging.
+
+        Returns:
+            NoteRecord: The parsed note.
+
+        Raises:
+            ValueError: If the note has no valid yyyy-mm-dd date.
+        """
+        try:
+            head, tail = note_line.strip().split(":", 1)
+        except ValueError:
+            logging.warning(f"WARN: Note is poorly formed ({note_line}) [{project_file_name}]")
+            # assume first space is between head and tail
+            head, tail = note_line.strip().split(" ", 1)
+        head = head.replace("_", "-")  # in case someone transposed in typing
+
+        seq = None
+        head_date = _date_seq_re.search(head)
+        if head_date is not None:
+            y, m, d, seq = head_date.group(0).split("-")
+            seq = int(seq)
+            logging.info(f"Sequence number {seq} found")
+        else:
+            head_date = _date_re.search(head)
+            if head_date is None:
+                raise ValueError(f"Note date is not in yyyy-mm-dd format: {head} [{project_file_name}]")
+            y, m, d = head_date.group(0).split("-")
+
+        try:
+            note_date = date(int(y), int(m), int(d))
+        except ValueError:
+            raise ValueError(f"Invalid note date ({y}-{m}-{d}) [{project_file_name}]")
+        return cls(note_date, seq, tail.strip())
+
+    def report_text(self):
+        """
+        Formats the note for the reports: "yyyy-mm-dd: text", or a bulleted "  N.  text" for
+        notes with a sequence number.
+        """
+        if self.seq is not None:
+            return f"  {self.seq}.  {self.text}"
+        return f"{self.date.strftime(DATE_FMT)}: {self.text}".strip()
+
+    def __eq__(self, other):
+        if not isinstance(other, NoteRecord):
+            return NotImplemented
+        return (self.date, self.seq, self.text) == (other.date, other.seq, other.text)
+
+    def __str__(self):
+        """
+        The normalized note line, "NOTES_yyyy-mm-dd: text" with a "::N::" suffix for notes
+        with a sequence number.
+        """
+        seq_suffix = f"::{self.seq}::" if self.seq is not None else ""
+        return f"NOTES_{self.date.strftime(DATE_FMT)}: {self.text}{seq_suffix}"
+
+
+def _since_index(neg_ordinals, since_date):
+    """
+    Returns how many leading entries of a newest-first array are on or after `since_date`.
+
+    Args:
+        neg_ordinals (list[int]): The negated date ordinals of the entries (ascending).
+        since_date (date): The earliest date to include.
+    """
+    return bisect_right(neg_ordinals, -since_date.toordinal())
+
+
+class ProjectNotes:
+    __slots__ = ("records", "neg_ordinals")
+
+    def __init__(self, records=()):
+        """
+        The notes of a project, most recent first. Notes sharing a date keep their file order.
+
+        The negated date ordinals are kept alongside the records in ascending order, so date
+        window queries are a binary search plus a slice.
+
+        Args:
+            records (iterable[NoteRecord]): The notes, in any order.
+        """
+        self.records = sorted(records, key=lambda record: record.date, reverse=True)
+        self.neg_ordinals = [-record.date.toordinal() for record in self.records]
+
+    def recent(self, since_date, limit=None):
+        """
+        Returns the notes dated on or after `since_date`, most recent first.
+
+        Args:
+            since_date (date): The earliest note date to include.
+            limit (int): The maximum number of notes to return (None for all).
+
+        Returns:
+            list[NoteRecord]: The notes in the window.
+        """
+        end = _since_index(self.neg_ordinals, since_date)
+        if limit is not None:
+            end = min(end, limit)
+        return self.records[:end]
+
+    @classmethod
+    def from_lines(cls, note_lines, project_file_name=None):
+        """
+        Parses the note lines of a project information file.
+
+        Args:
+            note_lines (iterable[str]): The raw note lines.
+            project_file_name (str): The project file the lines came from, for logging.
+
+        Returns:
+            ProjectNotes: The parsed and sorted notes.
+        """
+        return cls(NoteRecord.from_line(note_line, project_file_name) for note_line in note_lines)
+
+    def to_list(self):
+        """
+        Converts the notes into JSON-serializable [date, seq, text] lists.
+        """
+        return [[record.date.strftime(DATE_FMT), record.seq, record.text] for record in self.records]
+
+    @classmethod
+    def from_list(cls, note_list):
+        """
+        Restores notes converted with `to_list`.
+        """
+        return cls(NoteRecord(datetime.strptime(note_date, DATE_FMT).date(), seq, text)
+                   for note_date, seq, text in note_list)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __eq__(self, other):
+        if not isinstance(other, ProjectNotes):
+            return NotImplemented
+        return self.records == other.records
+
+    def __str__(self):
+        """
+        The notes joined with `NOTES_DELIMITER`, as written to the summary CSV.
+        """
+        if not self.records:
+            return "No notes found.\n\n"
+        return NOTES_DELIMITER.join(str(record) for record in self.records) + "\n\n"
+
+
+class PortfolioNoteIndex:
+    def __init__(self, project_records_list):
+        """
+        A date index of the notes of every project in the portfolio, most recent first.
+        Notes sharing a date keep the order of the records list and of each project's notes.
+
+        Args:
+            project_records_list (list[dict]): The project records; projects without notes
+                are skipped.
+        """
+        entries = []
+        for lines in project_records_list:
+            notes = lines.get("NOTES")
+            if isinstance(notes, ProjectNotes):
+                entries.extend((lines["Project"], note) for note in notes)
+        self.entries = sorted(entries, key=lambda entry: entry[1].date, reverse=True)
+        self.neg_ordinals = [-note.date.toordinal() for _, note in self.entries]
+
+    def recent(self, since_date, limit=None):
+        """
+        Returns the notes of all projects dated on or after `since_date`, most recent first.
+
+        Args:
+            since_date (date): The earliest note date to include.
+            limit (int): The maximum number of notes to return (None for all).
+
+        Returns:
+            list[tuple[str, NoteRecord]]: (project name, note) pairs in the window.
+        """
+        end = _since_index(self.neg_ordinals, since_date)
+        if limit is not None:
+            end = min(end, limit)
+        return self.entries[:end]
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,296 @@
+import logging
+import re
+from datetime import date, datetime
+
+import numpy as np
+
+from reports.configurations import *
+
+# "3-In Progress -> 4-On Hold DATE: 2026-01-15", as written by ProjectFileObject.determine_phase_change
+_phase_change_re = re.compile(r"(?P<from_phase>.+?)\s*->\s*(?P<to_phase>.+?)\s+DATE:\s*(?P<date>\d{4}-\d{1,2}-\d{1,2})")
+
+# Width of the phase axis of `PhaseHistoryStore.days_in_phase` (phase sequence numbers 0-9)
+PHASE_AXIS_SIZE = max(project_phases.values()) + 1
+# Phase code of the intervals in a phase that is not in `project_phases`
+UNKNOWN_PHASE = -1
+# Phase code of the dates before a project started, see `PhaseHistoryStore.phases_as_of`
+NOT_STARTED = -2
+
+
+def _stage_date(lines, phase):
+    """
+    Returns the COMPUTED_DATE_IN_STAGE_* date of a phase in a project record, or None.
+    """
+    if phase not in phase_age_keys:
+        return None
+    value = lines.get(phase_age_keys[phase][0][0])
+    return value if isinstance(value, date) else None
+
+
+def stage_date_history(lines):
+    """
+    Rebuilds the phase history of a project that has no PHASE_CHANGE lines (files from before they
+    were recorded) from its COMPUTED_DATE_IN_STAGE_* dates: the phases it entered before its current
+    phase, in date order, then its current phase.
+
+    Args:
+        lines (dict): The project record.
+
+    Returns:
+        ProjectPhaseHistory: The transitions, at the stage date of the phase entered.
+    """
+    current_phase = lines["Phases"]
+    current_start = _stage_date(lines, current_phase)
+    entered = sorted((stage_date, project_phases[phase], phase) for phase in phase_age_keys
+                     if phase != current_phase and (stage_date := _stage_date(lines, phase)) is not None
+                     and (current_start is None or stage_date <= current_start))
+    phases = [phase for _, _, phase in entered] + [current_phase]
+    dates = [stage_date for stage_date, _, _ in entered] + [current_start]
+    return ProjectPhaseHistory(PhaseTransition(from_phase, to_phase, transition_date)
+                               for from_phase, to_phase, transition_date in zip(phases, phases[1:], dates[1:])
+                               if transition_date is not None)
+
+
+class PhaseTransition:
+    __slots__ = ("from_phase", "to_phase", "date")
+
+    def __init__(self, from_phase, to_phase, transition_date):
+        """
+        A recorded move of a project from one phase to another.
+
+        Args:
+            from_phase (str): The phase the project left.
+            to_phase (str): The phase the project entered.
+            transition_date (date): The date of the move.
+        """
+        self.from_phase = from_phase
+        self.to_phase = to_phase
+        self.date = transition_date
+
+    @classmethod
+    def from_value(cls, value, project_file_name=None):
+        """
+        Parses the value of a PHASE_CHANGE line ("A -> B DATE: yyyy-mm-dd").
+
+        Args:
+            value (str): The line value.
+            project_file_name (str): The project file the line came from, for logging.
+
+        Returns:
+            PhaseTransition | None: The transition, or None if the value is malformed.
+        """
+        match = _phase_change_re.match(value.strip())
+        if match is None:
+            logging.warning(f"Malformed PHASE_CHANGE line ({value}) [{project_file_name}]")
+            return None
+        y, m, d = match.group("date").split("-")
+        try:
+            transition_date = datetime(int(y), int(m), int(d)).date()
+        except ValueError:
+            logging.warning(f"Invalid PHASE_CHANGE date ({value}) [{project_file_name}]")
+            return None
+        return cls(match.group("from_phase").strip(), match.group("to_phase").strip(), transition_date)
+
+    def __eq__(self, other):
+        if not isinstance(other, PhaseTransition):
+            return NotImplemented
+        return (self.from_phase, self.to_phase, self.date) == (other.from_phase, other.to_phase, other.date)
+
+    def __str__(self):
+        return f"{self.from_phase} -> {self.to_phase} DATE: {self.date.strftime(DATE_FMT)}"
+
+
+class ProjectPhaseHistory:
+    __slots__ = ("transitions",)
+
+    def __init__(self, transitions=()):
+        """
+        The phase history of a project: its recorded phase transitions, oldest first. Transitions
+        sharing a date keep their file order.
+
+        Args:
+            transitions (iterable[PhaseTransition]): The transitions, in any order.
+        """
+        self.transitions = sorted(transitions, key=lambda transition: transition.date)
+
+    def add(self, transition):
+        """
+        Records a new transition (the latest one).
+        """
+        self.transitions.append(transition)
+
+    def first_phase(self, current_phase):
+        """
+        Returns the first recorded phase of the project (its current phase if it never moved).
+        """
+        return self.transitions[0].from_phase if self.transitions else current_phase
+
+    def intervals(self, current_phase, first_start=None):
+        """
+        Returns the phase intervals of the project, oldest first.
+
+        Args:
+            current_phase (str): The phase of the project now, used when no transition is recorded.
+            first_start (date): When the project entered its first phase, if known (no PHASE_CHANGE
+                line records it).
+
+        Returns:
+            list[tuple[str, date | None, date | None]]: (phase, start, end) intervals; the end of the
+            last one is None (still in progress).
+        """
+        if not self.transitions:
+            return [(current_phase, first_start, None)]
+        intervals = [(self.transitions[0].from_phase, first_start, self.transitions[0].date)]
+        for transition, next_transition in zip(self.transitions, self.transitions[1:] + [None]):
+            intervals.append((transition.to_phase, transition.date,
+                              None if next_transition is None else next_transition.date))
+        return intervals
+
+    def to_list(self):
+        """
+        Converts the history into JSON-serializable [from, to, date] lists.
+        """
+        return [[transition.from_phase, transition.to_phase, transition.date.strftime(DATE_FMT)]
+                for transition in self.transitions]
+
+    @classmethod
+    def from_list(cls, history_list):
+        """
+        Restores a history converted with `to_list`.
+        """
+        return cls(PhaseTransition(from_phase, to_phase, datetime.strptime(transition_date, DATE_FMT).date())
+                   for from_phase, to_phase, transition_date in history_list)
+
+    def __len__(self):
+        return len(self.transitions)
+
+    def __eq__(self, other):
+        if not isinstance(other, ProjectPhaseHistory):
+            return NotImplemented
+        return self.transitions == other.transitions
+
+    def __str__(self):
+        return "; ".join(str(transition) for transition in self.transitions)
+
+
+class PhaseHistoryStore:
+    def __init__(self, project_records_list):
+        """
+        The phase intervals of every project in the portfolio, in flat columnar arrays, rebuilt from
+        the PHASE_CHANGE lines of the project files (the `PHASE_HISTORY` of each record), or from its
+        COMPUTED_DATE_IN_STAGE_* dates for a project without any (see `stage_date_history`). The
+        first interval of a project starts at its COMPUTED_DATE_IN_STAGE_* date of that phase, if any.
+
+        Intervals are grouped by project, in record order and oldest first within a project; the
+        intervals of project i are `offsets[i]:offsets[i + 1]`. Starts are NaT when unknown and ends
+        are NaT for the interval a project is still in.
+
+        Args:
+            project_records_list (list[dict]): The project records.
+        """
+        self.projects = []
+        phases, starts, ends, project_indexes = [], [], [], []
+        offsets = [0]
+        for lines in project_records_list:
+            history = lines.get("PHASE_HISTORY")
+            if not isinstance(history, ProjectPhaseHistory) or not history:
+                history = stage_date_history(lines)
+            project_index = len(self.projects)
+            self.projects.append(lines["Project"])
+            first_start = _stage_date(lines, history.first_phase(lines["Phases"]))
+            if first_start is not None and history and first_start > history.transitions[0].date:
+                first_start = None  # stamped after the fact, e.g. re-entered the phase
+            for phase, start, end in history.intervals(lines["Phases"], first_start):
+                phases.append(project_phases.get(phase, UNKNOWN_PHASE))
+                starts.append(start)
+                ends.append(end)
+                project_indexes.append(project_index)
+            offsets.append(len(phases))
+        self.offsets = np.array(offsets, dtype=np.intp)
+        self.phase = np.array(phases, dtype=np.int8)
+        self.start = np.array(starts, dtype="datetime64[D]")
+        self.end = np.array(ends, dtype="datetime64[D]")
+        self.project_index = np.array(project_indexes, dtype=np.intp)
+
+    def project_intervals(self, index):
+        """
+        Returns the interval arrays (phase codes, starts, ends) of one project.
+
+        Args:
+            index (int): The position of the project in the records list.
+        """
+        interval_slice = slice(self.offsets[index], self.offsets[index + 1])
+        return self.phase[interval_slice], self.start[interval_slice], self.end[interval_slice]
+
+    def interval_days(self, as_of):
+        """
+        Returns the length in days of every interval, counting open intervals up to `as_of`, and
+        NaN for intervals with an unknown start.
+
+        Args:
+            as_of (date): The date open intervals are measured to.
+        """
+        ends = np.where(np.isnat(self.end), np.datetime64(as_of, "D"), self.end)
+        days = (ends - self.start).astype(np.float64)
+        days[np.isnat(self.start)] = np.nan
+        return days
+
+    def phases_as_of(self, dates):
+        """
+        Returns the phase of every project on every date.
+
+        A project is in the phase of the interval that started on or before the date and ended after
+        it, and `NOT_STARTED` before the start of its first interval. A first interval with an
+        unknown start (no COMPUTED_DATE_IN_STAGE_* date of that phase) is open back to any date.
+
+        Args:
+            dates (list[date]): The dates.
+
+        Returns:
+            np.ndarray: int8 array of phase codes (see `project_phases`, `UNKNOWN_PHASE`,
+            `NOT_STARTED`) with one row per project and one column per date.
+        """
+        days = np.array(dates, dtype="datetime64[D]")[np.newaxis, :]
+        starts, ends = self.start[:, np.newaxis], self.end[:, np.newaxis]
+        contains = (np.isnat(starts) | (starts <= days)) & (np.isnat(ends) | (days < ends))
+        phases = np.full((len(self.projects), len(dates)), NOT_STARTED, dtype=np.int8)
+        intervals, columns = np.nonzero(contains)
+        phases[self.project_index[intervals], columns] = self.phase[intervals]
+        return phases
+
+    def days_in_phase(self, as_of):
+        """
+        Returns the total days each project spent in each phase (summed over repeated visits).
+
+        Args:
+            as_of (date): The date open intervals are measured to.
+
+        Returns:
+            np.ndarray: Float array with one row per project and one column per phase sequence
+            number (see `project_phases`); intervals with an unknown start or phase are left out.
+        """
+        days = self.interval_days(as_of)
+        totals = np.zeros((len(self.projects), PHASE_AXIS_SIZE), dtype=np.float64)
+        known = ~np.isnan(days) & (self.phase != UNKNOWN_PHASE)
+        np.add.at(totals, (self.project_index[known], self.phase[known]), days[known])
+        return totals
+
+    def on_hold_days(self, as_of):
+        """
+        Returns the total days each project spent on hold.
+        """
+        return self.days_in_phase(as_of)[:, project_phases["4-On Hold"]]
+
+    def rework_loops(self):
+        """
+        Returns how many times each project re-entered a phase it had already been in.
+        """
+        # one code per (project, phase) pair, unknown phases included
+        visits = self.project_index * (PHASE_AXIS_SIZE + 1) + (self.phase.astype(np.intp) + 1)
+        unique_visits = np.unique(visits) // (PHASE_AXIS_SIZE + 1)
+        interval_counts = np.bincount(self.project_index, minlength=len(self.projects))
+        distinct_counts = np.bincount(unique_visits, minlength=len(self.projects))
+        return interval_counts - distinct_counts
+
+    def __len__(self):
+        return len(self.projects)
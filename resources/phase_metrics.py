@@ -0,0 +1,146 @@
+import logging
+
+import numpy as np
+
+from reports.configurations import *
+from resources.lines import StringLine
+
+
+def _date_column(projects, key):
+    """
+    Returns a key's date values across projects as a datetime64[D] array, NaT where the key is
+    missing or not a valid date.
+    """
+    return np.array([None if project.params_dict.get(key) is None else project.params_dict[key].date_value
+                     for project in projects], dtype="datetime64[D]")
+
+
+def _int_column(projects, key):
+    """
+    Returns a key's integer values across projects as an int64 array, and the mask of the
+    projects that have a valid integer value.
+    """
+    values = [None if project.params_dict.get(key) is None else project.params_dict[key].int_value
+              for project in projects]
+    present = np.array([value is not None for value in values], dtype=bool)
+    return np.array([0 if value is None else value for value in values], dtype=np.int64), present
+
+
+def _missing_mask(projects, key):
+    return np.array([project.params_dict.get(key) is None for project in projects], dtype=bool)
+
+
+def _stamp_date(project, key, value):
+    """
+    Records a date on a project: appended as a new line, or updated in place where the project file
+    already has the key with a value that is not a valid date.
+    """
+    if project.params_dict.get(key) is None:
+        project.params_dict[key] = StringLine(key=key, value=value, new=True)
+    else:
+        logging.warning(f"Invalid {key} '{project.params_dict[key].value}' for project {project.project}, "
+                        f"replaced with {value}")
+        project.params_dict[key].update_value(value)
+
+
+class PhaseMetricEngine:
+    def __init__(self, today_date_obj):
+        """
+        Computes the date-derived phase metrics of a batch of projects from the phase tables in
+        `reports.configurations`:
+
+        - `phase_stamp_keys`: dates recorded the first time a project is seen in a phase,
+        - `phase_age_keys`: days since a date, refreshed on every run (a missing date is
+          recorded as today),
+        - the days in the previous phase, refreshed when a project changed phase,
+        - `phase_duration_keys`: days between two dates, recorded once both are known,
+        - `phase_difference_keys`: differences of day counts, recorded once both are known.
+
+        Each rule is evaluated for all projects of the batch it applies to at once, over NumPy
+        `datetime64` columns, and the results are written back to the projects' lines (new lines
+        are appended to the project file, changed values are updated in place).
+
+        Args:
+            today_date_obj (date): The date the ages are computed against.
+        """
+        self.today_date_obj = today_date_obj
+        self.today = np.datetime64(today_date_obj, "D")
+
+    def apply(self, projects):
+        """
+        Computes and records the phase metrics of the projects.
+
+        Args:
+            projects (list[ProjectFileObject]): Parsed projects (with `setup_special_fields` done).
+        """
+        stamps, ages, previous_ages, durations, differences = {}, {}, {}, {}, {}
+        for project in projects:
+            if project.phase not in phase_age_keys:
+                logging.warning(f"No phase metrics defined for phase {project.phase} ({project.project_root})")
+                continue
+            for key in phase_stamp_keys.get(project.phase, []):
+                stamps.setdefault(key, []).append(project)
+            for keys in phase_age_keys[project.phase]:
+                ages.setdefault(keys, []).append(project)
+            if project.previous_phase is not None:
+                if project.previous_phase in phase_age_keys:
+                    previous_ages.setdefault(phase_age_keys[project.previous_phase][0], []).append(project)
+                else:
+                    logging.warning(f"No phase metrics defined for previous phase {project.previous_phase} "
+                                    f"({project.project_root})")
+            for keys in phase_duration_keys.get(project.phase, []):
+                durations.setdefault(keys, []).append(project)
+            for keys in phase_difference_keys.get(project.phase, []):
+                differences.setdefault(keys, []).append(project)
+
+        for key, group in stamps.items():
+            self._stamp_dates(group, key)
+        for (date_key, age_key), group in ages.items():
+            self._refresh_ages(group, date_key, age_key, stamp_missing=True)
+        for (date_key, age_key), group in previous_ages.items():
+            # Phase has changed since last time we processed the file: close out the days in the previous phase
+            self._refresh_ages(group, date_key, age_key, stamp_missing=False)
+        for (start_key, end_key, days_key), group in durations.items():
+            self._record_durations(group, start_key, end_key, days_key)
+        for (days_key, subtracted_key, difference_key), group in differences.items():
+            self._record_differences(group, days_key, subtracted_key, difference_key)
+
+    def _stamp_dates(self, projects, key):
+        missing = np.isnat(_date_column(projects, key))
+        for i in np.flatnonzero(missing):
+            # First time we processed the file since the project reached the phase
+            _stamp_date(projects[i], key, self.today_date_obj)
+
+    def _refresh_ages(self, projects, date_key, age_key, stamp_missing):
+        dates = _date_column(projects, date_key)
+        has_date = ~np.isnat(dates)
+        days = (self.today - dates).astype(np.int64)  # garbage where the date is NaT, masked below
+        ages, has_age = _int_column(projects, age_key)
+        missing_age = _missing_mask(projects, age_key)
+        if stamp_missing:
+            for i in np.flatnonzero(~has_date):
+                # First time we processed the file since the phase changed or the project became active
+                _stamp_date(projects[i], date_key, self.today_date_obj)
+        elif not has_date.all():
+            for i in np.flatnonzero(~has_date):
+                logging.warning(f"No valid {date_key} to compute {age_key} for project {projects[i].project}")
+        for i in np.flatnonzero(has_date & missing_age):
+            projects[i].params_dict[age_key] = StringLine(key=age_key, value=int(days[i]), new=True)
+        for i in np.flatnonzero(has_date & ~missing_age & (~has_age | (ages != days))):
+            projects[i].params_dict[age_key].update_value(int(days[i]))
+            logging.info(f"Updated {date_key} age days for project {projects[i].project} to {days[i]} days.")
+
+    def _record_durations(self, projects, start_key, end_key, days_key):
+        starts = _date_column(projects, start_key)
+        ends = _date_column(projects, end_key)
+        days = (ends - starts).astype(np.int64)
+        for i in np.flatnonzero(~np.isnat(starts) & ~np.isnat(ends) & _missing_mask(projects, days_key)):
+            projects[i].params_dict[days_key] = StringLine(key=days_key, value=int(days[i]), new=True)
+
+    def _record_differences(self, projects, days_key, subtracted_key, difference_key):
+        days, has_days = _int_column(projects, days_key)
+        subtracted, has_subtracted = _int_column(projects, subtracted_key)
+        difference = days - subtracted
+        for i in np.flatnonzero(has_days & has_subtracted & _missing_mask(projects, difference_key)):
+            projects[i].params_dict[difference_key] = StringLine(key=difference_key, value=int(difference[i]),
+                                                                 new=True)
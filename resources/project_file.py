@@ -1,13 +1,18 @@
-import fileinput
+import hashlib
 import logging
 import uuid
 import os
 import time
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from itertools import islice
 
 from reports.configurations import *
 from reports.parser import create_charter_link, extract_params
 from resources.lines import StringLine, AggregateLines
+from resources.phase_history import PhaseTransition, ProjectPhaseHistory
+from resources.phase_metrics import PhaseMetricEngine
+from resources.tokenizer import tokenize_spans, KEY_LINE, AGGREGATE_LINE, COMMENT_LINE
 
 
 def set_date_obj(_today_date_obj):
@@ -26,31 +31,24 @@ def set_date_obj(_today_date_obj):
 
 
 class ProjectFileObject:
-    def __init__(self, root, files, project_info_filename: str):
+    def __init__(self, root, files, project_info_filename: str, compute_metrics=True):
         """
-        Initializes an instance of the class and sets up the initial state, including
-        mapping phase identifiers to their respective functions, parsing project-related
-        files, and invoking the corresponding phase function based on the current phase.
+        Initializes an instance of the class and sets up the initial state, parsing
+        project-related files and computing the phase metrics of the current phase.
 
         Args:
             root: The root directory path for the project.
             files: A collection of files related to the project.
             project_info_filename: The filename of the project information file.
+            compute_metrics: Compute the phase metrics now; pass False to compute them for a batch of
+                projects at once with `resources.phase_metrics.PhaseMetricEngine` (see `build_project_batch`).
 
         """
         self.uuid = None
         self.phase = None
         self.previous_phase = None
         self.project = None
-        # setup phase functions mapping
-        self.phase_functions = {
-            "0-Ideas": self.phase0,
-            "1-Chartering": self.phase1,
-            "2-Committed": self.phase2,
-            "3-In Progress": self.phase3,
-            "4-On Hold": self.phase4,
-            "5-Rollout": self.phase5,
-            "6-Completed": self.phase6}
+        self.source_digest = None  # digest of the project information file as parsed
         self.project_info_filepath = project_info_filename
         self.project_root = root
         self.files = files
@@ -60,156 +58,10 @@ class ProjectFileObject:
         self.parse_file()
         # 2. Setup special fields like UUID, timestamps, phase changes, and links
         self.setup_special_fields()
-        # 3. Call the appropriate phase function based on the current phase
-        self.phase_functions[self.phase]()
-
-    ######################## Phase Processing ################################
-    def phase0(self):
-        self._date_in_phase(key="COMPUTED_DATE_IN_STAGE_0_IDEAS", age_key="COMPUTED_DAYS_IN_STAGE_0_IDEAS")
-
-    def phase1(self):
-        self._date_in_phase(key="COMPUTED_DATE_IN_STAGE_1_CHARTERING", age_key="COMPUTED_DAYS_IN_STAGE_1_CHARTERING")
-        self._project_activity_class_start_date_age(date_key="COMPUTED_PROJECT_START_DATE", age_key="COMPUTED_AGE_DAYS")
-
-    def phase2(self):
-        self._date_in_phase(key="COMPUTED_DATE_IN_STAGE_2_COMMITTED", age_key="COMPUTED_DAYS_IN_STAGE_2_COMMITTED")
-        self._project_activity_class_start_date_age(date_key="COMPUTED_PROJECT_START_DATE",
-                                                    age_key="COMPUTED_AGE_DAYS")
-
-    def phase3(self):
-        self._date_in_phase(key="COMPUTED_DATE_IN_STAGE_3_IN_PROGRESS", age_key="COMPUTED_DAYS_IN_STAGE_3_IN_PROGRESS")
-        self._project_activity_class_start_date_age(date_key="COMPUTED_PROJECT_START_DATE",
-                                                    age_key="COMPUTED_AGE_DAYS")
-        self._project_activity_class_start_date_age(date_key="COMPUTED_PROJECT_IN_PROGRESS_DATE",
-                                                    age_key="COMPUTED_IN_PROGRESS_AGE_DAYS")
-
-    def phase4(self):
-        self._date_in_phase(key="COMPUTED_DATE_IN_STAGE_4_ON_HOLD", age_key="COMPUTED_DAYS_IN_STAGE_4_ON_HOLD")
-        self._project_activity_class_start_date_age(date_key="COMPUTED_PROJECT_START_DATE",
-                                                    age_key="COMPUTED_AGE_DAYS")
-        self._project_activity_class_start_date_age(date_key="COMPUTED_PROJECT_IN_PROGRESS_DATE",
-                                                    age_key="COMPUTED_IN_PROGRESS_AGE_DAYS")
-
-    def phase5(self):
-        self._date_in_phase(key="COMPUTED_DATE_IN_STAGE_5_ROLLOUT", age_key="COMPUTED_DAYS_IN_STAGE_5_ROLLOUT")
-        self._project_activity_class_start_date_age(date_key="COMPUTED_PROJECT_IN_PROGRESS_DATE",
-                                                    age_key="COMPUTED_IN_PROGRESS_AGE_DAYS")
-        self._project_activity_class_start_date_age(date_key="COMPUTED_PROJECT_START_DATE",
-                                                    age_key="COMPUTED_AGE_DAYS")
-
-    def phase6(self):
-        self._date_in_phase(key="COMPUTED_DATE_IN_STAGE_6_COMPLETED", age_key="COMPUTED_DAYS_IN_STAGE_6_COMPLETED")
-        if self.params_dict["COMPUTED_PROJECT_END_DATE"] is None:
-            # First time we processed file since project phase changed to completed
-            self.params_dict["COMPUTED_PROJECT_END_DATE"] = StringLine(key="COMPUTED_PROJECT_END_DATE",
-                                                                       value=today_date_obj,
-                                                                       new=True)
-        self._project_activity_class_start_date_age(date_key="COMPUTED_PROJECT_START_DATE",
-                                                    age_key="COMPUTED_AGE_DAYS")
-        self._days_between_phases(start_key="COMPUTED_PROJECT_START_DATE",
-                                  end_key="COMPUTED_PROJECT_END_DATE",
-                                  age_key="COMPUTED_COMPLETION_TIME_DAYS")
-        self._days_between_phases(start_key="COMPUTED_DATE_IN_STAGE_3_IN_PROGRESS",
-                                  end_key="COMPUTED_PROJECT_END_DATE",
-                                  age_key="COMPUTED_IN_PROGRESS_TO_COMPLETION_DAYS")
-        self._days_between_phases(start_key="COMPUTED_DATE_IN_STAGE_2_COMMITTED",
-                                  end_key="COMPUTED_PROJECT_END_DATE",
-                                  age_key="COMPUTED_COMMIT_TO_COMPLETION_DAYS")
-        self._days_between_phases(start_key="COMPUTED_DATE_IN_STAGE_1_CHARTERING",
-                                  end_key="COMPUTED_PROJECT_END_DATE",
-                                  age_key="COMPUTED_CHARTER_TO_COMPLETION_DAYS")
-        if (self.params_dict["COMPUTED_DAYS_IN_STAGE_4_ON_HOLD"] is not None and
-                self.params_dict["COMPUTED_IN_PROGRESS_TO_COMPLETION_DAYS"] is not None):
-            days = (self.params_dict["COMPUTED_IN_PROGRESS_TO_COMPLETION_DAYS"].int_value -
-                    self.params_dict["COMPUTED_DAYS_IN_STAGE_4_ON_HOLD"].int_value)
-            if (self.params_dict["COMPUTED_COMPLETION_TIME_MINUS_HOLD_DAYS"] is None or
-                    self.params_dict["COMPUTED_COMPLETION_TIME_MINUS_HOLD_DAYS"] == 0):
-                # First time we processed file since project phase changed to completed
-                self.params_dict["COMPUTED_COMPLETION_TIME_MINUS_HOLD_DAYS"] = StringLine(
-                    key="COMPUTED_COMPLETION_TIME_MINUS_HOLD_DAYS",
-                    value=days,
-                    new=True)
-
-    ###################### Phase Functions Helpers ##########################
-    def _days_between_phases(self, start_key=None, end_key=None, age_key=None):
-        if self.params_dict[start_key] is not None and self.params_dict[end_key] is not None:
-            start_date = self.params_dict[start_key].date_value
-            end_date = self.params_dict[end_key].date_value
-            try:
-                dt_delta = end_date - start_date
-            except TypeError as e:
-                logging.error(
-                    f"TypeError in computing days between {start_key}={self.params_dict[start_key].value} and "
-                    f"{end_key}={self.params_dict[end_key].value} for project {self.project}")
-                raise TypeError(e)
-            else:
-                if self.params_dict[age_key] is None or self.params_dict[age_key] == 0:
-                    # First time we processed file since project phase changed to active
-                    self.params_dict[age_key] = StringLine(key=age_key,
-                                                           value=int(dt_delta.days),
-                                                           new=True)
-
-    def _date_in_phase(self, key=None, age_key=None):
-        if self.params_dict[key] and self.params_dict[key].date_value is not None:
-            self._new_or_update_days(key, age_key)
-        else:
-            # First time we processed file since project phase changed
-            self.params_dict[key] = StringLine(key=key, value=today_date_obj, new=True)
-        if self.params_dict["COMPUTED_PREVIOUS_PHASE"].existing_variable_updated:
-            # Phase has changed since last time we processed file
-            # determine the date_key and age_key for previous phase
-            prev_date_key = ("COMPUTED_DATE_IN_STAGE_" + self.previous_phase.split("-")[0]
-                             + "_" + self.previous_phase.split("-")[1].replace(" ", "_").upper())
-            prev_age_key = ("COMPUTED_DAYS_IN_STAGE_" + self.previous_phase.split("-")[0]
-                            + "_" + self.previous_phase.split("-")[1].replace(" ", "_").upper())
-            logging.debug(f"Current phase keys: {key}, {age_key}")
-            logging.debug(f"Previous phase keys: {prev_date_key}, {prev_age_key}")
-            logging.debug(f"Previous phase: {self.previous_phase}")
-            logging.debug(f"Current date: {today_date_obj}")
-            self._new_or_update_days(prev_date_key, prev_age_key)
-
-    def _new_or_update_days(self, key, age_key):
-        phase_start_date = self.params_dict[key].date_value
-        dt_delta = today_date_obj - phase_start_date
-        logging.debug(f"Phase start date: {phase_start_date}, Today: {today_date_obj}, Delta days: {dt_delta.days}")
-        logging.debug(f"Age key: {age_key}, Current age days: {self.params_dict[age_key]}")
-        if age_key is not None:
-            if self.params_dict[age_key] is None:
-                # First time we processed file since project phase changed date added
-                self.params_dict[age_key] = StringLine(key=age_key,
-                                                       value=int(dt_delta.days),
-                                                       new=True)
-            else:
-                # Update the age days if the phase start date has changed
-                if dt_delta.days != self.params_dict[age_key].int_value:
-                    self.params_dict[age_key].update_value(int(dt_delta.days))
-                    logging.info(f"Updated {key} age days for project {self.project} to {dt_delta.days} days.")
-        else:
-            raise ValueError(f"Age_key is None for key: {key}, no metrics added or updated")
-
-    def _project_activity_class_start_date_age(self, date_key=None, age_key=None):
-        # Active projects can start in any of phase 1, 2, 3, 4, or 5
-        # In Progress - Active projects can start in any of phase 3, 4, or 5
-        if self.params_dict[date_key] is None:
-            # First time we processed file since project phase changed to active
-            self.params_dict[date_key] = StringLine(key=date_key,
-                                                    value=today_date_obj,
-                                                    new=True)
-        else:
-            project_start_date = self.params_dict[date_key].date_value
-            dt_delta = today_date_obj - project_start_date
-            if self.params_dict[age_key] is None:
-                # First time we processed file since project phase changed to active
-                self.params_dict[age_key] = StringLine(key=age_key,
-                                                       value=int(dt_delta.days),
-                                                       new=True)
-            else:
-                # Update the age days if the project start date has changed
-                if dt_delta.days != self.params_dict[age_key].int_value:
-                    self.params_dict[age_key].update_value(int(dt_delta.days))
-                    logging.info(f"Updated {date_key} age days for project {self.project} to {dt_delta.days} days.")
+        # 3. Compute the phase metrics (days in stage, ages, durations) of the current phase
+        if compute_metrics:
+            PhaseMetricEngine(today_date_obj).apply([self])
 
-    ##########################################################################
     def setup_special_fields(self):
         """
         Executes the setup process for initializing and updating specific fields in the object.
@@ -284,12 +136,13 @@ class ProjectFileObject:
 
     def record_timestamp(self):
         """
-        Updates or records the current timestamp in the `params_dict` under the "Report_Date" key.
+        Updates or records the run date in the `params_dict` under the "Report_Date" key.
 
-        This method ensures that the "Report_Date" key in the `params_dict` dictionary has the current
-        datetime value. If the key does not exist or if its value is `None`, a new `StringLine` object
-        is created with the current timestamp as its value. If the key exists, its value is updated
-        with the current timestamp.
+        This method ensures that the "Report_Date" key in the `params_dict` dictionary has the date
+        of the run (`today_date_obj`, the injected date if any), which keys the run's snapshot in the
+        analytics history. If the key does not exist or if its value is `None`, a new `StringLine`
+        object is created with the run date as its value. If the key exists, its value is updated
+        with the run date.
 
         Args:
             None
@@ -298,10 +151,10 @@ class ProjectFileObject:
             None
         """
         if "Report_Date" not in self.params_dict or self.params_dict["Report_Date"] is None:
-            self.params_dict["Report_Date"] = StringLine(key="Report_Date", value=datetime.now().strftime(DATE_FMT),
+            self.params_dict["Report_Date"] = StringLine(key="Report_Date", value=today_date_obj.strftime(DATE_FMT),
                                                          new=True)
         else:
-            self.params_dict["Report_Date"].update_value(datetime.now().strftime(DATE_FMT))
+            self.params_dict["Report_Date"].update_value(today_date_obj.strftime(DATE_FMT))
 
     def determine_phase_change(self):
         """
@@ -324,7 +177,9 @@ class ProjectFileObject:
             self.previous_phase = self.params_dict["COMPUTED_PREVIOUS_PHASE"].value
             logging.info(f'Phase has changed: "{self.phase}" -> "{self.previous_phase}" for "{self.project}"')
             self.params_dict["COMPUTED_PREVIOUS_PHASE"].update_value(self.phase)
-            new_line = f'{self.previous_phase} -> {self.phase} DATE: {datetime.now().strftime(DATE_FMT)}\n'
+            transition = PhaseTransition(self.previous_phase, self.phase, today_date_obj)
+            self.params_dict["PHASE_HISTORY"].add(transition)
+            new_line = f'{transition}\n'
             self.params_dict["PHASE_CHANGE"] = StringLine(key="PHASE_CHANGE",
                                                           value=new_line,
                                                           new=True,
@@ -336,6 +191,10 @@ class ProjectFileObject:
         """
         Parses a project information file line by line and processes its content.
 
+        Lines are classified in a single pass by `resources.tokenizer.tokenize_spans`; typed date and
+        integer values are only parsed for the fields declared in `date_params` and `int_params`. Each
+        line keeps its line number and byte span in the file, so `write_file_changes` can patch it in place.
+
         The method processes a file located in `self.project_root` alongside additional
         metadata inferred from the file path. It updates `self.params_dict` with parsed
         key-value pairs and aggregates lines as needed. Empty lines are skipped, and
@@ -346,6 +205,7 @@ class ProjectFileObject:
         Raises:
             FileNotFoundError: If the project information file is not found.
             KeyError: If a required key is missing during parsing.
+            TimeoutError: If reading the project information file timed out.
 
         Args:
             None
@@ -355,7 +215,9 @@ class ProjectFileObject:
         """
         # Process Project Info file
         projects_processed_counter = 0
-        with open(os.path.join(self.project_root, project_info_filename), "r", encoding="utf-8-sig") as project_info_file:
+        with open(os.path.join(self.project_root, project_info_filename), "rb") as project_info_file:
+            data = project_info_file.read()
+            self.source_digest = hashlib.sha256(data).hexdigest()
             logging.info(f"Processing file {projects_processed_counter} ({self.project_root})")
             projects_processed_counter += 1 # TODO: Is this redundant with the counter in update_summary_v2.py? Seems like this would reset with every file and not actually count up.
             self.phase, self.project = extract_params(self.project_root)  # harvest parameters from path
@@ -364,32 +226,27 @@ class ProjectFileObject:
             self.params_dict["Phases"] = StringLine(key="Phases", value=self.phase)
             self.params_dict["Project"] = StringLine(key="Project", value=self.project)
             ################################################
-            ## Parse the file line by line
+            ## Parse the file in a single pass, each line is classified once by the tokenizer
+            ## A TimeoutError from a slow share propagates to the caller, which defers and retries the
+            ## file (see resources.retry.RetryScheduler) instead of blocking the run here.
             agg_lines = AggregateLines()
-            attempts = 0
-            while attempts < FILE_RETRY:
-                try:
-                    for line in project_info_file:
-                        if line.strip() == "":
-                            # skip empty lines
-                            continue
-                        obj = StringLine(line)
-                        if obj.key is not None and obj.key in self.params_dict:
-                            self.params_dict[obj.key] = obj
-                        elif obj.aggregate_key is not None and obj.aggregate_key in self.params_dict:
-                            agg_lines.add_line(obj)
-                            self.params_dict[obj.aggregate_key] = agg_lines
-                        elif obj.is_comment:
-                            logging.info(f"Comment line found: {obj.line}")
-                        else:
-                            logging.error(f"Key {obj.key} not found in params_dict, line: {line.strip()}")
-                    break   # done successfully
-                except TimeoutError as e:
-                    attempts += 1
-                    logging.warning(f"File read operation timed out. Retry #{attempts} with exponential backoff.")
-                    time.sleep(2**attempts)   # exponential backoff
-                    if attempts == FILE_RETRY:
-                        logging.error(f"Skipping file {self.project_info_filepath}. Operation timed out - Giving up after {attempts}")
+            phase_transitions = []
+            for kind, key, value, aggregate_key, line, span in tokenize_spans(data, self.params_dict):
+                if kind == KEY_LINE:
+                    self.params_dict[key] = StringLine.from_token(line, key, value, span=span)
+                elif kind == AGGREGATE_LINE and aggregate_key in self.params_dict:
+                    agg_lines.add_line(StringLine.from_token(line, key, value, aggregate_key, span))
+                    self.params_dict[aggregate_key] = agg_lines
+                elif kind == COMMENT_LINE:
+                    logging.info(f"Comment line found: {line}")
+                elif key == "PHASE_CHANGE":
+                    transition = PhaseTransition.from_value(value, self.project_root)
+                    if transition is not None:
+                        phase_transitions.append(transition)
+                else:
+                    logging.error(f"Key {key} not found in params_dict, line: {line}")
+            # Phase history rebuilt from the PHASE_CHANGE lines, see resources.phase_history
+            self.params_dict["PHASE_HISTORY"] = ProjectPhaseHistory(phase_transitions)
 
     def get_legacy_params(self):
         """
@@ -398,8 +255,10 @@ class ProjectFileObject:
         This method processes each entry in the `params_dict` dictionary, checks the type
         of each line object, and determines if it should be included in the legacy parameters.
         Objects of type `StringLine` or `AggregateLines` are included only if they are marked
-        as being in reports. If a line object does not satisfy these conditions, it will
-        either be skipped with logging or added directly to the legacy parameters.
+        as being in reports. The parsed phase history is added as it is (it is read by the
+        backfill, see `resources.phase_history.PhaseHistoryStore`). If a line object does not
+        satisfy these conditions, it will either be skipped with logging or added directly to the
+        legacy parameters.
 
         Returns:
             dict: A dictionary containing the legacy parameters based on the criteria above.
@@ -411,12 +270,45 @@ class ProjectFileObject:
                     logging.info(f'In "{self.project_root}": at key={key} line_obj={line_obj} is not in reports')
                     continue
                 legacy_params[key] = line_obj.get(key, self.project_root + "/" + self.project_info_filepath)
+            elif isinstance(line_obj, ProjectPhaseHistory):
+                legacy_params[key] = line_obj
             else:
                 logging.info(
                     f'In "{self.project_root}": at key={key} line_obj={line_obj} is not a StringLine or AggregateLines')
                 legacy_params[key] = line_obj
         return legacy_params
 
+    def get_file_changes(self):
+        """
+        Collects the changes `finalize_file` would make to the project information file.
+
+        Returns:
+            Tuple[dict, list]: A tuple containing:
+                - replacements (dict): Key -> (span, replacement line) for existing variables that were
+                  updated, in `params_dict` order, where span is the `LineSpan` the variable was parsed from.
+                - appends (list): Lines for new variables to append at the end of the file.
+        """
+        replacements = {}
+        appends = []
+        for key, obj in self.params_dict.items():
+            if isinstance(obj, StringLine):
+                if obj.existing_variable_updated and obj.span is not None:
+                    replacements[key] = (obj.span, obj.line)
+                if obj.add_new_variable:
+                    appends.append(str(obj))
+        return replacements, appends
+
+    def to_result(self):
+        """
+        Packs the outcome of processing this project into a compact, picklable `ProjectResult`.
+
+        Returns:
+            ProjectResult: The report record and pending file changes of the project.
+        """
+        replacements, appends = self.get_file_changes()
+        return ProjectResult(self.project_root, self.files, self.uuid, self.phase, self.project,
+                             self.get_legacy_params(), replacements, appends, self.source_digest)
+
     def finalize_file(self):
         """
         Processes and finalizes the content of a specified project file by performing in-place modifications
@@ -424,8 +316,9 @@ class ProjectFileObject:
 
         This method checks for updates in a dictionary of parameters and modifies the corresponding lines
         in the project information file. It replaces lines in-place for already existing variables that were
-        updated and appends new lines for variables marked as new. The function returns a tuple indicating
-        whether any replacements or appends were performed during the process.
+        updated and appends new lines for variables marked as new. The file is left untouched when only
+        volatile keys such as `Report_Date` changed (see `write_file_changes`). The function returns a tuple
+        indicating whether any replacements or appends were performed during the process.
 
         Args:
             None
@@ -435,22 +328,313 @@ class ProjectFileObject:
                 - replaced_in_file (bool): True if any existing lines were replaced in the file, False otherwise.
                 - appended_in_file (bool): True if any new lines were appended to the file, False otherwise.
         """
-        # In place changes
-        replaced_in_file = False
-        appended_in_file = False
-        for line in fileinput.input(os.path.join(self.project_root, project_info_filename), inplace=True, encoding="utf-8"):
-            for key, obj in self.params_dict.items():
-                if isinstance(obj, StringLine) and obj.existing_variable_updated and line.startswith(key):
-                    print(f"{obj.line}")
-                    replaced_in_file = True
-                    break
+        replacements, appends = self.get_file_changes()
+        return write_file_changes(self.project_root, replacements, appends, self.source_digest)
+
+
+class ProjectResult:
+    __slots__ = ("project_root", "files", "uuid", "phase", "project", "record", "replacements", "appends",
+                 "source_digest")
+
+    def __init__(self, project_root, files, uuid, phase, project, record, replacements, appends,
+                 source_digest=None):
+        """
+        The compact outcome of processing one project: its report record and the changes pending for its
+        project information file. Unlike `ProjectFileObject` it holds no per-line objects, so it is cheap to
+        pickle back from a worker process.
+
+        Args:
+            project_root: The root directory path for the project.
+            files: A collection of files related to the project.
+            uuid: The Project_ID of the project.
+            phase: The phase folder of the project.
+            project: The project folder name.
+            record: The `get_legacy_params()` record of the project.
+            replacements: Key -> (span, replacement line) for updated existing variables.
+            appends: Lines for new variables to append to the file.
+            source_digest: The digest of the project information file the changes were computed from.
+        """
+        self.project_root = project_root
+        self.files = files
+        self.uuid = uuid
+        self.phase = phase
+        self.project = project
+        self.record = record
+        self.replacements = replacements
+        self.appends = appends
+        self.source_digest = source_digest
+
+    def finalize_file(self):
+        """
+        Writes the pending changes to the project information file (see `ProjectFileObject.finalize_file`).
+        Pending changes are cleared once written, so calling this again does not append lines twice.
+
+        Returns:
+            Tuple[bool, bool]: Whether any lines were replaced and whether any lines were appended.
+        """
+        res = write_file_changes(self.project_root, self.replacements, self.appends, self.source_digest)
+        self.replacements, self.appends = {}, []
+        return res
+
+    def stage_file(self):
+        """
+        Computes the new content of the project information file for a batched write (see
+        `resources.write_back.WriteBackBatch`). Pending changes are cleared, as by `finalize_file`.
+
+        Returns:
+            Tuple: The staged (path, current content, new content), or None if the file is not to be
+            rewritten, and the (replaced, appended) flags `finalize_file` would return.
+        """
+        staged = stage_file_changes(self.project_root, self.replacements, self.appends, self.source_digest)
+        changes = (False, False) if staged is None else (len(self.replacements) > 0, len(self.appends) > 0)
+        self.replacements, self.appends = {}, []
+        return staged, changes
+
+
+class DeferredRead:
+    __slots__ = ("project_root", "files", "latency", "error")
+
+    def __init__(self, project_root, files, latency, error):
+        """
+        Marks a project whose information file could not be read in time. It is handed to
+        `resources.retry.RetryScheduler` to be retried after the rest of the portfolio is processed.
+
+        Args:
+            project_root: The root directory path for the project.
+            files: A collection of files related to the project.
+            latency (float): Seconds spent on the failed first attempt.
+            error (Exception): The timeout raised by the first attempt.
+        """
+        self.project_root = project_root
+        self.files = files
+        self.latency = latency
+        self.error = error
+
+
+def write_file_changes(project_root, replacements, appends, source_digest=None, volatile_keys=WRITE_BACK_VOLATILE_KEYS):
+    """
+    Patches the lines of updated existing variables and appends the lines of new variables to the
+    project information file, in a single read-modify-write.
+
+    Updated variables are replaced at the byte spans they were parsed from, so only those lines
+    change and the rest of the file is kept byte for byte; new variables are appended with the
+    file's own line ending. If the file changed since it was parsed (its digest no longer matches
+    `source_digest`), the spans are stale and nothing is written; the next run picks the changes up.
+
+    The file is only rewritten when it is dirty: when a variable is appended or a variable not in
+    `volatile_keys` is updated. Updates to volatile keys alone (by default the `Report_Date` stamped on
+    every run) are not written, and neither is a rewrite that would leave the file content unchanged, so
+    unchanged project files are left untouched and do not trigger a sync upload. A dirty file is written
+    to a temp file that replaces it atomically.
+
+    Args:
+        project_root: The root directory path for the project.
+        replacements (dict): Key -> (span, replacement line), span being the `LineSpan` of the line
+            to replace.
+        appends (list): Lines to append at the end of the file.
+        source_digest (str): SHA-256 hex digest of the file the spans were taken from (None: not checked).
+        volatile_keys (list): Keys whose updates alone do not make the file dirty.
+
+    Returns:
+        Tuple[bool, bool]: A tuple indicating two boolean values:
+            - replaced_in_file (bool): True if any existing lines were replaced in the file, False otherwise.
+            - appended_in_file (bool): True if any new lines were appended to the file, False otherwise.
+    """
+    staged = stage_file_changes(project_root, replacements, appends, source_digest, volatile_keys)
+    if staged is None:
+        return False, False
+    project_info_path, _, new_data = staged
+    tmp_path = project_info_path + ".tmp"
+    with open(tmp_path, "wb") as project_info_file:
+        project_info_file.write(new_data)
+    os.replace(tmp_path, project_info_path)
+    logging.info(f"Updated {project_info_path}")
+    return len(replacements) > 0, len(appends) > 0
+
+
+def stage_file_changes(project_root, replacements, appends, source_digest=None, volatile_keys=WRITE_BACK_VOLATILE_KEYS):
+    """
+    Computes the new content of a project information file without writing it (see
+    `write_file_changes` for when a file is dirty).
+
+    Args:
+        project_root: The root directory path for the project.
+        replacements (dict): Key -> (span, replacement line).
+        appends (list): Lines to append at the end of the file.
+        source_digest (str): SHA-256 hex digest of the file the spans were taken from (None: not checked).
+        volatile_keys (list): Keys whose updates alone do not make the file dirty.
+
+    Returns:
+        Tuple[str, bytes, bytes] | None: The file path, its current content and its new content, or None
+        if the file is not to be rewritten.
+    """
+    if not appends and all(key in volatile_keys for key in replacements):
+        logging.info(f"No changes to write for {project_root}")
+        return None
+    project_info_path = os.path.join(project_root, project_info_filename)
+    with open(project_info_path, "rb") as project_info_file:
+        data = project_info_file.read()
+    if source_digest is not None and hashlib.sha256(data).hexdigest() != source_digest:
+        logging.warning(f"{project_info_path} changed since it was parsed, not writing its changes")
+        return None
+    new_data = patch_file_data(data, replacements.values(), appends)
+    if new_data == data:
+        logging.info(f"No changes to write for {project_root}")
+        return None
+    return project_info_path, data, new_data
+
+
+def patch_file_data(data, patches, appends):
+    """
+    Returns the content of a project information file with lines replaced at their spans and
+    lines appended at the end.
+
+    Args:
+        data (bytes): The file content the spans refer to.
+        patches (iterable): (span, replacement line) pairs; spans must not overlap.
+        appends (list): Lines to append.
+
+    Returns:
+        bytes: The new file content.
+    """
+    newline = b"\r\n" if b"\r\n" in data else os.linesep.encode("ascii")
+    chunks = []
+    position = 0
+    for span, new_line in sorted(patches, key=lambda patch: patch[0].start):
+        chunks.append(data[position:span.start])
+        chunks.append(new_line.encode("utf-8"))
+        position = span.end
+    chunks.append(data[position:])
+    if appends:
+        if data and not data.endswith((b"\n", b"\r")):
+            chunks.append(newline)
+        chunks.extend(new_line.encode("utf-8") + newline for new_line in appends)
+    return b"".join(chunks)
+
+
+def build_age_refresh_result(project_root, files, record, age_keys):
+    """
+    Builds the write-back of a cached project whose date-derived ages were refreshed (see
+    `resources.manifest.refresh_record_ages`), without parsing the project again: the file is only
+    split into lines to find the age lines to patch. Age lines missing from the file are appended.
+    When the file is rewritten its `Report_Date` line is patched too, as a full run would.
+
+    Args:
+        project_root: The root directory path for the project.
+        files: A collection of files related to the project.
+        record (dict): The refreshed record of the project.
+        age_keys (list[str]): The age keys whose values changed.
+
+    Returns:
+        ProjectResult | None: The project with its pending age changes, or None if the file could not
+        be read or already holds the ages.
+    """
+    project_info_path = os.path.join(project_root, project_info_filename)
+    try:
+        with open(project_info_path, "rb") as project_info_file:
+            data = project_info_file.read()
+    except OSError as e:
+        logging.warning(f"Unable to read {project_info_path} to write back its ages ({e})")
+        return None
+    report_date = record["Report_Date"]
+    if isinstance(report_date, date):
+        report_date = report_date.strftime(DATE_FMT)
+    # the volatile Report_Date line first, as a full run stamps it before the ages
+    new_lines = {"Report_Date": f"Report_Date: {report_date}"}
+    new_lines.update((key, f"{key}: {record[key]}") for key in age_keys)
+    spans = {}
+    replacements = {}
+    for kind, key, _, _, line, span in tokenize_spans(data, new_lines):
+        if kind == KEY_LINE:
+            spans[key] = span
+            if line == new_lines[key]:
+                replacements.pop(key, None)
             else:
-                print(line.strip())
-        # Append new lines to the file
-        with open(os.path.join(self.project_root, project_info_filename), "a", encoding="utf-8") as project_info_file:
-            for key, obj in self.params_dict.items():
-                if isinstance(obj, StringLine) and obj.add_new_variable:
-                    appended_in_file = True # TODO: variable name elsewhere is `appended_in_file`
-                    project_info_file.write(str(obj) + "\n")
-
-        return replaced_in_file, appended_in_file
+                replacements[key] = (span, new_lines[key])
+    appends = [new_line for key, new_line in new_lines.items() if key not in spans]
+    if not any(key in replacements or key not in spans for key in age_keys):
+        return None
+    return ProjectResult(project_root, files, record["Project_ID"], record["Phases"], record["Project"], record,
+                         replacements, appends, hashlib.sha256(data).hexdigest())
+
+
+def build_project_result(project_root, files):
+    """
+    Processes one project folder into a `ProjectResult` (see `build_project_batch`).
+
+    Args:
+        project_root: The root directory path for the project.
+        files: A collection of files related to the project.
+
+    Returns:
+        ProjectResult | DeferredRead | None: The processed project, a `DeferredRead` if reading the project
+        information file timed out, or None if the folder is not a valid project.
+    """
+    return build_project_batch([(project_root, files)])[0]
+
+
+def build_project_batch(project_folders):
+    """
+    Processes a batch of project folders into `ProjectResult`s, computing the phase metrics of the
+    whole batch at once. Used directly for serial runs and as the worker function of the process pool.
+
+    Args:
+        project_folders (list): (project_root, files) pairs.
+
+    Returns:
+        list[ProjectResult | DeferredRead | None]: For each folder, in order, the processed project, a
+        `DeferredRead` if reading the project information file timed out, or None if the folder is not a
+        valid project.
+    """
+    outcomes = []
+    for project_root, files in project_folders:
+        start_time = time.perf_counter()
+        try:
+            outcomes.append(ProjectFileObject(project_root, files, project_info_filename, compute_metrics=False))
+        except ValueError as e:
+            logging.warning(f"[{e}] Skipping {project_root}")
+            outcomes.append(None)
+        except TimeoutError as e:
+            logging.warning(f"File read operation timed out for {project_root}, deferring it for retry.")
+            outcomes.append(DeferredRead(project_root, files, time.perf_counter() - start_time, e))
+    PhaseMetricEngine(today_date_obj).apply([outcome for outcome in outcomes
+                                             if isinstance(outcome, ProjectFileObject)])
+    return [outcome.to_result() if isinstance(outcome, ProjectFileObject) else outcome for outcome in outcomes]
+
+
+def _batches(project_folders, batch_size):
+    project_folders = iter(project_folders)
+    while True:
+        batch = list(islice(project_folders, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def build_project_results(project_folders, workers=1, chunksize=PROJECT_POOL_CHUNKSIZE,
+                          batch_size=PHASE_METRIC_BATCH_SIZE):
+    """
+    Processes project folders into `ProjectResult`s, serially or across a process pool.
+
+    Projects are processed in batches (see `build_project_batch`): of `batch_size` projects in a serial
+    run, and of `chunksize` projects per worker task in a parallel run. Results are yielded in the order
+    of `project_folders` regardless of the number of workers, so the output of a parallel run is identical
+    to a serial run. Worker processes are initialized with the current `today_date_obj`.
+
+    Args:
+        project_folders: Iterable of (project_root, files) pairs.
+        workers (int): Number of worker processes; 1 or less processes in this process.
+        chunksize (int): Number of projects sent to a worker at a time.
+        batch_size (int): Number of projects processed at a time in a serial run.
+
+    Yields:
+        ProjectResult | DeferredRead | None: The processed project, a `DeferredRead` for folders whose read
+        timed out, or None for folders that were skipped.
+    """
+    if workers <= 1:
+        for batch in _batches(project_folders, batch_size):
+            yield from build_project_batch(batch)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=set_date_obj, initargs=(today_date_obj,)) as executor:
+        for results in executor.map(build_project_batch, _batches(project_folders, chunksize)):
+            yield from results
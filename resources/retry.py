@@ -0,0 +1,98 @@
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from reports.configurations import *
+from resources.project_file import DeferredRead
+
+
+class RetryScheduler:
+    def __init__(self, max_attempts=FILE_RETRY, base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY,
+                 max_workers=RETRY_WORKERS):
+        """
+        Schedules retries for project information files whose reads timed out.
+
+        Timed-out files are parked in a deferred queue so the rest of the portfolio keeps
+        being processed. `drain` then retries all stragglers concurrently, each with
+        exponential backoff and full jitter, instead of sleeping inline one file at a time.
+
+        Args:
+            max_attempts (int): Maximum number of attempts per file, including the first one.
+            base_delay (float): Backoff base in seconds; attempt n waits up to base_delay * 2**n.
+            max_delay (float): Upper bound in seconds for a single backoff.
+            max_workers (int): Maximum number of files retried concurrently.
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_workers = max_workers
+        self.deferred = []
+        self.stats = {}  # project root -> {"attempts", "latencies", "succeeded"}
+
+    def defer(self, deferred_read):
+        """
+        Parks a project whose first read timed out.
+
+        Args:
+            deferred_read (DeferredRead): The timed-out project.
+        """
+        logging.info(f"Deferred {deferred_read.project_root} after {deferred_read.latency:.2f}s "
+                     f"({deferred_read.error})")
+        self.stats[deferred_read.project_root] = {"attempts": 1,
+                                                  "latencies": [deferred_read.latency],
+                                                  "succeeded": False}
+        self.deferred.append(deferred_read)
+
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _retry(self, build_func, deferred_read):
+        stats = self.stats[deferred_read.project_root]
+        while stats["attempts"] < self.max_attempts:
+            time.sleep(self._backoff(stats["attempts"]))
+            stats["attempts"] += 1
+            start_time = time.perf_counter()
+            result = build_func(deferred_read.project_root, deferred_read.files)
+            stats["latencies"].append(time.perf_counter() - start_time)
+            if not isinstance(result, DeferredRead):
+                stats["succeeded"] = True
+                return result
+            logging.warning(f"File read operation timed out for {deferred_read.project_root}. "
+                            f"Retry #{stats['attempts'] - 1} with exponential backoff.")
+        logging.error(f"Skipping {deferred_read.project_root}. Operation timed out - "
+                      f"Giving up after {stats['attempts']} attempts")
+        return None
+
+    def drain(self, build_func):
+        """
+        Retries every deferred project concurrently and empties the queue.
+
+        Args:
+            build_func: Called as build_func(project_root, files); returns a `ProjectResult`,
+                None, or a `DeferredRead` if the read timed out again.
+
+        Returns:
+            list: The results of the deferred projects (None for those that were given up on),
+            in the order they were deferred.
+        """
+        deferred, self.deferred = self.deferred, []
+        if not deferred:
+            return []
+        logging.info(f"Retrying {len(deferred)} deferred project files")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(lambda deferred_read: self._retry(build_func, deferred_read), deferred))
+
+    def summary(self):
+        """
+        Summarizes the retries seen, one line per deferred file.
+
+        Returns:
+            list[str]: Lines with the attempt count, outcome and per-attempt latencies of each file.
+        """
+        lines = []
+        for project_root, stats in self.stats.items():
+            latencies = ", ".join(f"{latency:.2f}s" for latency in stats["latencies"])
+            outcome = "ok" if stats["succeeded"] else "gave up"
+            lines.append(f"{project_root}: {stats['attempts']} attempts, {outcome} (latencies: {latencies})")
+        return lines
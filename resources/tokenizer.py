@@ -0,0 +1,114 @@
+import codecs
+import re
+from collections import namedtuple
+
+from reports.configurations import *
+
+# Line kinds
+KEY_LINE = "key"  # a field of project_params_dict
+AGGREGATE_LINE = "aggregate"  # a NOTES_* or COMMIT_JUSTIFICATION* line
+COMMENT_LINE = "comment"  # a line starting with "#"
+UNKNOWN_LINE = "unknown"  # anything else
+
+# Where a line is in a project info file: its 1-based line number and the byte offsets of the
+# line, without its line terminator
+LineSpan = namedtuple("LineSpan", ["line_number", "start", "end"])
+
+# Aggregate keys, matched case-insensitively on the start of the line
+_aggregate_re = re.compile(r"\s*(?:(?P<NOTES>note)|(?P<COMMIT_JUSTIFICATIONS>commit_justification))", re.IGNORECASE)
+
+
+def split_key_value(line):
+    """
+    Splits a stripped project file line into its key and value.
+
+    The key is everything before the first colon. The value keeps the historical
+    `StringLine.parse_line` normalization: the remaining colon-separated pieces are stripped
+    and rejoined, and surrounding double quotes are removed.
+
+    Args:
+        line (str): A stripped, non-empty line.
+
+    Returns:
+        tuple[str, str]: The key and the value ("" when the line has no colon).
+    """
+    key, sep, rest = line.partition(":")
+    if not sep:
+        return key.strip(), ""
+    if ":" in rest:
+        rest = ":".join(x.strip() for x in rest.split(":"))
+    return key.strip(), rest.strip().strip('"')
+
+
+def classify_line(line, known_keys):
+    """
+    Classifies one stripped, non-empty project file line (see `tokenize_spans`).
+
+    Args:
+        line (str): A stripped, non-empty line.
+        known_keys: The keys recognized as fields (e.g. `project_params_dict`).
+
+    Returns:
+        tuple[str, str, str, str | None]: The line kind, key, value and aggregate key (for
+        aggregate lines, else None).
+    """
+    if line[0] == "#":
+        return COMMENT_LINE, None, line[1:].strip(), None
+    key, value = split_key_value(line)
+    if key in known_keys:
+        return KEY_LINE, key, value, None
+    aggregate_match = _aggregate_re.match(line)
+    if aggregate_match is not None:
+        return AGGREGATE_LINE, key, value, aggregate_match.lastgroup
+    return UNKNOWN_LINE, key, value, None
+
+
+def split_lines(data):
+    """
+    Splits the raw bytes of a project info file into lines, as text mode with universal
+    newlines would, keeping where each line is in the file.
+
+    A UTF-8 byte order mark is skipped, as with the "utf-8-sig" encoding, and left out of the
+    first line's span.
+
+    Args:
+        data (bytes): The file content.
+
+    Yields:
+        tuple[str, LineSpan]: The decoded line (without its line terminator) and its span.
+
+    Raises:
+        UnicodeDecodeError: If a line is not valid UTF-8.
+    """
+    start = len(codecs.BOM_UTF8) if data.startswith(codecs.BOM_UTF8) else 0
+    for line_number, raw_line in enumerate(data[start:].splitlines(keepends=True), start=1):
+        content = raw_line.rstrip(b"\r\n")
+        yield content.decode("utf-8"), LineSpan(line_number, start, start + len(content))
+        start += len(raw_line)
+
+
+def tokenize_spans(data, known_keys):
+    """
+    Classifies each line of the raw bytes of a project info file in a single pass, yielding the
+    span of each line so it can be patched in place later.
+
+    Every non-empty line is classified once as a known key, an aggregate (notes or commit
+    justification), a comment or unknown, following the precedence of the original parser:
+    an exact known key wins over an aggregate prefix. No type conversion happens here; typed
+    date and integer values are only parsed later, and only for the fields declared in
+    `date_params` and `int_params`.
+
+    Args:
+        data (bytes): The file content.
+        known_keys: The keys recognized as fields (e.g. `project_params_dict`).
+
+    Yields:
+        tuple[str, str, str, str | None, str, LineSpan]: The line kind, key, value, aggregate
+        key, stripped line and the span of the line in `data`.
+    """
+    for raw_line, span in split_lines(data):
+        line = raw_line.strip()
+        if not line:
+            # skip empty lines
+            continue
+        yield classify_line(line, known_keys) + (line, span)
@@ -0,0 +1,177 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import time
+
+from reports.configurations import *
+from resources.discovery import resolve_project_folders, list_subdirectories
+
+# inotify event mask: anything that can change a project info file or move a project folder
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+# struct inotify_event header: wd, mask, cookie and the length of the name that follows
+_IN_EVENT_HEADER = struct.Struct("iIII")
+
+
+class _InotifyWaker:
+    def __init__(self):
+        """
+        Wraps a Linux inotify descriptor (via libc) used only as a wake-up signal: any event
+        under a watched folder ends the wait early, and the change itself is then found by
+        the regular mtime poll. Events on dot entries (e.g. the run's own manifest and journal,
+        or a sync client's hidden files) do not end the wait. Raises OSError if inotify is not
+        available.
+        """
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or libc_name is None:
+            raise OSError("inotify is not available on this platform")
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watched = set()
+
+    def watch(self, paths):
+        for path in paths:
+            if path in self.watched:
+                continue
+            if self.libc.inotify_add_watch(self.fd, os.fsencode(path), _IN_WATCH_MASK) < 0:
+                logging.debug(f"Unable to add inotify watch for {path} (errno {ctypes.get_errno()})")
+            else:
+                self.watched.add(path)
+
+    def _read_event_names(self):
+        """
+        Drains the queued events and returns the entry name of each (empty for the watched
+        folder itself).
+        """
+        names = []
+        try:
+            while True:
+                data = os.read(self.fd, 65536)
+                if not data:
+                    break
+                offset = 0
+                while offset + _IN_EVENT_HEADER.size <= len(data):
+                    name_length = _IN_EVENT_HEADER.unpack_from(data, offset)[3]
+                    offset += _IN_EVENT_HEADER.size
+                    names.append(data[offset:offset + name_length].rstrip(b"\0"))
+                    offset += name_length
+        except BlockingIOError:
+            pass
+        return names
+
+    def wait(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            readable, _, _ = select.select([self.fd], [], [], max(0.0, deadline - time.monotonic()))
+            if not readable:
+                return False
+            # the poll that follows finds what changed
+            if any(not name.startswith(b".") for name in self._read_event_names()):
+                return True
+
+
+class ProjectWatcher:
+    def __init__(self, projects_tree_root, poll_interval=WATCH_POLL_INTERVAL):
+        """
+        Detects changed, added, moved and removed project info files by polling their mtimes.
+
+        A poll lists the phase folders and their project folders (never below the project
+        level) and stats each project info file and project folder, so it costs one `stat`
+        per project rather than a full walk of the share. Where inotify is available it is
+        used to wake up as soon as something changes instead of sleeping a full interval.
+
+        Args:
+            projects_tree_root (str): The root directory of the projects tree.
+            poll_interval (float): Seconds between polls.
+        """
+        self.project_folders = resolve_project_folders(projects_tree_root)
+        self.poll_interval = poll_interval
+        self.stamps = {}  # project root -> (info mtime_ns, info size, folder mtime_ns)
+        try:
+            self.waker = _InotifyWaker()
+            logging.info("Watching with inotify wake-ups")
+        except OSError as e:
+            self.waker = None
+            logging.info(f"Watching by polling every {poll_interval}s ({e})")
+
+    def _stamp(self, project_root):
+        try:
+            info_stat = os.stat(os.path.join(project_root, project_info_filename))
+            folder_stat = os.stat(project_root)
+        except OSError:
+            return None
+        return info_stat.st_mtime_ns, info_stat.st_size, folder_stat.st_mtime_ns
+
+    def _scan(self):
+        phase_roots = list_subdirectories(self.project_folders)
+        project_roots = [project_root for phase_root in phase_roots
+                         for project_root in list_subdirectories(phase_root)]
+        if self.waker is not None:
+            self.waker.watch([self.project_folders] + phase_roots + project_roots)
+        stamps = {}
+        for project_root in project_roots:
+            stamp = self._stamp(project_root)
+            if stamp is not None:
+                stamps[project_root] = stamp
+        return stamps
+
+    def poll(self):
+        """
+        Compares the current project stamps with the previous poll.
+
+        Returns:
+            tuple[list[str], list[str]]: The project roots that are new or changed, and the
+            project roots that disappeared. A project moved to another phase folder shows
+            up as removed under its old root and new under its new root.
+        """
+        stamps = self._scan()
+        changed = [root for root, stamp in stamps.items() if self.stamps.get(root) != stamp]
+        removed = [root for root in self.stamps if root not in stamps]
+        self.stamps = stamps
+        return changed, removed
+
+    def restamp(self, project_roots):
+        """
+        Refreshes the stamps of projects whose files were just written by this process, so
+        our own write-back is not reported as a change on the next poll.
+
+        Args:
+            project_roots (list[str]): The project roots that were written.
+        """
+        for project_root in project_roots:
+            stamp = self._stamp(project_root)
+            if stamp is not None:
+                self.stamps[project_root] = stamp
+
+    def forget(self, project_roots):
+        """
+        Drops the stamps of projects that could not be processed, so the next poll reports
+        them as changed again and they are retried.
+
+        Args:
+            project_roots (list[str]): The project roots to forget.
+        """
+        for project_root in project_roots:
+            self.stamps.pop(project_root, None)
+
+    def wait(self):
+        """
+        Blocks until the next poll is due, or until inotify reports activity.
+        """
+        if self.waker is not None:
+            if self.waker.wait(self.poll_interval):
+                # let a burst of writes (e.g. an editor save) settle before polling
+                time.sleep(WATCH_SETTLE_SECONDS)
+        else:
+            time.sleep(self.poll_interval)
@@ -0,0 +1,237 @@
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from reports.configurations import *
+from resources.discovery import local_cache_dir
+
+# Bump when the journal layout changes
+WRITE_BACK_JOURNAL_VERSION = 1
+
+# Journal states: the new contents are being written to temp files (an interrupted run is rolled
+# back), or they are all on disk and the temp files are being renamed over the project files (an
+# interrupted run is finished)
+STAGING = "staging"
+COMMITTING = "committing"
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _file_digest(path):
+    try:
+        with open(path, "rb") as infile:
+            return _digest(infile.read())
+    except FileNotFoundError:
+        return None
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _write_tmp(entry, new_data):
+    with open(entry["tmp"], "wb") as outfile:
+        outfile.write(new_data)
+
+
+def _fsync_directories(paths):
+    """
+    Makes the renames in the directories of the given files durable (no-op where directories
+    cannot be opened, e.g. on Windows).
+    """
+    for directory in sorted({os.path.dirname(path) for path in paths}):
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def write_back_journal_path(projects_tree_root):
+    """
+    Returns the path of the write-back journal of a projects tree, in its local cache directory: the
+    journal holds this machine's absolute paths, so it must not sync to another machine mid-run.
+    """
+    return os.path.join(local_cache_dir(projects_tree_root), write_back_journal_filename)
+
+
+def _write_journal(journal_path, state, entries):
+    """
+    Writes the journal atomically and durably (temp file, fsync and rename).
+    """
+    os.makedirs(os.path.dirname(journal_path), exist_ok=True)
+    tmp_path = journal_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as outfile:
+        json.dump({"version": WRITE_BACK_JOURNAL_VERSION, "state": state, "entries": entries}, outfile)
+        outfile.flush()
+        os.fsync(outfile.fileno())
+    os.replace(tmp_path, journal_path)
+
+
+def durability_barrier(paths, pool):
+    """
+    Flushes written files to disk with an fsync of each file, spread over the pool. (`os.sync` would
+    flush every filesystem, and on macOS and BSD returns before the data is on disk.)
+
+    Args:
+        paths (list[str]): The files written since the last barrier.
+        pool (ThreadPoolExecutor): The pool used for the per-file fsyncs.
+    """
+
+    def fsync_path(path):
+        with open(path, "rb+") as outfile:
+            os.fsync(outfile.fileno())
+
+    list(pool.map(fsync_path, paths))
+
+
+def replay_journal(journal_path):
+    """
+    Completes or rolls back a write-back that was interrupted, as recorded in its journal. Called
+    before the project files are read, so a run never starts from a half-updated portfolio.
+
+    A journal in the "staging" state is rolled back: the project files were not touched yet, so
+    the temp files are removed. A journal in the "committing" state is finished: every temp file
+    whose content matches the journaled digest is renamed over its project file, provided the
+    project file still holds its journaled old (or already the new) content. A project file
+    edited since is not overwritten: its temp file is kept for inspection and an error is
+    logged. Files already renamed are left as they are.
+
+    Args:
+        journal_path (str): The path of the journal.
+
+    Returns:
+        Tuple[str, int] | None: "finished" or "rolled back" and the number of files in the
+        journal, or None if there was no journal.
+    """
+    try:
+        with open(journal_path, "r", encoding="utf-8") as infile:
+            journal = json.load(infile)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logging.error(f"Unable to read write-back journal {journal_path} ({e}), leaving it for inspection")
+        return None
+    if journal.get("version") != WRITE_BACK_JOURNAL_VERSION:
+        logging.error(f"Write-back journal version {journal.get('version')} is not {WRITE_BACK_JOURNAL_VERSION}, "
+                      f"leaving {journal_path} for inspection")
+        return None
+
+    entries = journal["entries"]
+    if journal["state"] == COMMITTING:
+        outcome = "finished"
+        for entry in entries:
+            current_digest = _file_digest(entry["path"])
+            if current_digest == entry["new"]:
+                # already renamed
+                _remove(entry["tmp"])
+            elif _file_digest(entry["tmp"]) != entry["new"]:
+                logging.error(f"Unable to finish the write-back of {entry['path']}: "
+                              f"its staged content is missing or damaged")
+                _remove(entry["tmp"])
+            elif current_digest != entry["old"]:
+                logging.error(f"Not finishing the write-back of {entry['path']}: it changed since it was "
+                              f"staged, the staged content is kept in {entry['tmp']}")
+            else:
+                os.replace(entry["tmp"], entry["path"])
+                logging.info(f"Write-back of {entry['path']} finished from the journal")
+        _fsync_directories([entry["path"] for entry in entries])
+    else:
+        outcome = "rolled back"
+        for entry in entries:
+            _remove(entry["tmp"])
+            logging.info(f"Write-back of {entry['path']} rolled back")
+    os.remove(journal_path)
+    logging.warning(f"Interrupted write-back of {len(entries)} project files {outcome} ({journal_path})")
+    return outcome, len(entries)
+
+
+class WriteBackBatch:
+    def __init__(self, journal_path, workers=WRITE_BACK_WORKERS):
+        """
+        Writes the pending project file changes of a run as one group commit.
+
+        The new content of every dirty project file is staged in memory and written to a temp file
+        next to it, concurrently on a bounded thread pool. After a single durability barrier the
+        journal is marked "committing" and the temp files are renamed over the project files. The
+        journal lists every file with the digests of its old and new content, so `replay_journal`
+        can roll back a run interrupted while staging, or finish one interrupted while committing;
+        either way the portfolio is never left half-updated. Right before its rename each project
+        file is checked against its old digest, so an edit made while the batch was staged is not
+        overwritten, and the renames are made durable before the journal is removed.
+
+        Args:
+            journal_path (str): The path of the journal (see `write_back_journal_path`).
+            workers (int): Maximum number of project files read or written at once.
+        """
+        self.journal_path = journal_path
+        self.workers = workers
+
+    def commit(self, project_results, progress=None):
+        """
+        Writes the pending changes of the projects and clears them.
+
+        Args:
+            project_results (iterable[ProjectResult]): The projects with pending changes.
+            progress: Optional callable invoked once per project staged.
+
+        Returns:
+            dict: Project_ID -> (replaced, appended), as returned by `ProjectResult.finalize_file`.
+
+        Raises:
+            OSError: If a file could not be written. Staged files are rolled back, or the journal is
+                left to finish the commit on the next run.
+        """
+        project_results = list(project_results)
+        changes = {}
+        entries = []
+        staged_results = []
+        staged_contents = []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for result, (staged, file_changes) in zip(project_results,
+                                                      pool.map(lambda result: result.stage_file(), project_results)):
+                changes[result.uuid] = file_changes
+                if staged is not None:
+                    project_info_path, data, new_data = staged
+                    project_info_path = os.path.abspath(project_info_path)
+                    entries.append({"path": project_info_path, "tmp": project_info_path + ".tmp",
+                                    "old": _digest(data), "new": _digest(new_data)})
+                    staged_results.append(result)
+                    staged_contents.append(new_data)
+                if progress is not None:
+                    progress()
+            if not entries:
+                logging.info("No project files to write back")
+                return changes
+
+            _write_journal(self.journal_path, STAGING, entries)
+            try:
+                list(pool.map(_write_tmp, entries, staged_contents))
+                durability_barrier([entry["tmp"] for entry in entries], pool)
+            except OSError:
+                replay_journal(self.journal_path)
+                raise
+        _write_journal(self.journal_path, COMMITTING, entries)
+        for result, entry in zip(staged_results, entries):
+            if _file_digest(entry["path"]) != entry["old"]:
+                logging.warning(f"{entry['path']} changed since it was staged, not writing its changes")
+                _remove(entry["tmp"])
+                changes[result.uuid] = (False, False)
+                continue
+            os.replace(entry["tmp"], entry["path"])
+        _fsync_directories([entry["path"] for entry in entries])
+        os.remove(self.journal_path)
+        logging.info(f"Wrote back {sum(any(changes[result.uuid]) for result in staged_results)} project files")
+        return changes
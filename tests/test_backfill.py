@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from reports.backfill import backfill_analytics_snapshots, backfill_dates, phase_age_matrix
+from resources.phase_history import PhaseTransition, ProjectPhaseHistory
+
+
+def sample_records():
+    return [
+        # Moved 1-Chartering -> 2-Committed -> 3-In Progress, recorded by PHASE_CHANGE lines
+        {"Project": "Moved", "Phases": "3-In Progress", "Project_ID": "moved",
+         "COMPUTED_DATE_IN_STAGE_1_CHARTERING": date(2025, 1, 1),
+         "COMPUTED_DATE_IN_STAGE_2_COMMITTED": date(2025, 2, 1),
+         "COMPUTED_DATE_IN_STAGE_3_IN_PROGRESS": date(2025, 3, 1),
+         "COMPUTED_PROJECT_START_DATE": date(2025, 1, 1),
+         "COMPUTED_PROJECT_IN_PROGRESS_DATE": date(2025, 3, 1),
+         "PHASE_HISTORY": ProjectPhaseHistory([PhaseTransition("1-Chartering", "2-Committed", date(2025, 2, 1)),
+                                               PhaseTransition("2-Committed", "3-In Progress", date(2025, 3, 1))])},
+        # Completed, with no PHASE_CHANGE lines: its phases come from its stage dates
+        {"Project": "Done", "Phases": "6-Completed", "Project_ID": "done",
+         "COMPUTED_DATE_IN_STAGE_3_IN_PROGRESS": date(2025, 1, 10),
+         "COMPUTED_DATE_IN_STAGE_6_COMPLETED": date(2025, 2, 10),
+         "COMPUTED_PROJECT_START_DATE": date(2024, 12, 1),
+         "COMPUTED_PROJECT_END_DATE": date(2025, 2, 10),
+         "COMPUTED_COMPLETION_TIME_DAYS": 71},
+    ]
+
+
+SNAPSHOT_DATES = [date(2024, 12, 15), date(2025, 1, 15), date(2025, 2, 15), date(2025, 3, 15)]
+
+
+class BackfillDatesTest(unittest.TestCase):
+    def test_range_and_step(self):
+        self.assertEqual(backfill_dates(date(2025, 1, 1), date(2025, 1, 10), 4),
+                         [date(2025, 1, 1), date(2025, 1, 5), date(2025, 1, 9)])
+
+    def test_invalid_ranges(self):
+        with self.assertRaises(ValueError):
+            backfill_dates(date(2025, 1, 2), date(2025, 1, 1))
+        with self.assertRaises(ValueError):
+            backfill_dates(date(2025, 1, 1), date(2025, 1, 2), 0)
+
+
+class PhaseAgeMatrixTest(unittest.TestCase):
+    def setUp(self):
+        self.matrix = phase_age_matrix(sample_records(), SNAPSHOT_DATES)
+
+    def assertAges(self, age_key, expected):
+        np.testing.assert_array_equal(self.matrix[age_key], np.array(expected, dtype=np.float64))
+
+    def test_ages_refresh_while_in_the_phase_and_freeze_after(self):
+        self.assertAges("COMPUTED_DAYS_IN_STAGE_1_CHARTERING", [[np.nan, 14, 31, 31], [np.nan] * 4])
+        self.assertAges("COMPUTED_DAYS_IN_STAGE_2_COMMITTED", [[np.nan, np.nan, 14, 28], [np.nan] * 4])
+        self.assertAges("COMPUTED_DAYS_IN_STAGE_3_IN_PROGRESS", [[np.nan, np.nan, np.nan, 14],
+                                                                 [np.nan, 5, 31, 31]])
+
+    def test_ages_shared_by_several_phases(self):
+        self.assertAges("COMPUTED_AGE_DAYS", [[np.nan, 14, 45, 73], [np.nan, 45, 76, 104]])
+        self.assertAges("COMPUTED_IN_PROGRESS_AGE_DAYS", [[np.nan, np.nan, np.nan, 14], [np.nan] * 4])
+
+    def test_every_age_key_has_a_row_per_record(self):
+        self.assertEqual({ages.shape for ages in self.matrix.values()}, {(2, len(SNAPSHOT_DATES))})
+
+
+class BackfillSnapshotsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        paths = backfill_analytics_snapshots(sample_records(), SNAPSHOT_DATES, self.tmp_dir.name)
+        self.snapshots = [pd.read_csv(path, dtype=str, keep_default_na=False) for path in paths]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def snapshot(self, snapshot_date):
+        snapshot = self.snapshots[SNAPSHOT_DATES.index(snapshot_date)]
+        return {row["Project"]: row for _, row in snapshot.iterrows()}
+
+    def test_projects_not_started_are_left_out(self):
+        self.assertEqual(len(self.snapshots[0]), 0)
+        self.assertEqual(sorted(self.snapshot(date(2025, 1, 15))), ["Done", "Moved"])
+
+    def test_phase_as_of_each_date(self):
+        self.assertEqual([self.snapshot(snapshot_date)["Moved"]["Phases"] for snapshot_date in SNAPSHOT_DATES[1:]],
+                         ["1-Chartering", "2-Committed", "3-In Progress"])
+        self.assertEqual([self.snapshot(snapshot_date)["Done"]["Phases"] for snapshot_date in SNAPSHOT_DATES[1:]],
+                         ["3-In Progress", "6-Completed", "6-Completed"])
+
+    def test_values_recorded_later_are_empty(self):
+        done = self.snapshot(date(2025, 1, 15))["Done"]
+        self.assertEqual((done["COMPUTED_PROJECT_END_DATE"], done["COMPUTED_COMPLETION_TIME_DAYS"],
+                          done["COMPUTED_DATE_IN_STAGE_6_COMPLETED"]), ("", "", ""))
+        done = self.snapshot(date(2025, 2, 15))["Done"]
+        self.assertEqual((done["COMPUTED_PROJECT_END_DATE"], done["COMPUTED_COMPLETION_TIME_DAYS"]),
+                         ("2025-02-10", "71.0"))
+
+    def test_ages_and_report_date_of_the_snapshot(self):
+        moved = self.snapshot(date(2025, 2, 15))["Moved"]
+        self.assertEqual((moved["COMPUTED_AGE_DAYS"], moved["COMPUTED_DAYS_IN_STAGE_1_CHARTERING"],
+                          moved["COMPUTED_DAYS_IN_STAGE_3_IN_PROGRESS"], moved["Report_Date"]),
+                         ("45.0", "31.0", "", "2025-02-15"))
+
+    def test_snapshot_files(self):
+        self.assertEqual(sorted(os.listdir(self.tmp_dir.name)),
+                         [f"analytics_summary_{snapshot_date}.csv" for snapshot_date in SNAPSHOT_DATES])
+
+
+if __name__ == "__main__":
+    unittest.main()
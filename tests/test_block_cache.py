@@ -0,0 +1,47 @@
+import tempfile
+import unittest
+from datetime import date
+
+from reports.block_cache import OwnerBlockCache
+from resources.notes import ProjectNotes
+
+KEYS = ["Project", "Phases", "NOTES"]
+
+
+def owner_records():
+    return [{"Project": "A", "Phases": "2-Committed",
+             "NOTES": ProjectNotes.from_lines(["NOTES_2025-06-01: recent", "NOTES_2025-01-01: older"])},
+            {"Project": "B", "Phases": "3-In Progress", "NOTES": None}]
+
+
+class InputsDigestTest(unittest.TestCase):
+    def test_new_day_alone_keeps_the_digest(self):
+        self.assertEqual(OwnerBlockCache.inputs_digest(owner_records(), KEYS, date(2024, 12, 1)),
+                         OwnerBlockCache.inputs_digest(owner_records(), KEYS, date(2024, 12, 2)))
+
+    def test_note_leaving_the_window_changes_the_digest(self):
+        self.assertNotEqual(OwnerBlockCache.inputs_digest(owner_records(), KEYS, date(2025, 1, 1)),
+                            OwnerBlockCache.inputs_digest(owner_records(), KEYS, date(2025, 1, 2)))
+
+    def test_record_changes_and_order_change_the_digest(self):
+        digest = OwnerBlockCache.inputs_digest(owner_records(), KEYS, date(2025, 1, 1))
+        records = owner_records()
+        records[1]["Phases"] = "4-On Hold"
+        self.assertNotEqual(OwnerBlockCache.inputs_digest(records, KEYS, date(2025, 1, 1)), digest)
+        self.assertNotEqual(OwnerBlockCache.inputs_digest(owner_records()[::-1], KEYS, date(2025, 1, 1)), digest)
+
+
+class OwnerBlockCacheTest(unittest.TestCase):
+    def test_get_and_put(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = OwnerBlockCache(tmp_dir + "/owner_blocks")
+            block_key = OwnerBlockCache.block_key("Ann Lee", "ANALYTICS_DS_OWNER", [1, 2, 3], False)
+            self.assertIsNone(cache.get(block_key, "digest-1"))
+            cache.put(block_key, "digest-1", "## Ann Lee\r\n\nblock\n")
+            self.assertEqual(cache.get(block_key, "digest-1"), "## Ann Lee\r\n\nblock\n")
+            self.assertIsNone(cache.get(block_key, "digest-2"))
+            self.assertEqual(cache.stats(), {"hits": 1, "misses": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import time
+import unittest
+
+from reports.configurations import local_cache_root, project_folders_root, project_info_filename
+from resources.discovery import discover_projects, list_subdirectories, local_cache_dir
+from resources.watcher import _InotifyWaker
+
+
+def touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as outfile:
+        outfile.write("T-SHIRT_SIZE: M\n")
+
+
+class DiscoveryTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.project_folders = os.path.join(self.tmp_dir.name, project_folders_root)
+        touch(os.path.join(self.project_folders, "2-Committed", "A", project_info_filename))
+        touch(os.path.join(self.project_folders, "2-Committed", ".A copy", project_info_filename))
+        touch(os.path.join(self.project_folders, ".sync", "B", project_info_filename))
+        touch(os.path.join(self.project_folders, "3-In Progress", "C", "notes.txt"))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_dot_entries_are_skipped(self):
+        self.assertEqual(list_subdirectories(self.project_folders),
+                         [os.path.join(self.project_folders, "2-Committed"),
+                          os.path.join(self.project_folders, "3-In Progress")])
+
+    def test_discover_projects(self):
+        self.assertEqual(list(discover_projects(self.tmp_dir.name)),
+                         [(os.path.join(self.project_folders, "2-Committed", "A"), [project_info_filename])])
+
+    def test_local_cache_dir_is_outside_the_tree(self):
+        cache_dir = local_cache_dir(self.tmp_dir.name)
+        self.assertEqual(cache_dir, local_cache_dir(self.project_folders))
+        self.assertEqual(os.path.dirname(cache_dir), local_cache_root)
+        self.assertNotEqual(cache_dir, local_cache_dir(os.path.join(self.tmp_dir.name, "other")))
+
+
+class InotifyWakerTest(unittest.TestCase):
+    def test_dot_entries_do_not_wake(self):
+        try:
+            waker = _InotifyWaker()
+        except OSError as e:
+            self.skipTest(str(e))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            waker.watch([tmp_dir])
+            touch(os.path.join(tmp_dir, ".project_manifest.json.tmp"))
+            self.assertFalse(waker.wait(0.2))
+            touch(os.path.join(tmp_dir, project_info_filename))
+            start_time = time.monotonic()
+            self.assertTrue(waker.wait(5))
+            self.assertLess(time.monotonic() - start_time, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
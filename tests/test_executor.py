@@ -0,0 +1,68 @@
+import os
+import tempfile
+import time
+import unittest
+from functools import partial
+
+from reports.executor import ReportExecutor
+from reports.output import write_if_changed
+
+
+def sleeping_report(seconds, path, project_records_list):
+    time.sleep(seconds)
+    write_if_changed(path, f"{len(project_records_list)} projects\n")
+
+
+def failing_report(project_records_list):
+    raise RuntimeError("report failed")
+
+
+class ReportExecutorTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.records = [{"Project": "A"}, {"Project": "B"}]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def report(self, name, seconds=0.0):
+        return partial(sleeping_report, seconds, os.path.join(self.tmp_dir.name, name))
+
+    def test_serial_outcomes_and_outputs(self):
+        outcomes = ReportExecutor("serial").run([self.report("a.txt"), failing_report], self.records)
+        self.assertIsNone(outcomes[0]["error"])
+        self.assertEqual(outcomes[0]["outputs"], [(os.path.join(self.tmp_dir.name, "a.txt"), True)])
+        self.assertIn("report failed", outcomes[1]["error"])
+
+    def test_timeout_counts_from_the_report_start(self):
+        # run one after another on a single worker: each fits its timeout, the queue wait does not
+        reports = [self.report("a.txt", 0.3), self.report("b.txt", 0.3), self.report("c.txt", 0.3)]
+        outcomes = ReportExecutor("thread", max_workers=1, timeout=0.6).run(reports, self.records)
+        self.assertEqual([outcome["error"] for outcome in outcomes], [None, None, None])
+
+    def test_timed_out_thread_does_not_write_late(self):
+        path = os.path.join(self.tmp_dir.name, "late.txt")
+        outcomes = ReportExecutor("thread", timeout=0.1).run([self.report("late.txt", 0.4), self.report("on_time.txt")],
+                                                             self.records)
+        self.assertIn("Timed out", outcomes[0]["error"])
+        self.assertIsNone(outcomes[1]["error"])
+        time.sleep(0.6)
+        self.assertFalse(os.path.exists(path))
+
+    def test_queued_reports_behind_hung_workers_are_not_started(self):
+        outcomes = ReportExecutor("thread", max_workers=1, timeout=0.1).run(
+            [self.report("hung.txt", 0.5), self.report("queued.txt")], self.records)
+        self.assertIn("Timed out", outcomes[0]["error"])
+        self.assertIn("Not started", outcomes[1]["error"])
+
+    def test_process_mode(self):
+        outcomes = ReportExecutor("process", timeout=5).run([self.report("a.txt"), failing_report], self.records)
+        self.assertIsNone(outcomes[0]["error"])
+        self.assertEqual(outcomes[0]["outputs"], [(os.path.join(self.tmp_dir.name, "a.txt"), True)])
+        self.assertIn("report failed", outcomes[1]["error"])
+        with open(os.path.join(self.tmp_dir.name, "a.txt")) as infile:
+            self.assertEqual(infile.read(), "2 projects\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
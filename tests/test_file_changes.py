@@ -0,0 +1,98 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date
+
+from reports.configurations import project_folders_root, project_info_filename
+from resources.project_file import (ProjectFileObject, patch_file_data, set_date_obj, stage_file_changes,
+                                    write_file_changes)
+from resources.tokenizer import LineSpan, split_lines
+
+SAMPLE_PROJECT_INFO = os.path.join(os.path.dirname(__file__), "clean_sample_PROJECT_INFO.txt")
+
+
+def span_of(data, prefix):
+    return next(span for line, span in split_lines(data) if line.startswith(prefix))
+
+
+class PatchFileDataTest(unittest.TestCase):
+    def test_patches_keep_the_rest_byte_for_byte(self):
+        data = b"# keep  me \r\nA: 1\r\nB: 2\r\n  C: 3\r\n"
+        patches = [(span_of(data, "  C"), "C: 30"), (span_of(data, "A"), "A: 10")]
+        self.assertEqual(patch_file_data(data, patches, []), b"# keep  me \r\nA: 10\r\nB: 2\r\nC: 30\r\n")
+
+    def test_appends_use_the_file_line_ending(self):
+        self.assertEqual(patch_file_data(b"A: 1\r\nB: 2", [], ["C: 3"]), b"A: 1\r\nB: 2\r\nC: 3\r\n")
+        self.assertEqual(patch_file_data(b"A: 1\n", [], ["C: 3"]), b"A: 1\n" + b"C: 3" + os.linesep.encode())
+
+    def test_multi_byte_characters_before_the_patch(self):
+        data = "A: café\nB: 2\n".encode("utf-8")
+        self.assertEqual(patch_file_data(data, [(span_of(data, "B"), "B: 20")], []), "A: café\nB: 20\n".encode())
+
+
+class WriteFileChangesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.project_root = os.path.join(self.tmp_dir.name, project_folders_root, "2-Committed", "Test Project")
+        os.makedirs(self.project_root)
+        self.project_info_path = os.path.join(self.project_root, project_info_filename)
+        shutil.copy(SAMPLE_PROJECT_INFO, self.project_info_path)
+        with open(self.project_info_path, "rb") as infile:
+            self.data = infile.read()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def read(self):
+        with open(self.project_info_path, "rb") as infile:
+            return infile.read()
+
+    def test_volatile_keys_alone_are_not_written(self):
+        replacements = {"Report_Date": (LineSpan(1, 0, 1), "Report_Date: 2026-01-15")}
+        self.assertIsNone(stage_file_changes(self.project_root, replacements, []))
+        self.assertEqual(write_file_changes(self.project_root, replacements, []), (False, False))
+
+    def test_stale_spans_are_not_written(self):
+        span = span_of(self.data, "T-SHIRT_SIZE")
+        replacements = {"T-SHIRT_SIZE": (span, "T-SHIRT_SIZE: S")}
+        stale_digest = hashlib.sha256(b"older content").hexdigest()
+        self.assertEqual(write_file_changes(self.project_root, replacements, [], stale_digest), (False, False))
+        self.assertEqual(self.read(), self.data)
+        digest = hashlib.sha256(self.data).hexdigest()
+        self.assertEqual(write_file_changes(self.project_root, replacements, [], digest), (True, False))
+        self.assertEqual(self.read(), self.data.replace(b"T-SHIRT_SIZE: XL", b"T-SHIRT_SIZE: S"))
+
+    def test_parse_and_finalize_keeps_the_original_lines(self):
+        set_date_obj(date(2026, 1, 15))
+        project = ProjectFileObject(self.project_root, [project_info_filename], project_info_filename)
+        self.assertEqual(project.finalize_file(), (False, True))
+        new_data = self.read()
+        self.assertTrue(new_data.startswith(self.data))
+        self.assertIn(b"Project_ID: " + project.uuid.encode("ascii"), new_data[len(self.data):])
+
+        # The ages of the stamped phase dates are appended by the next run
+        project = ProjectFileObject(self.project_root, [project_info_filename], project_info_filename)
+        self.assertEqual(project.finalize_file(), (False, True))
+        new_data = self.read()
+
+        # Then only the volatile Report_Date is left to update: the file is left untouched
+        project = ProjectFileObject(self.project_root, [project_info_filename], project_info_filename)
+        self.assertEqual(project.finalize_file(), (False, False))
+        self.assertEqual(self.read(), new_data)
+
+        # A changed value is patched in place at its span
+        set_date_obj(date(2026, 2, 20))
+        project = ProjectFileObject(self.project_root, [project_info_filename], project_info_filename)
+        replacements, appends = project.get_file_changes()
+        self.assertIn("COMPUTED_DAYS_IN_STAGE_2_COMMITTED", replacements)
+        self.assertEqual(appends, [])
+        project.finalize_file()
+        patched_data = self.read()
+        self.assertIn(b"COMPUTED_DAYS_IN_STAGE_2_COMMITTED: 36", patched_data)
+        self.assertEqual(patched_data.count(b"\n"), new_data.count(b"\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from reports.configurations import flow_phase_order
+from reports.flow_metrics import (cumulative_flow, cycle_times, distribution, weekly_report_dates, wip_age_percentiles,
+                                  wip_age_trend, wip_ages)
+
+
+def history(*rows):
+    """An analytics history of (report date, project id, phase, days in phase, end date, completion days) rows,
+    with the column types of `AnalyticsHistoryStore.scan`."""
+    frame = pd.DataFrame(rows, columns=["Report_Date", "Project_ID", "Phases", "DAYS_IN_PHASE",
+                                        "COMPUTED_PROJECT_END_DATE", "COMPUTED_COMPLETION_TIME_DAYS"])
+    frame["Report_Date"] = pd.to_datetime(frame["Report_Date"])
+    frame["COMPUTED_PROJECT_END_DATE"] = pd.to_datetime(frame["COMPUTED_PROJECT_END_DATE"])
+    frame["Phases"] = frame["Phases"].astype(pd.CategoricalDtype(sorted(set(frame["Phases"].dropna()))))
+    frame["COMPUTED_COMPLETION_TIME_DAYS"] = frame["COMPUTED_COMPLETION_TIME_DAYS"].astype("Int32")
+    # every phase reads its days in phase from its own key
+    for phase in flow_phase_order:
+        key = f"COMPUTED_DAYS_IN_STAGE_{phase.replace('-', '_').replace(' ', '_').upper()}"
+        frame[key] = frame["DAYS_IN_PHASE"].where(frame["Phases"] == phase).astype("Int32")
+    return frame.drop(columns="DAYS_IN_PHASE")
+
+
+class DistributionTest(unittest.TestCase):
+    def test_groups_and_overall(self):
+        summary = distribution(pd.Series([1, 3, None, 10]), pd.Series(["a", "a", "b", "b"]), percentiles=[50])
+        self.assertEqual(summary.index.tolist(), ["a", "b", "All"])
+        self.assertEqual(summary["Projects"].tolist(), [2, 1, 3])
+        self.assertEqual(summary["P50"].tolist(), [2, 10, 3])
+        self.assertEqual(summary["Max"].tolist(), [3, 10, 10])
+
+    def test_empty_distribution(self):
+        summary = distribution(pd.Series([None, None], dtype=object), percentiles=[50, 85])
+        self.assertTrue(summary.empty)
+        self.assertEqual(summary.columns.tolist(), ["Projects", "Mean", "P50", "P85", "Max"])
+
+
+class FlowMetricsTest(unittest.TestCase):
+    def setUp(self):
+        self.history = history(
+            ("2026-01-05", 1, "3-In Progress", 10, None, None),
+            ("2026-01-05", 2, "2-Committed", 4, None, None),
+            ("2026-01-05", 3, "0-Ideas", 30, None, None),
+            ("2026-01-07", 1, "3-In Progress", 12, None, None),
+            ("2026-01-07", 2, "3-In Progress", 0, None, None),
+            ("2026-01-07", 3, "0-Ideas", 32, None, None),
+            ("2026-01-12", 1, "6-Completed", 0, "2026-01-10", 40),
+            ("2026-01-12", 2, "3-In Progress", 5, None, None),
+        )
+
+    def test_weekly_report_dates(self):
+        self.assertEqual(weekly_report_dates(self.history).tolist(),
+                         [pd.Timestamp("2026-01-07"), pd.Timestamp("2026-01-12")])
+        self.assertTrue(weekly_report_dates(self.history.iloc[:0]).empty)
+
+    def test_cumulative_flow(self):
+        flow = cumulative_flow(self.history)
+        self.assertEqual(flow.columns.tolist(), flow_phase_order)
+        self.assertEqual(flow.index.tolist(), [pd.Timestamp(day) for day in ("2026-01-05", "2026-01-07", "2026-01-12")])
+        self.assertEqual(flow["3-In Progress"].tolist(), [1, 2, 1])
+        self.assertEqual(flow["6-Completed"].tolist(), [0, 0, 1])
+        self.assertEqual(flow["7-Maintenance"].tolist(), [0, 0, 0])
+        self.assertEqual(flow.sum(axis=1).tolist(), [3, 3, 2])
+
+    def test_cycle_times_use_the_latest_value_of_each_project(self):
+        later = history(("2026-04-01", 1, "7-Maintenance", 1, "2026-01-10", 41),
+                        ("2026-04-01", 4, "6-Completed", 0, None, 20))
+        combined = pd.concat([self.history, later], ignore_index=True)
+        combined["Phases"] = combined["Phases"].astype("category")
+        summary = cycle_times(combined, "COMPUTED_COMPLETION_TIME_DAYS")
+        self.assertEqual(summary.index.tolist(), ["2026Q1", "Unknown", "All"])
+        self.assertEqual(summary["Projects"].tolist(), [1, 1, 2])
+        self.assertEqual(summary.loc["2026Q1", "Max"], 41)
+
+    def test_wip_ages(self):
+        ages = wip_ages(self.history)
+        # ideas and completed projects are not WIP
+        np.testing.assert_array_equal(ages.to_numpy(), [10, 4, np.nan, 12, 0, np.nan, np.nan, 5])
+
+    def test_wip_age_percentiles(self):
+        summary = wip_age_percentiles(self.history, pd.Timestamp("2026-01-05"))
+        self.assertEqual(summary.index.tolist(), ["2-Committed", "3-In Progress", "All"])
+        self.assertEqual(summary["Projects"].tolist(), [1, 1, 2])
+        self.assertEqual(summary.loc["All", "Max"], 10)
+
+    def test_wip_age_trend(self):
+        report_dates = weekly_report_dates(self.history)
+        trend = wip_age_trend(self.history, report_dates, percentile=50)
+        self.assertEqual(trend.index.tolist(), report_dates.tolist())
+        self.assertEqual(trend.columns[-1], "All WIP")
+        self.assertEqual(trend["3-In Progress"].tolist(), [6, 5])
+        self.assertEqual(trend["All WIP"].tolist(), [6, 5])
+        self.assertTrue(trend["2-Committed"].isna().all())
+
+
+if __name__ == "__main__":
+    unittest.main()
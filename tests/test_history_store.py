@@ -0,0 +1,164 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from reports import history_store, summary
+from reports.history_store import (CODE_NULL, INT_NULL, AnalyticsHistoryStore, _encode_column, _narrow, _widen,
+                                   analytics_history_dir)
+
+
+def snapshot(*rows):
+    """An analytics frame of (project, phase, owner, age days, start date) rows."""
+    return pd.DataFrame([{"Project": project, "Phases": phase, "ANALYTICS_DS_OWNER": owner,
+                          "COMPUTED_AGE_DAYS": age, "COMPUTED_PROJECT_START_DATE": start}
+                         for project, phase, owner, age, start in rows])
+
+
+class ColumnEncodingTest(unittest.TestCase):
+    def test_dictionary_encoding(self):
+        codes, dictionary = _encode_column("dictionary", ["b", None, "a", "b", float("nan"), ""])
+        self.assertEqual(dictionary.tolist(), ["a", "b"])
+        self.assertEqual(codes.tolist(), [1, CODE_NULL, 0, 1, CODE_NULL, CODE_NULL])
+
+    def test_int_and_date_nulls(self):
+        self.assertEqual(_encode_column("int", [3, None, "12", "n/a", 4.0]).tolist(), [3, INT_NULL, 12, INT_NULL, 4])
+        dates = _encode_column("date", [date(2026, 1, 15), None, pd.NaT, "2026-01-15"])
+        self.assertEqual(dates.dtype, np.dtype("datetime64[D]"))
+        self.assertEqual(dates[0], np.datetime64("2026-01-15"))
+        self.assertTrue(np.isnat(dates[1:]).all())
+
+    def test_narrowed_integers_round_trip(self):
+        for values, dtype in (([0, 5, -3], np.int8), ([0, 200], np.int16), ([0, 70000], np.int32)):
+            stored = _narrow(np.array(values + [INT_NULL], dtype=np.int32), INT_NULL)
+            self.assertEqual(stored.dtype, dtype)
+            self.assertEqual(_widen(stored).tolist(), values + [INT_NULL])
+
+    def test_narrowed_minimum_is_not_a_null(self):
+        # the minimum of int8 is the null marker of int8 columns: -128 is stored as int16
+        self.assertEqual(_narrow(np.array([-128, 1], dtype=np.int32), INT_NULL).dtype, np.int16)
+
+
+class AnalyticsHistoryStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = AnalyticsHistoryStore(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        self.store.append(snapshot(("A", "3-In Progress", "Ann", 10, date(2025, 12, 1)),
+                                   ("B", "0-Ideas", None, None, None)), date(2026, 1, 15))
+        history = self.store.scan(["Project", "Phases", "ANALYTICS_DS_OWNER", "COMPUTED_AGE_DAYS",
+                                   "COMPUTED_PROJECT_START_DATE", "COMPUTED_PROJECT_END_DATE"])
+        self.assertEqual(history["Report_Date"].tolist(), [pd.Timestamp("2026-01-15")] * 2)
+        self.assertEqual(history["Project"].tolist(), ["A", "B"])
+        self.assertIsInstance(history["Phases"].dtype, pd.CategoricalDtype)
+        self.assertEqual(history["ANALYTICS_DS_OWNER"].isna().tolist(), [False, True])
+        self.assertEqual(str(history["COMPUTED_AGE_DAYS"].dtype), "Int32")
+        self.assertEqual(history["COMPUTED_AGE_DAYS"].isna().tolist(), [False, True])
+        self.assertEqual(history["COMPUTED_PROJECT_START_DATE"].iloc[0], pd.Timestamp("2025-12-01"))
+        self.assertTrue(history["COMPUTED_PROJECT_END_DATE"].isna().all())
+
+    def test_unknown_columns(self):
+        with self.assertRaises(ValueError):
+            self.store.scan(["NOTES"])
+
+    def test_each_run_writes_its_own_segment(self):
+        self.store.append(snapshot(("A", "0-Ideas", "Ann", None, None)), date(2026, 1, 14))
+        paths = self.store.segment_paths()
+        with open(paths[0], "rb") as infile:
+            first_segment = infile.read()
+        self.store.append(snapshot(("A", "1-Chartering", "Ann", 0, date(2026, 1, 15))), date(2026, 1, 15))
+        self.assertEqual(len(self.store.segment_paths()), 2)
+        with open(paths[0], "rb") as infile:
+            self.assertEqual(infile.read(), first_segment)
+        self.assertEqual(self.store.report_dates(), [date(2026, 1, 14), date(2026, 1, 15)])
+
+    def test_a_later_run_replaces_the_records_of_its_date(self):
+        self.store.append(snapshot(("A", "0-Ideas", "Ann", None, None), ("B", "0-Ideas", "Ann", None, None)),
+                          date(2026, 1, 15))
+        self.store.append(snapshot(("A", "0-Ideas", "Ann", None, None)), date(2026, 1, 14))
+        self.store.append(snapshot(("A", "1-Chartering", "Bob", 0, date(2026, 1, 15))), date(2026, 1, 15))
+        history = self.store.scan(["Project", "Phases", "ANALYTICS_DS_OWNER"])
+        self.assertEqual(history["Report_Date"].dt.day.tolist(), [14, 15])
+        self.assertEqual(history["Phases"].tolist(), ["0-Ideas", "1-Chartering"])
+        self.assertEqual(history["ANALYTICS_DS_OWNER"].tolist(), ["Ann", "Bob"])
+
+    def test_scan_date_range(self):
+        self.store.append(snapshot(("A", "0-Ideas", "Ann", None, None)), date(2025, 12, 31))
+        self.store.append(snapshot(("A", "1-Chartering", "Ann", None, None)), date(2026, 1, 1))
+        self.assertEqual(self.store.scan(["Phases"], start=date(2026, 1, 1))["Phases"].tolist(), ["1-Chartering"])
+        self.assertEqual(self.store.scan(["Phases"], end=date(2025, 12, 31))["Phases"].tolist(), ["0-Ideas"])
+        self.assertEqual(self.store.segment_paths(start=date(2026, 1, 1)), self.store.segment_paths()[1:])
+
+    def test_buffered_appends_write_one_segment_per_month(self):
+        for day in (30, 31):
+            self.store.append(snapshot(("A", "0-Ideas", "Ann", None, None)), date(2025, 12, day), flush=False)
+        self.store.append(snapshot(("A", "0-Ideas", "Ann", None, None)), date(2026, 1, 1), flush=False)
+        self.store.flush()
+        self.assertEqual(len(self.store.segment_paths()), 2)
+        self.assertEqual(len(self.store.report_dates()), 3)
+
+    def test_segments_are_compacted(self):
+        with mock.patch.object(history_store, "ANALYTICS_HISTORY_COMPACT_SEGMENTS", 3):
+            for day, age in ((1, 1), (2, 2), (3, 3), (2, 20)):
+                self.store.append(snapshot(("A", "0-Ideas", "Ann", age, None)), date(2026, 1, day))
+        self.assertEqual(len(self.store.segment_paths()), 1)
+        history = self.store.scan(["COMPUTED_AGE_DAYS"])
+        self.assertEqual(history["Report_Date"].dt.day.tolist(), [1, 2, 3])
+        self.assertEqual(history["COMPUTED_AGE_DAYS"].tolist(), [1, 20, 3])
+
+    def test_monthly_segments_of_earlier_versions_are_read_first(self):
+        self.store.append(snapshot(("A", "1-Chartering", "Ann", None, None)), date(2026, 1, 15))
+        self.store.append(snapshot(("A", "0-Ideas", "Ann", None, None)), date(2026, 1, 15))
+        # the later run, renamed as a monthly segment of an earlier version
+        os.replace(self.store.segment_paths()[1], os.path.join(self.tmp_dir.name, "analytics_2026-01.npz"))
+        self.assertEqual(self.store.scan(["Phases"])["Phases"].tolist(), ["1-Chartering"])
+
+
+class UpdateAnalyticsHistoryTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = AnalyticsHistoryStore(self.tmp_dir.name)
+        patcher = mock.patch.multiple(summary, analytics_history=self.store, today_date_obj=date(2026, 2, 1))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_keyed_by_the_report_date_of_the_records(self):
+        summary.update_analytics_history([{"Project": "A", "Phases": "0-Ideas", "Report_Date": date(2026, 1, 15)}])
+        self.assertEqual(self.store.report_dates(), [date(2026, 1, 15)])
+
+    def test_latest_report_date_when_they_differ(self):
+        with self.assertLogs(level="WARNING"):
+            summary.update_analytics_history([{"Project": "A", "Phases": "0-Ideas", "Report_Date": date(2026, 1, 15)},
+                                              {"Project": "B", "Phases": "0-Ideas", "Report_Date": date(2026, 1, 16)}])
+        self.assertEqual(self.store.report_dates(), [date(2026, 1, 16)])
+
+    def test_run_date_without_report_dates(self):
+        summary.update_analytics_history([{"Project": "A", "Phases": "0-Ideas"}])
+        self.assertEqual(self.store.report_dates(), [date(2026, 2, 1)])
+
+
+class AnalyticsHistoryDirTest(unittest.TestCase):
+    def test_local_by_default(self):
+        with mock.patch.object(history_store, "analytics_history_directory", None):
+            path = analytics_history_dir("/synced/Projects Folders_Pre_ADO")
+        self.assertFalse(path.startswith("/synced"))
+        self.assertEqual(os.path.basename(path), "analytics_history")
+
+    def test_configured_directory(self):
+        with mock.patch.object(history_store, "analytics_history_directory", "/data/history"):
+            self.assertEqual(analytics_history_dir("/synced/Projects Folders_Pre_ADO"), "/data/history")
+
+
+if __name__ == "__main__":
+    unittest.main()
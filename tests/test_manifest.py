@@ -0,0 +1,105 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import date
+
+from reports.configurations import project_info_filename
+from resources.manifest import ProjectManifest, decode_record, encode_record, refresh_record_ages
+from resources.notes import ProjectNotes
+from resources.phase_history import PhaseTransition, ProjectPhaseHistory
+from resources.project_file import build_age_refresh_result
+
+
+def sample_record():
+    return {
+        "Project_ID": "6db5fbfe-452b-4ed5-8619-8ca8685f7d5a",
+        "Project": "Project 0001",
+        "Phases": "2-Committed",
+        "T-SHIRT_SIZE": "M",
+        "COMPUTED_DATE_IN_STAGE_2_COMMITTED": date(2026, 1, 15),
+        "COMPUTED_PROJECT_START_DATE": date(2025, 12, 1),
+        "COMPUTED_DAYS_IN_STAGE_2_COMMITTED": 0,
+        "COMPUTED_AGE_DAYS": 45,
+        "COMPUTED_PROJECT_END_DATE": None,
+        "NOTES": ProjectNotes.from_lines(["NOTES_2026-01-20: kickoff", "NOTES_2026-01-20-2: second note"]),
+        "PHASE_HISTORY": ProjectPhaseHistory([PhaseTransition("1-Chartering", "2-Committed", date(2026, 1, 15))]),
+        "Report_Date": date(2026, 1, 15),
+    }
+
+
+class RecordEncodingTest(unittest.TestCase):
+    def test_round_trip_through_json(self):
+        record = sample_record()
+        decoded = decode_record(json.loads(json.dumps(encode_record(record))))
+        self.assertEqual(decoded, record)
+        self.assertIsInstance(decoded["NOTES"], ProjectNotes)
+        self.assertIsInstance(decoded["PHASE_HISTORY"], ProjectPhaseHistory)
+        self.assertIsInstance(decoded["Report_Date"], date)
+
+    def test_refresh_uses_the_given_date(self):
+        record = refresh_record_ages(sample_record(), date(2026, 2, 20))
+        self.assertEqual(record["COMPUTED_DAYS_IN_STAGE_2_COMMITTED"], 36)
+        self.assertEqual(record["COMPUTED_AGE_DAYS"], 81)
+        self.assertEqual(record["Report_Date"], date(2026, 2, 20))
+
+
+class ProjectManifestTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.project_root = os.path.join(self.tmp_dir.name, "2-Committed", "Project 0001")
+        os.makedirs(self.project_root)
+        self.project_info_path = os.path.join(self.project_root, project_info_filename)
+        with open(self.project_info_path, "wb") as outfile:
+            outfile.write(b"T-SHIRT_SIZE: M\r\nReport_Date: 2026-01-15\r\nCOMPUTED_DAYS_IN_STAGE_2_COMMITTED: 0\r\n"
+                          b"COMPUTED_AGE_DAYS: 45\r\n")
+        self.files = [project_info_filename]
+        self.manifest_path = os.path.join(self.tmp_dir.name, "manifest.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def saved_manifest(self):
+        manifest = ProjectManifest(self.manifest_path)
+        manifest.update(self.project_root, self.files, sample_record())
+        manifest.save()
+        return ProjectManifest.load(self.manifest_path)
+
+    def test_hit_on_the_same_day_has_no_stale_ages(self):
+        manifest = self.saved_manifest()
+        self.assertEqual(manifest.cached_record(self.project_root, self.files, date(2026, 1, 15)), sample_record())
+        self.assertEqual(manifest.stale_ages, {})
+
+    def test_changed_listing_is_a_miss(self):
+        manifest = self.saved_manifest()
+        self.assertIsNone(manifest.cached_record(self.project_root, self.files + ["charter.docx"],
+                                                 date(2026, 1, 15)))
+        self.assertEqual((manifest.hits, manifest.misses), (0, 1))
+
+    def test_refreshed_ages_are_written_back(self):
+        manifest = self.saved_manifest()
+        record = manifest.cached_record(self.project_root, self.files, date(2026, 2, 20))
+        self.assertEqual(manifest.stale_ages[self.project_root],
+                         (self.files, ["COMPUTED_DAYS_IN_STAGE_2_COMMITTED", "COMPUTED_AGE_DAYS"]))
+        result = build_age_refresh_result(self.project_root, self.files, record,
+                                          manifest.stale_ages[self.project_root][1])
+        result.finalize_file()
+        with open(self.project_info_path, "rb") as infile:
+            # the report date is patched with the ages, as a full run would
+            self.assertEqual(infile.read(), b"T-SHIRT_SIZE: M\r\nReport_Date: 2026-02-20\r\n"
+                                            b"COMPUTED_DAYS_IN_STAGE_2_COMMITTED: 36\r\nCOMPUTED_AGE_DAYS: 81\r\n")
+
+    def test_report_date_alone_is_not_written_back(self):
+        record = refresh_record_ages(sample_record(), date(2026, 2, 20))
+        self.assertIsNone(build_age_refresh_result(self.project_root, self.files, record, []))
+
+    def test_missing_age_lines_are_appended(self):
+        with open(self.project_info_path, "wb") as outfile:
+            outfile.write(b"T-SHIRT_SIZE: M\n")
+        record = refresh_record_ages(sample_record(), date(2026, 2, 20))
+        result = build_age_refresh_result(self.project_root, self.files, record, ["COMPUTED_AGE_DAYS"])
+        self.assertEqual(result.appends, ["Report_Date: 2026-02-20", "COMPUTED_AGE_DAYS: 81"])
+
+
+if __name__ == "__main__":
+    unittest.main()
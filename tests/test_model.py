@@ -0,0 +1,111 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from reports import summary
+from reports.model import FragmentCache, ReportModel, person_sort_key, sort_people
+
+
+def render_project(fragments, lines, suffix):
+    return f'{lines["Phases"]}/{lines["Project"]}{suffix}'
+
+
+class FragmentCacheTest(unittest.TestCase):
+    def test_fragments_are_rendered_once_per_project(self):
+        fragments = FragmentCache()
+        lines = {"Project_ID": "id-1", "Phases": "2-Committed", "Project": "A"}
+        self.assertEqual(fragments.get(lines, "path", render_project, "!"), "2-Committed/A!")
+        self.assertEqual(fragments.get(dict(lines), "path", render_project, "!"), "2-Committed/A!")
+        self.assertEqual(fragments.get(lines, "path", render_project, "?"), "2-Committed/A?")
+        self.assertEqual(fragments.stats(), {"hits": 1, "misses": 2, "fragments": 2})
+
+    def test_copies_in_other_phases_do_not_collide(self):
+        # a project folder copied to another phase keeps its Project_ID and name
+        fragments = FragmentCache()
+        committed = {"Project_ID": "id-1", "Phases": "2-Committed", "Project": "A"}
+        in_progress = dict(committed, Phases="3-In Progress")
+        self.assertEqual(fragments.get(committed, "path", render_project, ""), "2-Committed/A")
+        self.assertEqual(fragments.get(in_progress, "path", render_project, ""), "3-In Progress/A")
+
+
+class PersonOrderTest(unittest.TestCase):
+    def setUp(self):
+        # person -> phase index -> records; only the record counts matter for the "projects" order
+        self.people = {"carl Zed": {3: [{}]},
+                       "Ann Lee (a.lee@f5.com)": {2: [{}], 3: [{}]},
+                       "Bob Adams - V": {3: [{}, {}]},
+                       "Ann Lee": {0: [{}]}}
+
+    def test_sort_key_ignores_the_email_and_vendor_suffix(self):
+        self.assertEqual(person_sort_key("Ann Lee (a.lee@f5.com)", "name")[:-1], ("ann lee",))
+        self.assertEqual(person_sort_key("Bob Adams - V", "name")[:-1], ("bob adams",))
+        self.assertEqual(person_sort_key("Bob Adams - V", "last_name")[:-1], ("adams", "bob adams"))
+        self.assertEqual(person_sort_key(None, "last_name"), ("", "", ""))
+
+    def test_name_order_breaks_ties_on_the_full_name(self):
+        self.assertEqual(sort_people(self.people, "name"),
+                         ["Ann Lee", "Ann Lee (a.lee@f5.com)", "Bob Adams - V", "carl Zed"])
+
+    def test_last_name_order(self):
+        self.assertEqual(sort_people(self.people, "last_name"),
+                         ["Bob Adams - V", "Ann Lee", "Ann Lee (a.lee@f5.com)", "carl Zed"])
+
+    def test_projects_order_breaks_ties_on_the_name(self):
+        self.assertEqual(sort_people(self.people, "projects"),
+                         ["Ann Lee (a.lee@f5.com)", "Bob Adams - V", "Ann Lee", "carl Zed"])
+
+    def test_invalid_order(self):
+        with self.assertRaises(ValueError):
+            sort_people(self.people, "first_name")
+
+    def test_sorted_owners_with_a_missing_owner(self):
+        model = ReportModel([{"Project": "A", "Phases": "3-In Progress", "ANALYTICS_DS_OWNER": "Eve White"},
+                             {"Project": "B", "Phases": "3-In Progress", "ANALYTICS_DS_OWNER": None},
+                             {"Project": "C", "Phases": "2-Committed", "ANALYTICS_DS_OWNER": "Ann Lee"},
+                             {"Project": "D", "Phases": "2-Committed", "ANALYTICS_DS_OWNER": "Eve White"}])
+        self.assertEqual(model.sorted_owners("name"), [None, "Ann Lee", "Eve White"])
+        self.assertEqual(model.sorted_owners("last_name"), [None, "Ann Lee", "Eve White"])
+        self.assertEqual(model.sorted_owners("projects"), ["Eve White", None, "Ann Lee"])
+
+
+class StakeholderIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.records = [
+            {"Project": "A", "Phases": "2-Committed", "ANALYTICS_DS_OWNER": "Ann Lee",
+             "BUSINESS_SPONSOR": "Ann Lee, Joann Leeds"},
+            {"Project": "B", "Phases": "3-In Progress", "ANALYTICS_DS_OWNER": "Ann Lee",
+             "BUSINESS_SPONSOR": "Joann Leeds"},
+            {"Project": "C", "Phases": "3-In Progress", "ANALYTICS_DS_OWNER": "Eve White",
+             "BUSINESS_SPONSOR": "Ann Lee,  Ann Lee,"},
+            {"Project": "D", "Phases": "0-Ideas", "ANALYTICS_DS_OWNER": "Eve White", "BUSINESS_SPONSOR": ""},
+        ]
+        self.model = ReportModel(self.records)
+
+    def projects(self, stakeholder):
+        return {phase: [lines["Project"] for lines in records]
+                for phase, records in self.model.stakeholder_phases(stakeholder).items()}
+
+    def test_names_only_match_whole_entries(self):
+        # "Ann Lee" is a substring of "Joann Leeds" but names a different stakeholder
+        self.assertEqual(self.projects("Ann Lee"), {2: ["A"], 3: ["C"]})
+        self.assertEqual(self.projects("Joann Leeds"), {2: ["A"], 3: ["B"]})
+        self.assertEqual(self.projects("Ann"), {})
+
+    def test_distinct_stakeholders(self):
+        self.assertEqual(list(self.model.stakeholder_index("BUSINESS_SPONSOR")), ["Ann Lee", "Joann Leeds"])
+        self.assertEqual(self.model.sorted_stakeholders("BUSINESS_SPONSOR", "last_name"), ["Ann Lee", "Joann Leeds"])
+        self.assertIs(self.model.stakeholder_index("BUSINESS_SPONSOR"),
+                      self.model.stakeholder_index("BUSINESS_SPONSOR"))
+
+    def test_stakeholder_list_is_served_from_the_index(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "stakeholders.csv")
+            with mock.patch.object(summary, "stakeholder_list_path", path):
+                summary.create_complete_stakeholder_list(self.records)
+            with open(path) as infile:
+                self.assertEqual(infile.read().splitlines(), ["Ann Lee,a.lee@f5.com", "Joann Leeds,j.leeds@f5.com"])
+
+
+if __name__ == "__main__":
+    unittest.main()
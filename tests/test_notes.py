@@ -0,0 +1,71 @@
+import unittest
+from datetime import date
+
+from resources.notes import NoteRecord, PortfolioNoteIndex, ProjectNotes
+
+
+def notes(*note_lines):
+    return ProjectNotes.from_lines(note_lines)
+
+
+class NoteRecordTest(unittest.TestCase):
+    def test_from_line(self):
+        self.assertEqual(NoteRecord.from_line("NOTES_2025-5-1: text: more"), NoteRecord(date(2025, 5, 1), None,
+                                                                                         "text: more"))
+        self.assertEqual(NoteRecord.from_line("NOTES-2025_05_01_2: item"), NoteRecord(date(2025, 5, 1), 2, "item"))
+
+    def test_invalid_dates_raise(self):
+        with self.assertRaises(ValueError):
+            NoteRecord.from_line("NOTES_2025-13-01: text")
+        with self.assertRaises(ValueError):
+            NoteRecord.from_line("NOTES: undated")
+
+
+class ProjectNotesTest(unittest.TestCase):
+    def setUp(self):
+        self.notes = notes("NOTES_2025-03-19: oldest", "NOTES_2025-05-24-1: first", "NOTES_2025-05-24-2: second",
+                           "NOTES_2025-04-17: middle")
+
+    def test_most_recent_first_keeping_file_order_within_a_date(self):
+        self.assertEqual([note.text for note in self.notes], ["first", "second", "middle", "oldest"])
+
+    def test_recent_window_includes_its_first_day(self):
+        self.assertEqual([note.text for note in self.notes.recent(date(2025, 4, 17))], ["first", "second", "middle"])
+        self.assertEqual([note.text for note in self.notes.recent(date(2025, 4, 18))], ["first", "second"])
+        self.assertEqual(self.notes.recent(date(2025, 5, 25)), [])
+        self.assertEqual(len(self.notes.recent(date(2000, 1, 1))), 4)
+
+    def test_recent_limit(self):
+        self.assertEqual([note.text for note in self.notes.recent(date(2000, 1, 1), 3)], ["first", "second", "middle"])
+        self.assertEqual(self.notes.recent(date(2025, 5, 24), 0), [])
+
+    def test_empty_notes(self):
+        self.assertEqual(ProjectNotes().recent(date(2000, 1, 1)), [])
+        self.assertEqual(str(ProjectNotes()), "No notes found.\n\n")
+
+    def test_list_round_trip(self):
+        self.assertEqual(ProjectNotes.from_list(self.notes.to_list()), self.notes)
+
+
+class PortfolioNoteIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = PortfolioNoteIndex([
+            {"Project": "A", "NOTES": notes("NOTES_2025-05-01: a1", "NOTES_2025-05-10: a2")},
+            {"Project": "B", "NOTES": None},
+            {"Project": "C"},
+            {"Project": "D", "NOTES": notes("NOTES_2025-05-10: d1", "NOTES_2025-04-01: d2")},
+        ])
+
+    def test_projects_without_notes_are_skipped(self):
+        self.assertEqual(len(self.index), 4)
+
+    def test_recent_across_projects(self):
+        self.assertEqual([(project, note.text) for project, note in self.index.recent(date(2025, 5, 1))],
+                         [("A", "a2"), ("D", "d1"), ("A", "a1")])
+        self.assertEqual([(project, note.text) for project, note in self.index.recent(date(2025, 5, 2), 1)],
+                         [("A", "a2")])
+        self.assertEqual(self.index.recent(date(2025, 5, 11)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import logging
+import os
+import unittest
+from datetime import date
+
+import numpy as np
+
+from reports.configurations import project_folders_root, project_info_filename, project_phases
+from resources.phase_history import (NOT_STARTED, UNKNOWN_PHASE, PhaseHistoryStore, PhaseTransition,
+                                     ProjectPhaseHistory, stage_date_history)
+from resources.project_file import ProjectFileObject, set_date_obj
+
+PROJECT_ROOT = os.path.join(os.path.dirname(__file__), "fixtures", "phase_metrics", project_folders_root,
+                            "7-Maintenance", "Keeping Up")
+
+
+def history(*transitions):
+    return ProjectPhaseHistory(PhaseTransition.from_value(value) for value in transitions)
+
+
+class PhaseTransitionTest(unittest.TestCase):
+    def test_from_value(self):
+        self.assertEqual(PhaseTransition.from_value(" 3-In Progress -> 4-On Hold DATE: 2026-1-5 \n"),
+                         PhaseTransition("3-In Progress", "4-On Hold", date(2026, 1, 5)))
+        self.assertEqual(str(PhaseTransition.from_value("3-In Progress -> 4-On Hold DATE: 2026-1-5")),
+                         "3-In Progress -> 4-On Hold DATE: 2026-01-05")
+
+    def test_malformed_values(self):
+        with self.assertLogs(level="WARNING"):
+            self.assertIsNone(PhaseTransition.from_value("3-In Progress to 4-On Hold DATE: 2026-01-05"))
+        with self.assertLogs(level="WARNING"):
+            self.assertIsNone(PhaseTransition.from_value("3-In Progress -> 4-On Hold DATE: 2026-02-30"))
+
+
+class ProjectPhaseHistoryTest(unittest.TestCase):
+    def test_transitions_are_kept_in_date_order(self):
+        phase_history = history("2-Committed -> 3-In Progress DATE: 2025-03-01",
+                                "1-Chartering -> 2-Committed DATE: 2025-02-01")
+        self.assertEqual([transition.to_phase for transition in phase_history.transitions],
+                         ["2-Committed", "3-In Progress"])
+        self.assertEqual(phase_history.first_phase("3-In Progress"), "1-Chartering")
+
+    def test_intervals(self):
+        phase_history = history("1-Chartering -> 2-Committed DATE: 2025-02-01",
+                                "2-Committed -> 3-In Progress DATE: 2025-03-01")
+        self.assertEqual(phase_history.intervals("3-In Progress", date(2025, 1, 1)),
+                         [("1-Chartering", date(2025, 1, 1), date(2025, 2, 1)),
+                          ("2-Committed", date(2025, 2, 1), date(2025, 3, 1)),
+                          ("3-In Progress", date(2025, 3, 1), None)])
+
+    def test_intervals_without_transitions(self):
+        self.assertEqual(ProjectPhaseHistory().intervals("0-Ideas"), [("0-Ideas", None, None)])
+
+    def test_list_round_trip(self):
+        phase_history = history("3-In Progress -> 4-On Hold DATE: 2025-05-01")
+        self.assertEqual(ProjectPhaseHistory.from_list(phase_history.to_list()), phase_history)
+
+    def test_stage_date_history(self):
+        lines = {"Phases": "3-In Progress",
+                 "COMPUTED_DATE_IN_STAGE_1_CHARTERING": date(2025, 1, 1),
+                 "COMPUTED_DATE_IN_STAGE_2_COMMITTED": date(2025, 2, 1),
+                 "COMPUTED_DATE_IN_STAGE_3_IN_PROGRESS": date(2025, 3, 1),
+                 # recorded after the current phase started: not part of the path to it
+                 "COMPUTED_DATE_IN_STAGE_4_ON_HOLD": date(2025, 4, 1)}
+        self.assertEqual(stage_date_history(lines), history("1-Chartering -> 2-Committed DATE: 2025-02-01",
+                                                            "2-Committed -> 3-In Progress DATE: 2025-03-01"))
+        self.assertEqual(stage_date_history({"Phases": "0-Ideas"}), ProjectPhaseHistory())
+
+    def test_record_holds_the_parsed_history_without_logging_it(self):
+        set_date_obj(date(2026, 1, 15))
+        project = ProjectFileObject(PROJECT_ROOT, [project_info_filename], project_info_filename,
+                                    compute_metrics=False)
+        with self.assertLogs(level=logging.INFO) as logs:
+            logging.info("start")
+            record = project.get_legacy_params()
+        self.assertFalse(any("PHASE_HISTORY" in message for message in logs.output))
+        self.assertEqual(record["PHASE_HISTORY"], history("6-Completed -> 7-Maintenance DATE: 2026-01-15"))
+
+
+class PhaseHistoryStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.store = PhaseHistoryStore([
+            {"Project": "Looped", "Phases": "3-In Progress",
+             "COMPUTED_DATE_IN_STAGE_3_IN_PROGRESS": date(2025, 1, 1),
+             "PHASE_HISTORY": history("3-In Progress -> 4-On Hold DATE: 2025-01-11",
+                                      "4-On Hold -> 3-In Progress DATE: 2025-01-31")},
+            {"Project": "New", "Phases": "0-Ideas", "COMPUTED_DATE_IN_STAGE_0_IDEAS": date(2025, 1, 20)},
+            {"Project": "Undated", "Phases": "Not A Phase"},
+        ])
+
+    def test_columns(self):
+        np.testing.assert_array_equal(self.store.offsets, [0, 3, 4, 5])
+        np.testing.assert_array_equal(self.store.phase, [3, 4, 3, 0, UNKNOWN_PHASE])
+        np.testing.assert_array_equal(self.store.project_index, [0, 0, 0, 1, 2])
+        phases, starts, ends = self.store.project_intervals(0)
+        np.testing.assert_array_equal(starts, np.array(["2025-01-01", "2025-01-11", "2025-01-31"],
+                                                       dtype="datetime64[D]"))
+        self.assertTrue(np.isnat(ends[-1]))
+
+    def test_interval_days(self):
+        np.testing.assert_array_equal(self.store.interval_days(date(2025, 2, 10)), [10, 20, 10, 21, np.nan])
+
+    def test_days_in_phase_sums_repeated_visits(self):
+        days = self.store.days_in_phase(date(2025, 2, 10))
+        self.assertEqual(days[0, project_phases["3-In Progress"]], 20)
+        np.testing.assert_array_equal(self.store.on_hold_days(date(2025, 2, 10)), [20, 0, 0])
+        self.assertEqual(days[2].sum(), 0)
+
+    def test_rework_loops(self):
+        np.testing.assert_array_equal(self.store.rework_loops(), [1, 0, 0])
+
+    def test_phases_as_of(self):
+        dates = [date(2024, 12, 31), date(2025, 1, 11), date(2025, 1, 20), date(2025, 1, 31)]
+        np.testing.assert_array_equal(self.store.phases_as_of(dates), [
+            [NOT_STARTED, 4, 4, 3],
+            [NOT_STARTED, NOT_STARTED, 0, 0],
+            [UNKNOWN_PHASE] * 4,
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
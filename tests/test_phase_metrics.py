@@ -0,0 +1,104 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import date
+
+from reports.configurations import project_folders_root, project_info_filename
+from resources.project_file import build_project_batch, set_date_obj
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "phase_metrics")
+CORPUS = os.path.join(FIXTURES, project_folders_root)
+# Metrics of the corpus projects in phases 0 to 6 computed by the per-project phase functions the
+# engine replaced, on the same date
+BASELINE = os.path.join(FIXTURES, "baseline_2026-01-15.json")
+BASELINE_DATE = date(2026, 1, 15)
+
+
+def metrics_of(result):
+    """The computed metrics of a project record, as in the baseline (dates in ISO format, no links)."""
+    return {key: value.isoformat() if isinstance(value, date) else value
+            for key, value in sorted(result.record.items())
+            if key.startswith("COMPUTED_") and not key.endswith("_LINK") and value is not None}
+
+
+class PhaseMetricBaselineTest(unittest.TestCase):
+    def setUp(self):
+        set_date_obj(BASELINE_DATE)
+
+    def test_batch_matches_the_per_project_baseline(self):
+        with open(BASELINE) as infile:
+            baseline = json.load(infile)
+        folders = [(os.path.join(CORPUS, *name.split("/")), [project_info_filename]) for name in baseline]
+        results = build_project_batch(folders)
+        for name, result in zip(baseline, results):
+            with self.subTest(project=name):
+                self.assertEqual(metrics_of(result), baseline[name])
+
+    def test_single_projects_match_the_batch(self):
+        with open(BASELINE) as infile:
+            baseline = json.load(infile)
+        for name in baseline:
+            with self.subTest(project=name):
+                result = build_project_batch([(os.path.join(CORPUS, *name.split("/")), [project_info_filename])])[0]
+                self.assertEqual(metrics_of(result), baseline[name])
+
+    def test_maintenance_closes_out_the_completed_phase(self):
+        result = build_project_batch([(os.path.join(CORPUS, "7-Maintenance", "Keeping Up"),
+                                       [project_info_filename])])[0]
+        self.assertEqual(metrics_of(result), {
+            "COMPUTED_DATE_IN_STAGE_6_COMPLETED": "2025-12-01",
+            "COMPUTED_DATE_IN_STAGE_7_MAINTENANCE": "2026-01-15",
+            "COMPUTED_DAYS_IN_STAGE_6_COMPLETED": 45,
+            "COMPUTED_PREVIOUS_PHASE": "7-Maintenance",
+            "COMPUTED_PROJECT_END_DATE": "2025-12-01",
+            "COMPUTED_PROJECT_START_DATE": "2025-03-01",
+        })
+
+    def test_ad_hoc_ages(self):
+        result = build_project_batch([(os.path.join(CORPUS, "9-Ad Hoc", "One Off"), [project_info_filename])])[0]
+        self.assertEqual(metrics_of(result), {
+            "COMPUTED_DATE_IN_STAGE_9_AD_HOC": "2026-01-05",
+            "COMPUTED_DAYS_IN_STAGE_9_AD_HOC": 10,
+            "COMPUTED_PREVIOUS_PHASE": "9-Ad Hoc",
+            "COMPUTED_PROJECT_IN_PROGRESS_DATE": "2026-01-15",
+            "COMPUTED_PROJECT_START_DATE": "2026-01-15",
+        })
+        self.assertEqual(list(result.replacements), ["COMPUTED_DAYS_IN_STAGE_9_AD_HOC"])
+
+
+class InvalidDateTest(unittest.TestCase):
+    def setUp(self):
+        set_date_obj(BASELINE_DATE)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.project_root = os.path.join(self.tmp_dir.name, project_folders_root, "3-In Progress", "Bad Dates")
+        os.makedirs(self.project_root)
+        with open(os.path.join(CORPUS, "3-In Progress", "Steady Work", project_info_filename)) as infile:
+            data = infile.read()
+        data = data.replace("COMPUTED_PREVIOUS_PHASE: 3-In Progress",
+                            "COMPUTED_PREVIOUS_PHASE: 2-Committed\nCOMPUTED_DATE_IN_STAGE_2_COMMITTED: 2025-13-40")
+        data = data.replace("COMPUTED_PROJECT_START_DATE: 2025-03-01", "COMPUTED_PROJECT_START_DATE: soon")
+        with open(os.path.join(self.project_root, project_info_filename), "w") as outfile:
+            outfile.write(data)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_invalid_dates_do_not_fail_the_batch(self):
+        steady_work = os.path.join(CORPUS, "3-In Progress", "Steady Work")
+        with self.assertLogs(level="WARNING"):
+            result, other = build_project_batch([(self.project_root, [project_info_filename]),
+                                                 (steady_work, [project_info_filename])])
+        # The invalid start date is replaced in place rather than appended a second time
+        self.assertEqual(result.record["COMPUTED_PROJECT_START_DATE"], BASELINE_DATE)
+        self.assertIn("COMPUTED_PROJECT_START_DATE", result.replacements)
+        self.assertFalse(any(line.startswith("COMPUTED_PROJECT_START_DATE") for line in result.appends))
+        # The invalid previous phase date is left as it is
+        self.assertEqual(result.record["COMPUTED_DATE_IN_STAGE_2_COMMITTED"], "2025-13-40")
+        self.assertNotIn("COMPUTED_DAYS_IN_STAGE_2_COMMITTED", result.replacements)
+        self.assertEqual(result.record["COMPUTED_DAYS_IN_STAGE_3_IN_PROGRESS"], 167)
+        self.assertEqual(other.record["COMPUTED_AGE_DAYS"], 320)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import os
+import unittest
+from datetime import date
+
+from resources.discovery import discover_projects
+from resources.project_file import build_project_results, set_date_obj
+
+CORPUS_ROOT = os.path.join(os.path.dirname(__file__), "fixtures", "phase_metrics")
+
+
+def outputs(results):
+    """The project root, record and pending file changes of each result."""
+    return [(result.project_root, result.record, result.replacements, result.appends) for result in results]
+
+
+class ProjectResultsTest(unittest.TestCase):
+    def setUp(self):
+        set_date_obj(date(2026, 1, 15))
+        self.project_folders = list(discover_projects(CORPUS_ROOT))
+
+    def test_parallel_run_matches_a_serial_run(self):
+        serial = list(build_project_results(self.project_folders, workers=1))
+        # several tasks per worker, so results come back from both processes
+        parallel = list(build_project_results(self.project_folders, workers=2, chunksize=3))
+        self.assertEqual(len(serial), len(self.project_folders))
+        self.assertEqual([result.project_root for result in serial], [root for root, _ in self.project_folders])
+        self.assertEqual(outputs(parallel), outputs(serial))
+
+    def test_batch_size_does_not_change_the_results(self):
+        self.assertEqual(outputs(build_project_results(self.project_folders, batch_size=1)),
+                         outputs(build_project_results(self.project_folders)))
+
+
+if __name__ == "__main__":
+    unittest.main()
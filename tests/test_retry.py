@@ -0,0 +1,102 @@
+import threading
+import unittest
+from collections import Counter
+from unittest import mock
+
+from resources import retry
+from resources.project_file import DeferredRead
+from resources.retry import RetryScheduler
+
+
+def deferred(project_root, latency=0.25):
+    return DeferredRead(project_root, ["PROJECT_INFO.txt"], latency, TimeoutError("read timed out"))
+
+
+class FakeBuild:
+    def __init__(self, timeouts):
+        """
+        A build function whose reads of each project time out the given number of times
+        before they succeed.
+        """
+        self.timeouts = dict(timeouts)
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, project_root, files):
+        with self._lock:
+            self.calls[project_root] += 1
+            self.timeouts[project_root] -= 1
+            timed_out = self.timeouts[project_root] >= 0
+        return deferred(project_root) if timed_out else f"result of {project_root}"
+
+
+class RetrySchedulerTest(unittest.TestCase):
+    def setUp(self):
+        # full jitter at its upper bound, without sleeping
+        patchers = [mock.patch.object(retry.random, "uniform", side_effect=lambda low, high: high),
+                    mock.patch.object(retry.time, "sleep")]
+        self.uniform, self.sleep = [patcher.start() for patcher in patchers]
+        for patcher in patchers:
+            self.addCleanup(patcher.stop)
+
+    def test_succeeds_after_timeouts(self):
+        scheduler = RetryScheduler(max_attempts=4)
+        scheduler.defer(deferred("A"))
+        build = FakeBuild({"A": 2})
+        self.assertEqual(scheduler.drain(build), ["result of A"])
+        self.assertEqual(build.calls["A"], 3)
+        self.assertEqual(scheduler.stats["A"]["attempts"], 4)
+        self.assertEqual(len(scheduler.stats["A"]["latencies"]), 4)
+        self.assertTrue(scheduler.stats["A"]["succeeded"])
+
+    def test_gives_up_after_max_attempts(self):
+        scheduler = RetryScheduler(max_attempts=4)
+        scheduler.defer(deferred("A"))
+        build = FakeBuild({"A": 10})
+        with self.assertLogs(level="ERROR"):
+            self.assertEqual(scheduler.drain(build), [None])
+        # the deferred first read counts as an attempt
+        self.assertEqual(build.calls["A"], 3)
+        self.assertEqual(scheduler.stats["A"]["attempts"], 4)
+        self.assertFalse(scheduler.stats["A"]["succeeded"])
+
+    def test_single_attempt_is_not_retried(self):
+        scheduler = RetryScheduler(max_attempts=1)
+        scheduler.defer(deferred("A"))
+        build = FakeBuild({"A": 0})
+        with self.assertLogs(level="ERROR"):
+            self.assertEqual(scheduler.drain(build), [None])
+        self.assertEqual(build.calls["A"], 0)
+        self.sleep.assert_not_called()
+
+    def test_backoff_is_capped(self):
+        scheduler = RetryScheduler(max_attempts=5, base_delay=1.0, max_delay=5.0)
+        scheduler.defer(deferred("A"))
+        scheduler.drain(FakeBuild({"A": 3}))
+        self.assertEqual([call.args[0] for call in self.sleep.call_args_list], [2.0, 4.0, 5.0, 5.0])
+        self.assertEqual([call.args for call in self.uniform.call_args_list],
+                         [(0, 2.0), (0, 4.0), (0, 5.0), (0, 5.0)])
+
+    def test_results_keep_the_deferred_order(self):
+        scheduler = RetryScheduler(max_attempts=5, max_workers=3)
+        for project_root in ["A", "B", "C"]:
+            scheduler.defer(deferred(project_root))
+        build = FakeBuild({"A": 3, "B": 0, "C": 1})
+        self.assertEqual(scheduler.drain(build), ["result of A", "result of B", "result of C"])
+        self.assertEqual(dict(build.calls), {"A": 4, "B": 1, "C": 2})
+        self.assertEqual(scheduler.drain(build), [])
+
+    def test_summary(self):
+        scheduler = RetryScheduler(max_attempts=2)
+        scheduler.defer(deferred("A"))
+        scheduler.defer(deferred("B"))
+        with self.assertLogs(level="ERROR"):
+            scheduler.drain(FakeBuild({"A": 0, "B": 1}))
+        lines = scheduler.summary()
+        self.assertEqual(len(lines), 2)
+        self.assertRegex(lines[0], r"^A: 2 attempts, ok \(latencies: 0\.25s, \d+\.\d\ds\)$")
+        self.assertRegex(lines[1], r"^B: 2 attempts, gave up \(latencies: 0\.25s, \d+\.\d\ds\)$")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import codecs
+import unittest
+
+from reports.configurations import project_params_dict
+from resources.tokenizer import (AGGREGATE_LINE, COMMENT_LINE, KEY_LINE, UNKNOWN_LINE, LineSpan, classify_line,
+                                 split_key_value, split_lines, tokenize_spans)
+
+
+class SplitKeyValueTest(unittest.TestCase):
+    def test_value_pieces_are_stripped_and_rejoined(self):
+        self.assertEqual(split_key_value('DATA_PRODUCT_LINK: "https: //example.com"'),
+                         ("DATA_PRODUCT_LINK", "https://example.com"))
+
+    def test_line_without_colon(self):
+        self.assertEqual(split_key_value("just some text"), ("just some text", ""))
+
+
+class ClassifyLineTest(unittest.TestCase):
+    def test_kinds(self):
+        self.assertEqual(classify_line("# a comment", project_params_dict), (COMMENT_LINE, None, "a comment", None))
+        self.assertEqual(classify_line("T-SHIRT_SIZE: XL", project_params_dict), (KEY_LINE, "T-SHIRT_SIZE", "XL", None))
+        self.assertEqual(classify_line("NOTES_2025-03-19: text", project_params_dict),
+                         (AGGREGATE_LINE, "NOTES_2025-03-19", "text", "NOTES"))
+        self.assertEqual(classify_line("commit_justification: why", project_params_dict),
+                         (AGGREGATE_LINE, "commit_justification", "why", "COMMIT_JUSTIFICATIONS"))
+        self.assertEqual(classify_line("NOT_A_KEY: value", project_params_dict),
+                         (UNKNOWN_LINE, "NOT_A_KEY", "value", None))
+
+    def test_known_key_wins_over_aggregate_prefix(self):
+        self.assertEqual(classify_line("NOTES: text", {"NOTES": None})[0], KEY_LINE)
+
+
+class SplitLinesTest(unittest.TestCase):
+    def test_spans_exclude_terminators(self):
+        data = b"A: 1\r\nB: 2\n\nC: 3"
+        lines = list(split_lines(data))
+        self.assertEqual([line for line, _ in lines], ["A: 1", "B: 2", "", "C: 3"])
+        self.assertEqual([span for _, span in lines],
+                         [LineSpan(1, 0, 4), LineSpan(2, 6, 10), LineSpan(3, 11, 11), LineSpan(4, 12, 16)])
+        for line, span in lines:
+            self.assertEqual(data[span.start:span.end].decode("utf-8"), line)
+
+    def test_byte_order_mark_is_skipped(self):
+        data = codecs.BOM_UTF8 + b"A: 1\n"
+        self.assertEqual(list(split_lines(data)), [("A: 1", LineSpan(1, 3, 7))])
+
+    def test_spans_are_byte_offsets(self):
+        data = "A: café\nB: 2\n".encode("utf-8")
+        self.assertEqual([span for _, span in split_lines(data)], [LineSpan(1, 0, 8), LineSpan(2, 9, 13)])
+
+    def test_invalid_utf8_raises(self):
+        with self.assertRaises(UnicodeDecodeError):
+            list(split_lines(b"A: \xff\n"))
+
+
+class TokenizeSpansTest(unittest.TestCase):
+    def test_lines_are_classified_with_their_spans(self):
+        data = b"# header\r\nT-SHIRT_SIZE: XL\r\n\r\n  NOTES_2025-04-17: I have a dream...  \r\nfoo\r\n"
+        tokens = list(tokenize_spans(data, project_params_dict))
+        self.assertEqual([token[:5] for token in tokens], [
+            (COMMENT_LINE, None, "header", None, "# header"),
+            (KEY_LINE, "T-SHIRT_SIZE", "XL", None, "T-SHIRT_SIZE: XL"),
+            (AGGREGATE_LINE, "NOTES_2025-04-17", "I have a dream...", "NOTES", "NOTES_2025-04-17: I have a dream..."),
+            (UNKNOWN_LINE, "foo", "", None, "foo"),
+        ])
+        # the empty line is skipped but counted
+        self.assertEqual([token[5].line_number for token in tokens], [1, 2, 4, 5])
+        notes_span = tokens[2][5]
+        self.assertEqual(data[notes_span.start:notes_span.end], b"  NOTES_2025-04-17: I have a dream...  ")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from reports.configurations import project_info_filename
+from resources import write_back
+from resources.project_file import ProjectResult
+from resources.tokenizer import split_lines
+from resources.write_back import COMMITTING, STAGING, WriteBackBatch, replay_journal, write_back_journal_path
+
+
+def size_result(project_root, size):
+    """
+    A result replacing the T-SHIRT_SIZE line of the project file.
+    """
+    with open(os.path.join(project_root, project_info_filename), "rb") as infile:
+        data = infile.read()
+    span = next(span for line, span in split_lines(data) if line.startswith("T-SHIRT_SIZE"))
+    return ProjectResult(project_root, [project_info_filename], os.path.basename(project_root), "2-Committed",
+                         os.path.basename(project_root), {}, {"T-SHIRT_SIZE": (span, f"T-SHIRT_SIZE: {size}")}, [])
+
+
+class WriteBackTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        # the journal lives outside the tree, in a cache directory created on the first commit
+        self.journal_path = os.path.join(self.tmp_dir.name, "cache", "write_back_journal.json")
+        self.project_roots = []
+        for name in ["A", "B", "C"]:
+            project_root = os.path.join(self.tmp_dir.name, "2-Committed", name)
+            os.makedirs(project_root)
+            self.write(project_root, b"# keep\r\nT-SHIRT_SIZE: M\r\n")
+            self.project_roots.append(project_root)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    @staticmethod
+    def path(project_root):
+        return os.path.join(project_root, project_info_filename)
+
+    def write(self, project_root, data):
+        with open(self.path(project_root), "wb") as outfile:
+            outfile.write(data)
+
+    def read(self, project_root):
+        with open(self.path(project_root), "rb") as infile:
+            return infile.read()
+
+    def test_commit(self):
+        changes = WriteBackBatch(self.journal_path).commit([size_result(root, "XL") for root in self.project_roots])
+        self.assertEqual(changes, {"A": (True, False), "B": (True, False), "C": (True, False)})
+        for project_root in self.project_roots:
+            self.assertEqual(self.read(project_root), b"# keep\r\nT-SHIRT_SIZE: XL\r\n")
+            self.assertFalse(os.path.exists(self.path(project_root) + ".tmp"))
+        self.assertFalse(os.path.exists(self.journal_path))
+
+    def test_durability_barrier_fsyncs_each_file(self):
+        paths = [self.path(root) for root in self.project_roots]
+        with mock.patch.object(write_back.os, "fsync") as fsync, \
+                mock.patch.object(write_back.os, "sync", create=True) as sync, \
+                ThreadPoolExecutor(max_workers=2) as pool:
+            write_back.durability_barrier(paths, pool)
+        self.assertEqual(fsync.call_count, len(paths))
+        sync.assert_not_called()
+
+    def test_journal_is_outside_the_tree(self):
+        journal_path = write_back_journal_path(self.tmp_dir.name)
+        self.assertFalse(journal_path.startswith(self.tmp_dir.name))
+        self.assertEqual(os.path.basename(journal_path), "write_back_journal.json")
+
+    def test_commit_skips_files_edited_while_staging(self):
+        results = [size_result(root, "XL") for root in self.project_roots]
+        real_write_journal = write_back._write_journal
+
+        def edit_then_write_journal(journal_path, state, entries):
+            if state == COMMITTING:
+                self.write(self.project_roots[1], b"# edited\r\nT-SHIRT_SIZE: S\r\n")
+            real_write_journal(journal_path, state, entries)
+
+        with mock.patch.object(write_back, "_write_journal", edit_then_write_journal):
+            changes = WriteBackBatch(self.journal_path).commit(results)
+        self.assertEqual(changes["B"], (False, False))
+        self.assertEqual(self.read(self.project_roots[1]), b"# edited\r\nT-SHIRT_SIZE: S\r\n")
+        self.assertEqual(self.read(self.project_roots[2]), b"# keep\r\nT-SHIRT_SIZE: XL\r\n")
+        self.assertFalse(os.path.exists(self.path(self.project_roots[1]) + ".tmp"))
+
+    def interrupted_commit(self, state):
+        """
+        Runs a commit that stops after writing the journal in the given state.
+        """
+        real_write_journal = write_back._write_journal
+
+        def interrupt(journal_path, journal_state, entries):
+            real_write_journal(journal_path, journal_state, entries)
+            if journal_state == state:
+                raise KeyboardInterrupt
+
+        with mock.patch.object(write_back, "_write_journal", interrupt), \
+                mock.patch.object(write_back, "durability_barrier"):
+            with self.assertRaises(KeyboardInterrupt):
+                WriteBackBatch(self.journal_path).commit([size_result(root, "XL") for root in self.project_roots])
+
+    def test_replay_rolls_back_staging(self):
+        self.interrupted_commit(STAGING)
+        self.assertEqual(replay_journal(self.journal_path), ("rolled back", 3))
+        for project_root in self.project_roots:
+            self.assertEqual(self.read(project_root), b"# keep\r\nT-SHIRT_SIZE: M\r\n")
+            self.assertFalse(os.path.exists(self.path(project_root) + ".tmp"))
+        self.assertFalse(os.path.exists(self.journal_path))
+
+    def test_replay_finishes_committing(self):
+        self.interrupted_commit(COMMITTING)
+        # the first file was renamed before the interruption
+        os.replace(self.path(self.project_roots[0]) + ".tmp", self.path(self.project_roots[0]))
+        self.assertEqual(replay_journal(self.journal_path), ("finished", 3))
+        for project_root in self.project_roots:
+            self.assertEqual(self.read(project_root), b"# keep\r\nT-SHIRT_SIZE: XL\r\n")
+            self.assertFalse(os.path.exists(self.path(project_root) + ".tmp"))
+        self.assertFalse(os.path.exists(self.journal_path))
+
+    def test_replay_keeps_files_edited_since(self):
+        self.interrupted_commit(COMMITTING)
+        self.write(self.project_roots[1], b"# edited\r\nT-SHIRT_SIZE: S\r\n")
+        with self.assertLogs(level="ERROR"):
+            self.assertEqual(replay_journal(self.journal_path), ("finished", 3))
+        self.assertEqual(self.read(self.project_roots[1]), b"# edited\r\nT-SHIRT_SIZE: S\r\n")
+        with open(self.path(self.project_roots[1]) + ".tmp", "rb") as infile:
+            self.assertEqual(infile.read(), b"# keep\r\nT-SHIRT_SIZE: XL\r\n")
+        self.assertEqual(self.read(self.project_roots[2]), b"# keep\r\nT-SHIRT_SIZE: XL\r\n")
+
+    def test_replay_drops_damaged_staged_content(self):
+        self.interrupted_commit(COMMITTING)
+        with open(self.path(self.project_roots[0]) + ".tmp", "wb") as outfile:
+            outfile.write(b"# truncated")
+        with self.assertLogs(level="ERROR"):
+            replay_journal(self.journal_path)
+        self.assertEqual(self.read(self.project_roots[0]), b"# keep\r\nT-SHIRT_SIZE: M\r\n")
+        self.assertFalse(os.path.exists(self.path(self.project_roots[0]) + ".tmp"))
+
+    def test_unreadable_journal_is_left_for_inspection(self):
+        os.makedirs(os.path.dirname(self.journal_path))
+        with open(self.journal_path, "w") as outfile:
+            outfile.write("{not json")
+        self.assertIsNone(replay_journal(self.journal_path))
+        self.assertTrue(os.path.exists(self.journal_path))
+        self.assertIsNone(replay_journal(self.journal_path + ".missing"))
+
+
+if __name__ == "__main__":
+    unittest.main()